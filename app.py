@@ -1,11 +1,14 @@
+import os
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 from flask_jwt_extended import JWTManager
 from flask_migrate import Migrate
 from datetime import timedelta
+from utils.engine import engine_options
+from utils.replicas import RoutingSession, REPLICA_BIND
 
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 jwt = JWTManager()
 migrate = Migrate()
 
@@ -14,11 +17,60 @@ def create_app():
     app = Flask(__name__)
 
     # Configuration
-    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///app.db'
+    app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL', 'sqlite:///app.db')
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    # Pool sizing and SQLite PRAGMAs come from DB_* / SQLITE_* variables
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(app.config['SQLALCHEMY_DATABASE_URI'])
+    # Optional read replica: GET/HEAD requests read from it until they write
+    replica_url = os.environ.get('REPLICA_DATABASE_URL')
+    if replica_url:
+        app.config['SQLALCHEMY_BINDS'] = {REPLICA_BIND: {'url': replica_url, **engine_options(replica_url)}}
     app.config['JWT_SECRET_KEY'] = 'your-super-secret-key-change-this-in-production'
     app.config['JWT_ACCESS_TOKEN_EXPIRES'] = timedelta(hours=24)
 
+    # Report cache: 'local' (per process) or 'sqlite' (shared file); TTL 0 disables it
+    app.config['REPORT_CACHE_BACKEND'] = os.environ.get('REPORT_CACHE_BACKEND', 'local')
+    app.config['REPORT_CACHE_PATH'] = os.environ.get('REPORT_CACHE_PATH')
+    app.config['REPORT_CACHE_TTL'] = int(os.environ.get('REPORT_CACHE_TTL', 30))
+    app.config['REPORT_CACHE_MAX_ENTRIES'] = int(os.environ.get('REPORT_CACHE_MAX_ENTRIES', 256))
+
+    # Worker threads that build product image variants off the request path
+    app.config['IMAGE_WORKERS'] = int(os.environ.get('IMAGE_WORKERS', 2))
+
+    # Static files: public base URL for asset links (a CDN or front proxy),
+    # max-age for files without a content hash, and how files are handed to
+    # the web server: '' (Python streams them), 'x-sendfile' or 'x-accel' (nginx)
+    app.config['ASSET_BASE_URL'] = os.environ.get('ASSET_BASE_URL', 'http://127.0.0.1:5000/static')
+    app.config['STATIC_MAX_AGE'] = int(os.environ.get('STATIC_MAX_AGE', 3600))
+    app.config['STATIC_SENDFILE'] = os.environ.get('STATIC_SENDFILE', '')
+    app.config['X_ACCEL_PREFIX'] = os.environ.get('X_ACCEL_PREFIX', '/_static/')
+    app.config['USE_X_SENDFILE'] = app.config['STATIC_SENDFILE'] == 'x-sendfile'
+
+    # Password hashing: werkzeug method string (e.g. 'scrypt:32768:8:1' or
+    # 'pbkdf2:sha256:600000'), worker threads, and how many hashes may wait
+    # before login/registration answer 503
+    app.config['PASSWORD_HASH_METHOD'] = os.environ.get('PASSWORD_HASH_METHOD', 'scrypt')
+    app.config['PASSWORD_HASH_WORKERS'] = int(os.environ.get('PASSWORD_HASH_WORKERS', os.cpu_count() or 2))
+    app.config['PASSWORD_HASH_QUEUE'] = int(os.environ.get('PASSWORD_HASH_QUEUE', 32))
+    app.config['PASSWORD_HASH_TIMEOUT'] = float(os.environ.get('PASSWORD_HASH_TIMEOUT', 10))
+
+    # Deleted-row markers for /sync are kept this many days; a sync token
+    # older than that gets a full pull instead of a delta
+    app.config['SYNC_TOMBSTONE_DAYS'] = int(os.environ.get('SYNC_TOMBSTONE_DAYS', 30))
+
+    # How stale a worker's copy of the logged-out token list may get
+    app.config['REVOCATION_REFRESH_SECONDS'] = float(os.environ.get('REVOCATION_REFRESH_SECONDS', 1))
+
+    # Per-request wall/SQL timing in a Server-Timing header, with per-endpoint
+    # histograms in Prometheus format at METRICS_PATH; off installs no hooks
+    app.config['REQUEST_METRICS'] = os.environ.get('REQUEST_METRICS', '0') == '1'
+    app.config['METRICS_PATH'] = os.environ.get('METRICS_PATH', '/metrics')
+
+    # Statements slower than SLOW_QUERY_MS are kept with their query plan in
+    # a ring buffer of SLOW_QUERY_LOG_SIZE entries (/admin/slow-queries); 0 is off
+    app.config['SLOW_QUERY_MS'] = float(os.environ.get('SLOW_QUERY_MS', 0))
+    app.config['SLOW_QUERY_LOG_SIZE'] = int(os.environ.get('SLOW_QUERY_LOG_SIZE', 200))
+
 
     # Initialize extensions with app
     db.init_app(app)
@@ -34,6 +86,9 @@ app = create_app()
 
 with app.app_context():
     from routes.auth import *
+    import utils.importer
+    import utils.metrics
+    import utils.slow_queries
 
 if __name__ == '__main__':
     with app.app_context():
@@ -0,0 +1,70 @@
+"""Compare POST /checkout with the invoice + invoice_detail multi-call flow.
+
+Usage: python -m benchmarks.checkout [--sales 200] [--lines 30]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+db_file = os.path.join(tempfile.mkdtemp(), 'bench_checkout.db')
+os.environ['DATABASE_URL'] = f'sqlite:///{db_file}'
+
+from app import app, db
+from models import Category, Product, User
+
+
+def seed(products):
+    db.create_all()
+    db.session.add(User(id=1, username='bench', email='bench@example.com', password='x'))
+    db.session.add(Category(id=1, name='bench'))
+    db.session.add_all([
+        Product(id=i, name=f'product {i}', price=1.25, stock=10 ** 9, category_id=1)
+        for i in range(1, products + 1)
+    ])
+    db.session.commit()
+
+
+def multi_call_sale(client, lines):
+    total = sum(1.25 * 2 for _ in range(lines))
+    invoice = client.post('/invoice/create', json={'user_id': 1, 'total_amount': total}).get_json()
+    invoice_id = invoice['invoice']['id']
+    for product_id in range(1, lines + 1):
+        client.post('/invoice_detail/create', json={
+            'invoice_id': invoice_id, 'product_id': product_id, 'price': 1.25, 'qty': 2
+        })
+
+
+def checkout_sale(client, lines):
+    response = client.post('/checkout', json={
+        'user_id': 1,
+        'items': [{'product_id': product_id, 'qty': 2} for product_id in range(1, lines + 1)]
+    })
+    assert response.status_code == 201, response.get_json()
+
+
+def run(label, sale, client, sales, lines):
+    start = time.perf_counter()
+    for _ in range(sales):
+        sale(client, lines)
+    elapsed = time.perf_counter() - start
+    print(f'{label:<12} {sales} sales x {lines} lines: {elapsed:.2f}s, {sales / elapsed:.1f} sales/s')
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sales', type=int, default=200)
+    parser.add_argument('--lines', type=int, default=30)
+    args = parser.parse_args()
+
+    with app.app_context():
+        seed(args.lines)
+    client = app.test_client()
+    multi = run('multi-call', multi_call_sale, client, args.sales, args.lines)
+    single = run('checkout', checkout_sale, client, args.sales, args.lines)
+    print(f'speedup: {multi / single:.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,14 @@
+"""Endpoint benchmark suite.
+
+Usage:
+    python -m benchmarks.endpoints [--invoices 1000] [--iterations 50] [--output before.json]
+    python -m benchmarks.endpoints --compare before.json after.json
+
+``seed`` builds a synthetic database at the requested invoice count (the
+catalog, customers and ``invoice_detail`` fan-out scale with it) and keeps
+a pristine copy per scale, so runs on different commits start from the
+same rows. ``scenarios`` drives every route in ``routes/`` through the
+Flask test client; ``runner`` reports p50/p95/p99 latency, throughput,
+SQL statements per request and peak RSS for each, and ``--output`` writes
+them as JSON that ``--compare`` diffs.
+"""
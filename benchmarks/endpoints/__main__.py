@@ -0,0 +1,126 @@
+import argparse
+import json
+import os
+import platform
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+from datetime import datetime
+
+from benchmarks.endpoints import __doc__ as usage
+from benchmarks.endpoints.compare import compare
+
+
+def remove_database(path):
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+
+
+def git_revision():
+    try:
+        head = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True)
+        status = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'],
+                                capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None, None
+    return head.stdout.strip(), bool(status.stdout.strip())
+
+
+def prepare_database(args):
+    """Point the app at a fresh copy of the seeded database for this scale,
+    seeding it first if there is no copy yet. Returns whether it seeded."""
+    os.makedirs(args.data_dir, exist_ok=True)
+    pristine = os.path.join(args.data_dir, f'seed-{args.invoices}-{args.seed}.db')
+    work = os.path.join(args.data_dir, 'work.db')
+    remove_database(work)
+    reseed = args.reseed or not os.path.exists(pristine)
+    if not reseed:
+        shutil.copyfile(pristine, work)
+
+    os.environ['DATABASE_URL'] = f'sqlite:///{work}'
+    # Measure the report queries rather than the response cache
+    os.environ.setdefault('REPORT_CACHE_TTL', '0')
+    if not reseed:
+        return False
+
+    from app import app, db
+    from benchmarks.endpoints.seed import Scale, seed_database
+
+    with app.app_context():
+        seed_database(Scale(args.invoices), args.seed)
+        db.engine.dispose()
+    with sqlite3.connect(work) as conn:
+        conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+    remove_database(pristine)
+    shutil.copyfile(work, pristine)
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description=usage.splitlines()[0])
+    parser.add_argument('--invoices', type=int, default=1000, help='seed scale, e.g. 1000, 100000, 1000000')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--iterations', type=int, default=50, help='timed requests per scenario')
+    parser.add_argument('--warmup', type=int, default=5)
+    parser.add_argument('--only', help='regex; run only scenarios whose name matches')
+    parser.add_argument('--output', help='write results as JSON to this file')
+    parser.add_argument('--data-dir', default=os.path.join(tempfile.gettempdir(), 'mini_mart_bench'))
+    parser.add_argument('--reseed', action='store_true', help='rebuild the seeded database for this scale')
+    parser.add_argument('--compare', nargs=2, metavar=('BASE', 'HEAD'), help='diff two --output files')
+    parser.add_argument('--threshold', type=float, default=10.0, help='percent slowdown flagged by --compare')
+    args = parser.parse_args()
+
+    if args.compare:
+        with open(args.compare[0]) as f:
+            base = json.load(f)
+        with open(args.compare[1]) as f:
+            head = json.load(f)
+        regressions = compare(base, head, args.threshold)
+        print(f'{len(regressions)} regression(s)' + (f": {', '.join(regressions)}" if regressions else ''))
+        sys.exit(1 if regressions else 0)
+
+    started = datetime.utcnow()
+    seeded = prepare_database(args)
+    print(f"{'seeded' if seeded else 'reused'} {args.invoices} invoice database in "
+          f'{(datetime.utcnow() - started).total_seconds():.1f}s', file=sys.stderr)
+
+    from app import app
+    from benchmarks.endpoints.runner import run_suite
+    from benchmarks.endpoints.scenarios import Fixtures, all_scenarios
+    from benchmarks.endpoints.seed import Scale
+
+    with app.app_context():
+        fx = Fixtures(args.seed)
+    results, uncovered = run_suite(all_scenarios(), fx, args.iterations, args.warmup, args.only)
+    if uncovered:
+        print(f"no scenario for: {', '.join(uncovered)}", file=sys.stderr)
+
+    revision, dirty = git_revision()
+    document = {
+        'meta': {
+            'revision': revision,
+            'dirty': dirty,
+            'started_at': started.isoformat(),
+            'python': platform.python_version(),
+            'sqlite': sqlite3.sqlite_version,
+            'platform': platform.platform(),
+            'scale': Scale(args.invoices).to_dict(),
+            'rows': fx.counts,
+            'seed': args.seed,
+            'iterations': args.iterations,
+            'warmup': args.warmup,
+        },
+        'results': results,
+        'uncovered': uncovered,
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(document, f, indent=2, sort_keys=True)
+            f.write('\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,32 @@
+"""Diff two result files written by ``--output``.
+
+Kept free of app imports so comparing never touches a database.
+"""
+
+
+def compare(base, head, threshold=10.0, log=print):
+    """Print each scenario's change from ``base`` to ``head`` and return the
+    names whose p50 or p95 got more than ``threshold`` percent slower, or
+    that issue more SQL per request."""
+    regressions = []
+    log(f"{'scenario':<28} {'p50 ms':>19} {'p95 ms':>19} {'sql/req':>16}")
+    for name, new in head['results'].items():
+        old = base['results'].get(name)
+        if old is None:
+            log(f'{name:<28} (new)')
+            continue
+        cells = []
+        slower = False
+        for metric in ('p50_ms', 'p95_ms'):
+            change = (new[metric] - old[metric]) / old[metric] * 100 if old[metric] else 0.0
+            slower = slower or change > threshold
+            cells.append(f'{new[metric]:>9.2f} {change:>+8.1f}%')
+        more_sql = new['sql_per_request'] > old['sql_per_request']
+        cells.append(f"{old['sql_per_request']:>6.2f} -> {new['sql_per_request']:<6.2f}")
+        if slower or more_sql:
+            regressions.append(name)
+        log(f"{name:<28} {' '.join(cells)}{'  <--' if slower or more_sql else ''}")
+    for name in base['results']:
+        if name not in head['results']:
+            log(f'{name:<28} (removed)')
+    return regressions
@@ -0,0 +1,112 @@
+"""Time scenarios through the Flask test client and summarise them."""
+import math
+import re
+import time
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app import app
+
+try:
+    import resource
+except ImportError:  # not available on Windows; RSS is then left out
+    resource = None
+
+
+class StatementCounter:
+    """Counts statements sent to any engine; an executemany counts once."""
+
+    def __init__(self):
+        self.count = 0
+        event.listen(Engine, 'before_cursor_execute', self._on_execute)
+
+    def _on_execute(self, *args):
+        self.count += 1
+
+
+def peak_rss_kb():
+    """High-water resident set size of this process (KiB on Linux)."""
+    if resource is None:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def percentile(sorted_values, p):
+    """Nearest-rank percentile of an already sorted list."""
+    rank = max(1, math.ceil(p / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def run_scenario(client, scenario, fx, counter, iterations, warmup):
+    if scenario.max_iterations:
+        iterations = min(iterations, scenario.max_iterations)
+        warmup = min(warmup, 1)
+
+    fx.reset_rng(scenario.name)
+    with app.app_context():
+        items = scenario.items(fx, warmup + iterations)
+        requests = [scenario.request(fx, item) for item in items]
+
+    endpoint = app.url_map.bind('localhost').match(requests[0]['path'].split('?')[0], requests[0]['method'])[0]
+    for kwargs in requests[:warmup]:
+        client.open(**kwargs).close()
+
+    statuses = {}
+    errors = []
+    latencies = []
+    statements_before = counter.count
+    rss_before = peak_rss_kb()
+    started = time.perf_counter()
+    for kwargs in requests[warmup:]:
+        request_started = time.perf_counter()
+        response = client.open(**kwargs)
+        response.get_data()  # drain streamed bodies inside the timing
+        latencies.append((time.perf_counter() - request_started) * 1000)
+        response.close()
+        statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+        if response.status_code not in scenario.expect and len(errors) < 3:
+            errors.append({'status': response.status_code, 'body': response.get_data(as_text=True)[:300]})
+    elapsed = time.perf_counter() - started
+    rss_after = peak_rss_kb()
+
+    latencies.sort()
+    result = {
+        'endpoint': endpoint,
+        'method': scenario.method,
+        'requests': len(latencies),
+        'p50_ms': round(percentile(latencies, 50), 3),
+        'p95_ms': round(percentile(latencies, 95), 3),
+        'p99_ms': round(percentile(latencies, 99), 3),
+        'max_ms': round(latencies[-1], 3),
+        'throughput_rps': round(len(latencies) / elapsed, 1),
+        'sql_per_request': round((counter.count - statements_before) / len(latencies), 2),
+        'peak_rss_kb': rss_after,
+        'rss_growth_kb': rss_after - rss_before if rss_after is not None else None,
+        'statuses': {str(code): n for code, n in sorted(statuses.items())},
+    }
+    if errors:
+        result['errors'] = errors
+    return result
+
+
+def run_suite(scenarios, fx, iterations, warmup, only=None, log=print):
+    """Run every scenario (or those whose name matches ``only``) in order.
+    Returns ``(results by scenario name, endpoints with no scenario)``."""
+    client = app.test_client()
+    counter = StatementCounter()
+    results = {}
+    for scenario in scenarios:
+        if only and not re.search(only, scenario.name):
+            continue
+        result = results[scenario.name] = run_scenario(client, scenario, fx, counter, iterations, warmup)
+        flag = '' if 'errors' not in result else f"  unexpected status {result['errors'][0]['status']}"
+        log(f"{scenario.name:<28} p50 {result['p50_ms']:>9.2f}ms  p95 {result['p95_ms']:>9.2f}ms  "
+            f"p99 {result['p99_ms']:>9.2f}ms  {result['throughput_rps']:>8.1f} req/s  "
+            f"{result['sql_per_request']:>7.2f} sql/req{flag}")
+
+    covered = {result['endpoint'] for result in results.values()}
+    uncovered = [] if only else sorted(rule.endpoint for rule in app.url_map.iter_rules()
+                                       if rule.endpoint not in covered)
+    return results, uncovered
+
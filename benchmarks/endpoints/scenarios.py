@@ -0,0 +1,307 @@
+"""One or more request scenarios per route in ``routes/``.
+
+A scenario's ``path``, ``json`` and ``form`` are either fixed values or
+callables taking ``(fx, item)``: ``fx`` is the :class:`Fixtures` for the
+run and ``item`` is the iteration number, or the row that ``prepare``
+set up for that iteration when the request consumes something (a delete
+needs a fresh row every time). Reads come first so writes can't change
+what they measure.
+"""
+import base64
+import json
+import os
+import random
+from datetime import datetime, timedelta
+
+from flask_jwt_extended import create_access_token
+from sqlalchemy import select, func
+
+from app import app, db
+from models import Category, Customer, Invoice, InvoiceDetail, Product, User
+from benchmarks.endpoints.seed import (
+    BENCH_PASSWORD, FIRST_NAMES, PRODUCT_NOUNS, customer_fields, insert_chunked, product_name
+)
+
+
+BULK_ROWS = 100
+BATCH_IDS = 50
+# Endpoints that hash a password or return whole tables run fewer times
+SLOW_ITERATIONS = 10
+FULL_SCAN_ITERATIONS = 3
+
+
+class Fixtures:
+    """Row counts, an access token and a per-scenario RNG for building
+    requests. Create inside an app context."""
+
+    def __init__(self, seed):
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.counts = {
+            model.__tablename__: db.session.execute(select(func.max(model.id))).scalar() or 0
+            for model in (Category, Customer, Invoice, InvoiceDetail, Product, User)
+        }
+        self.token = access_token(1)
+        self.password_hash = db.session.get(User, 1).password
+        uploads = os.path.join(app.static_folder, 'uploads', 'products')
+        self.image = sorted(os.listdir(uploads))[0] if os.path.isdir(uploads) and os.listdir(uploads) else None
+
+    def reset_rng(self, name):
+        self.rng = random.Random(f'{self.seed}:{name}')
+
+    def pick(self, table):
+        return self.rng.randint(1, self.counts[table])
+
+    def pick_many(self, table, n):
+        return self.rng.sample(range(1, self.counts[table] + 1), min(n, self.counts[table]))
+
+
+def access_token(user_id):
+    return create_access_token(identity={'id': user_id, 'username': f'bench{user_id}', 'role': 'admin'})
+
+
+def sync_token(when):
+    raw = json.dumps({'t': when.isoformat()}, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+class Scenario:
+    def __init__(self, name, method, path, json=None, form=None, prepare=None, auth=False,
+                 expect=(200,), max_iterations=None):
+        self.name = name
+        self.method = method
+        self.path = path
+        self.json = json
+        self.form = form
+        self.prepare = prepare
+        self.auth = auth
+        self.expect = expect
+        self.max_iterations = max_iterations
+
+    def items(self, fx, count):
+        """What each request is built from: prepared rows or 0..count-1."""
+        if self.prepare is None:
+            return list(range(count))
+        items = self.prepare(fx, count)
+        db.session.commit()
+        return items
+
+    def request(self, fx, item):
+        """Keyword arguments for ``client.open``."""
+        def build(value):
+            return value(fx, item) if callable(value) else value
+
+        kwargs = {'method': self.method, 'path': build(self.path)}
+        if self.json is not None:
+            kwargs['json'] = build(self.json)
+        if self.form is not None:
+            kwargs['data'] = build(self.form)
+        if self.auth:
+            token = item if isinstance(item, str) else fx.token
+            kwargs['headers'] = {'Authorization': f'Bearer {token}'}
+        return kwargs
+
+
+def add_rows(model, rows):
+    """Insert ``rows`` with ids after the current maximum; return the ids."""
+    table = model.__table__
+    start = (db.session.execute(select(func.max(table.c.id))).scalar() or 0) + 1
+    ids = list(range(start, start + len(rows)))
+    insert_chunked(table, [dict(row, id=row_id) for row_id, row in zip(ids, rows)])
+    return ids
+
+
+# Rows for scenarios that use one up per request. ``tag`` keeps the unique
+# user columns apart between the scenarios that need fresh users.
+
+def new_categories(fx, count):
+    return add_rows(Category, [{'name': f'Bench delete {i}'} for i in range(count)])
+
+
+def new_products(fx, count):
+    now = datetime.utcnow()
+    return add_rows(Product, [
+        {'name': product_name(fx.rng), 'price': 1.0, 'stock': 0, 'category_id': 1,
+         'created_at': now, 'updated_at': now}
+        for _ in range(count)
+    ])
+
+
+def new_customers(fx, count):
+    start = fx.counts['customer'] + 1_000_000 + fx.rng.randrange(1_000_000_000)
+    return add_rows(Customer, [customer_fields(fx.rng, start + i) for i in range(count)])
+
+
+def new_users(fx, count, tag):
+    return add_rows(User, [
+        {'username': f'bench-{tag}-{i}', 'email': f'bench-{tag}-{i}@example.com', 'password': fx.password_hash}
+        for i in range(count)
+    ])
+
+
+def new_invoices(fx, count):
+    return add_rows(Invoice, [
+        {'user_id': 1, 'total_amount': 1.0, 'date_time': datetime.utcnow(), 'status': 'pending'}
+        for _ in range(count)
+    ])
+
+
+def new_invoice_details(fx, count):
+    return add_rows(InvoiceDetail, [
+        {'invoice_id': fx.pick('invoice'), 'product_id': fx.pick('product'), 'price': 1.0, 'qty': 1, 'total': 1.0}
+        for _ in range(count)
+    ])
+
+
+def in_batches(prepare):
+    """Turn a one-row-per-request ``prepare`` into ``BULK_ROWS`` per request."""
+    def prepare_batches(fx, count):
+        ids = prepare(fx, count * BULK_ROWS)
+        return [ids[i:i + BULK_ROWS] for i in range(0, len(ids), BULK_ROWS)]
+    return prepare_batches
+
+
+def user_tokens(fx, count):
+    return [access_token(user_id) for user_id in new_users(fx, count, 'reset')]
+
+
+def logout_tokens(fx, count):
+    return [access_token(1) for _ in range(count)]
+
+
+def read_scenarios():
+    today = datetime.utcnow().date()
+    month_ago = (today - timedelta(days=30)).isoformat()
+    return [
+        Scenario('category_list', 'GET', '/category/list?limit=50'),
+        Scenario('category_detail', 'GET', lambda fx, i: f"/category/id/{fx.pick('category')}"),
+        Scenario('product_list', 'GET', '/product/list?limit=50'),
+        Scenario('product_list_by_created', 'GET', '/product/list?limit=50&sort=created_at'),
+        Scenario('product_detail', 'GET', lambda fx, i: f"/product/id/{fx.pick('product')}"),
+        Scenario('product_search', 'GET',
+                 lambda fx, i: f'/product/search?q={fx.rng.choice(PRODUCT_NOUNS).lower()}&limit=20'),
+        Scenario('product_search_prefix', 'GET',
+                 lambda fx, i: f'/product/search?q={fx.rng.choice(PRODUCT_NOUNS)[:3].lower()}&limit=20'),
+        Scenario('customer_list', 'GET', '/customer/list?limit=50'),
+        Scenario('customer_detail', 'GET', lambda fx, i: f"/customer/id/{fx.pick('customer')}"),
+        Scenario('customer_lookup_name', 'GET', lambda fx, i: f'/customer/lookup?q={fx.rng.choice(FIRST_NAMES)}'),
+        Scenario('customer_lookup_phone', 'GET', lambda fx, i: f'/customer/lookup?q=855{fx.rng.randint(10, 99)}'),
+        Scenario('customer_lookup_email', 'GET',
+                 lambda fx, i: f'/customer/lookup?q={fx.rng.choice(FIRST_NAMES).lower()}.&field=email'),
+        Scenario('user_list', 'GET', '/user/list?limit=50'),
+        Scenario('user_detail', 'GET', lambda fx, i: f"/user/id/{fx.pick('user')}"),
+        Scenario('invoice_list', 'GET', '/invoice/list?limit=50'),
+        Scenario('invoice_list_by_date', 'GET', '/invoice/list?limit=50&sort=date_time'),
+        Scenario('invoice_list_stream', 'GET', '/invoice/list?stream=1', max_iterations=FULL_SCAN_ITERATIONS),
+        Scenario('invoice_detail', 'GET', lambda fx, i: f"/invoice/id/{fx.pick('invoice')}"),
+        Scenario('invoice_batch', 'GET',
+                 lambda fx, i: '/invoice/batch?ids=' + ','.join(map(str, fx.pick_many('invoice', BATCH_IDS)))),
+        Scenario('invoice_line_list', 'GET', '/invoice_detail/list?limit=50'),
+        Scenario('invoice_line_list_stream', 'GET', '/invoice_detail/list?stream=1',
+                 max_iterations=FULL_SCAN_ITERATIONS),
+        Scenario('invoice_line_detail', 'GET', lambda fx, i: f"/invoice_detail/id/{fx.pick('invoice_detail')}"),
+        Scenario('sync_full', 'GET', '/sync', max_iterations=FULL_SCAN_ITERATIONS),
+        Scenario('sync_incremental', 'GET',
+                 lambda fx, i: f'/sync?since={sync_token(datetime.utcnow() - timedelta(hours=1))}'),
+        Scenario('report_daily', 'GET', '/reports/sales/daily', auth=True),
+        Scenario('report_daily_invoices', 'GET', '/reports/sales/daily?include_invoices=1&limit=50', auth=True),
+        Scenario('report_weekly', 'GET', '/reports/sales/weekly', auth=True),
+        Scenario('report_monthly', 'GET', '/reports/sales/monthly', auth=True),
+        Scenario('report_by_product', 'GET', f'/reports/sales/by-product?from={month_ago}', auth=True),
+        Scenario('report_by_category', 'GET', f'/reports/sales/by-category?from={month_ago}', auth=True),
+        Scenario('report_by_user', 'GET', f'/reports/sales/by-user?from={month_ago}', auth=True),
+        Scenario('report_cache_stats', 'GET', '/reports/cache/stats', auth=True),
+        Scenario('admin_slow_queries', 'GET', '/admin/slow-queries?limit=20', auth=True),
+        Scenario('static_image', 'GET', lambda fx, i: f'/static/uploads/products/{fx.image}'),
+        Scenario('uploaded_image', 'GET', lambda fx, i: f'/uploads/products/{fx.image}'),
+    ]
+
+
+def write_scenarios():
+    return [
+        Scenario('category_create', 'POST', '/category/create',
+                 json=lambda fx, i: {'name': f'Bench category {i}'}, expect=(201,)),
+        Scenario('category_update', 'PUT', '/category/update',
+                 json=lambda fx, i: {'id': fx.pick('category'), 'name': f'Bench renamed {i}'}),
+        Scenario('category_delete', 'DELETE', '/category/delete',
+                 json=lambda fx, row_id: {'id': row_id}, prepare=new_categories),
+        Scenario('product_create', 'POST', '/product/create',
+                 form=lambda fx, i: {'name': product_name(fx.rng), 'price': '2.50', 'stock': '10', 'category_id': '1'},
+                 expect=(201,)),
+        Scenario('product_update', 'PUT', '/product/update',
+                 form=lambda fx, i: {'id': str(fx.pick('product')), 'price': str(fx.rng.randint(1, 40))}),
+        Scenario('product_delete', 'DELETE', '/product/delete',
+                 json=lambda fx, row_id: {'id': row_id}, prepare=new_products),
+        Scenario('product_bulk_create', 'POST', '/product/bulk/create', json=lambda fx, i: [
+            {'name': product_name(fx.rng), 'price': 2.5, 'category_id': fx.pick('category')} for _ in range(BULK_ROWS)
+        ], expect=(201,)),
+        Scenario('product_bulk_update', 'PUT', '/product/bulk/update', json=lambda fx, i: [
+            {'id': row_id, 'price': fx.rng.randint(1, 40)} for row_id in fx.pick_many('product', BULK_ROWS)
+        ]),
+        Scenario('product_bulk_delete', 'DELETE', '/product/bulk/delete',
+                 json=lambda fx, ids: ids, prepare=in_batches(new_products)),
+        Scenario('customer_create', 'POST', '/customer/create',
+                 json=lambda fx, i: customer_fields(fx.rng, f'new{i}'), expect=(201,)),
+        Scenario('customer_update', 'PUT', '/customer/update',
+                 json=lambda fx, i: {'id': fx.pick('customer'), 'phone': f'+855 12 {fx.rng.randint(100000, 999999)}'}),
+        Scenario('customer_delete', 'DELETE', '/customer/delete',
+                 json=lambda fx, row_id: {'id': row_id}, prepare=new_customers),
+        Scenario('customer_bulk_create', 'POST', '/customer/bulk/create', json=lambda fx, i: [
+            customer_fields(fx.rng, f'bulk{i}x{n}') for n in range(BULK_ROWS)
+        ], expect=(201,)),
+        Scenario('customer_bulk_update', 'PUT', '/customer/bulk/update', json=lambda fx, i: [
+            {'id': row_id, 'phone': f'+855 12 {fx.rng.randint(100000, 999999)}'}
+            for row_id in fx.pick_many('customer', BULK_ROWS)
+        ]),
+        Scenario('customer_bulk_delete', 'DELETE', '/customer/bulk/delete',
+                 json=lambda fx, ids: ids, prepare=in_batches(new_customers)),
+        Scenario('user_create', 'POST', '/user/create', json=lambda fx, i: {
+            'username': f'bench-new-{i}', 'email': f'bench-new-{i}@example.com', 'password': BENCH_PASSWORD
+        }, expect=(201,), max_iterations=SLOW_ITERATIONS),
+        Scenario('user_update', 'PUT', '/user/update',
+                 json=lambda fx, i: {'id': fx.pick('user'), 'email': f'bench-update-{fx.rng.randrange(10 ** 9)}@example.com'}),
+        Scenario('user_delete', 'DELETE', '/user/delete', json=lambda fx, row_id: {'id': row_id},
+                 prepare=lambda fx, count: new_users(fx, count, 'delete')),
+        Scenario('auth_register', 'POST', '/auth/register', json=lambda fx, i: {
+            'username': f'bench-register-{i}', 'email': f'bench-register-{i}@example.com', 'password': BENCH_PASSWORD
+        }, expect=(201,), max_iterations=SLOW_ITERATIONS),
+        Scenario('auth_login', 'POST', '/auth/login', json=lambda fx, i: {
+            'username': f"bench{fx.pick('user')}", 'password': BENCH_PASSWORD
+        }, max_iterations=SLOW_ITERATIONS),
+        Scenario('auth_logout', 'POST', '/auth/logout', auth=True, prepare=logout_tokens),
+        Scenario('auth_reset_password', 'POST', '/auth/reset-password', auth=True, prepare=user_tokens,
+                 json={'old_password': BENCH_PASSWORD, 'new_password': 'Bench@5678'},
+                 max_iterations=SLOW_ITERATIONS),
+        Scenario('invoice_create', 'POST', '/invoice/create', json=lambda fx, i: {
+            'user_id': fx.pick('user'), 'customer_id': fx.pick('customer'), 'total_amount': 12.5
+        }, expect=(201,)),
+        Scenario('invoice_update', 'PUT', '/invoice/update',
+                 json=lambda fx, i: {'id': fx.pick('invoice'), 'total_amount': fx.rng.randint(1, 500)}),
+        Scenario('invoice_delete', 'DELETE', '/invoice/delete',
+                 json=lambda fx, row_id: {'id': row_id}, prepare=new_invoices),
+        Scenario('invoice_line_create', 'POST', '/invoice_detail/create', json=lambda fx, i: {
+            'invoice_id': fx.pick('invoice'), 'product_id': fx.pick('product'), 'price': 2.5, 'qty': 2
+        }),
+        Scenario('invoice_line_update', 'PUT', '/invoice_detail/update',
+                 json=lambda fx, i: {'id': fx.pick('invoice_detail'), 'qty': fx.rng.randint(1, 5)}),
+        Scenario('invoice_line_delete', 'DELETE', '/invoice_detail/delete',
+                 json=lambda fx, row_id: {'id': row_id}, prepare=new_invoice_details),
+        Scenario('invoice_line_bulk_create', 'POST', '/invoice_detail/bulk/create', json=lambda fx, i: [
+            {'invoice_id': fx.pick('invoice'), 'product_id': fx.pick('product'), 'price': 2.5, 'qty': 2}
+            for _ in range(BULK_ROWS)
+        ], expect=(201,)),
+        Scenario('invoice_line_bulk_update', 'PUT', '/invoice_detail/bulk/update', json=lambda fx, i: [
+            {'id': row_id, 'qty': fx.rng.randint(1, 5)} for row_id in fx.pick_many('invoice_detail', BULK_ROWS)
+        ]),
+        Scenario('invoice_line_bulk_delete', 'DELETE', '/invoice_detail/bulk/delete',
+                 json=lambda fx, ids: ids, prepare=in_batches(new_invoice_details)),
+        Scenario('checkout', 'POST', '/checkout', json=lambda fx, i: {
+            'user_id': fx.pick('user'),
+            'items': [{'product_id': product_id, 'qty': fx.rng.randint(1, 3)}
+                      for product_id in fx.pick_many('product', fx.rng.randint(1, 8))]
+        }, expect=(201,)),
+    ]
+
+
+def all_scenarios():
+    return read_scenarios() + write_scenarios()
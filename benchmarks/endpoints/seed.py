@@ -0,0 +1,153 @@
+"""Synthetic catalog, customers and sales history at a given invoice count.
+
+Row ids are assigned here, and every value comes from one seeded
+``random.Random``, so the same ``--invoices``/``--seed`` pair always
+builds the same rows; dates are relative to when the seed ran.
+"""
+import os
+import random
+from datetime import datetime, timedelta
+
+from flask_migrate import upgrade
+from sqlalchemy import insert
+
+from app import app, db
+from models import Category, Customer, Invoice, InvoiceDetail, Product, User
+from models.customer import with_normalized
+from utils.passwords import password_hasher
+from utils.sales_rollup import rebuild_rollups
+
+
+MIGRATIONS_DIR = os.path.join(app.root_path, 'migrations')
+INSERT_CHUNK_SIZE = 10000
+HISTORY_DAYS = 365
+BENCH_PASSWORD = 'Bench@1234'
+
+# Lines per invoice and how often each count occurs: most sales are small
+# baskets with a long tail of big ones (mean a little over 4 lines)
+LINE_COUNTS = (1, 2, 3, 4, 5, 6, 8, 10, 15, 25)
+LINE_WEIGHTS = (18, 17, 15, 12, 10, 8, 8, 6, 4, 2)
+# completed / pending / cancelled, as in Invoice.status
+STATUS_WEIGHTS = (95, 3, 2)
+
+CATEGORY_NAMES = ('Beverages', 'Dairy', 'Bakery', 'Produce', 'Meat', 'Seafood', 'Frozen', 'Snacks',
+                  'Household', 'Personal Care', 'Baby', 'Pet', 'Canned', 'Condiments', 'Grains',
+                  'Breakfast', 'Health', 'Stationery', 'Electronics', 'Kitchen')
+PRODUCT_WORDS = ('Fresh', 'Organic', 'Classic', 'Premium', 'Lite', 'Family', 'Spicy', 'Sweet', 'Salted',
+                 'Green', 'Golden', 'Extra', 'Mini', 'Original', 'Royal', 'Smoked')
+PRODUCT_NOUNS = ('Milk', 'Bread', 'Rice', 'Noodles', 'Coffee', 'Tea', 'Juice', 'Water', 'Soap', 'Shampoo',
+                 'Chips', 'Cookies', 'Chocolate', 'Yogurt', 'Cheese', 'Eggs', 'Butter', 'Sugar', 'Salt',
+                 'Sauce', 'Oil', 'Beans', 'Soda', 'Tissue', 'Detergent', 'Cereal', 'Honey', 'Jam')
+PRODUCT_SIZES = ('100g', '250g', '500g', '1kg', '330ml', '500ml', '1L', '1.5L', '6 pack', '12 pack')
+FIRST_NAMES = ('Sok', 'Dara', 'Vanna', 'Srey', 'Chan', 'Bopha', 'Rith', 'Mony', 'Sophea', 'Kosal',
+               'Anna', 'James', 'Maria', 'David', 'Linh', 'Wei', 'Aisha', 'Omar', 'Nina', 'Tom')
+LAST_NAMES = ('Chea', 'Kim', 'Lim', 'Heng', 'Sok', 'Chan', 'Nguyen', 'Tran', 'Smith', 'Garcia',
+              'Lee', 'Wong', 'Patel', 'Khan', 'Brown', 'Meas', 'Ly', 'Tep', 'Ouk', 'Prak')
+
+
+class Scale:
+    """Row counts derived from the invoice count."""
+
+    def __init__(self, invoices):
+        self.invoices = invoices
+        self.categories = len(CATEGORY_NAMES)
+        self.users = 20
+        self.products = min(max(invoices // 50, 200), 20000)
+        self.customers = min(max(invoices // 10, 100), 100000)
+
+    def to_dict(self):
+        return dict(vars(self))
+
+
+def insert_chunked(table, rows):
+    """executemany ``rows`` (any iterable of dicts) in fixed-size chunks."""
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == INSERT_CHUNK_SIZE:
+            db.session.execute(insert(table), chunk)
+            chunk = []
+    if chunk:
+        db.session.execute(insert(table), chunk)
+
+
+def product_name(rng):
+    return f'{rng.choice(PRODUCT_WORDS)} {rng.choice(PRODUCT_NOUNS)} {rng.choice(PRODUCT_SIZES)}'
+
+
+def customer_fields(rng, customer_id):
+    first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+    return with_normalized({
+        'name': f'{first} {last}',
+        'email': f'{first}.{last}.{customer_id}@example.com'.lower(),
+        'phone': f'+855 {rng.randint(10, 99)} {rng.randint(100, 999)} {rng.randint(100, 999)}',
+    })
+
+
+def seed_database(scale, seed=0):
+    """Migrate an empty database and fill it according to ``scale``."""
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    history_start = now - timedelta(days=HISTORY_DAYS)
+
+    upgrade(directory=MIGRATIONS_DIR)
+
+    password = password_hasher.hash(BENCH_PASSWORD)
+    insert_chunked(User.__table__, (
+        {'id': i, 'username': f'bench{i}', 'email': f'bench{i}@example.com', 'password': password,
+         'role': 'admin' if i == 1 else 'user', 'created_at': history_start}
+        for i in range(1, scale.users + 1)
+    ))
+    insert_chunked(Category.__table__, (
+        {'id': i, 'name': name, 'created_at': history_start, 'updated_at': history_start}
+        for i, name in enumerate(CATEGORY_NAMES, 1)
+    ))
+
+    prices = {}
+
+    def products():
+        for i in range(1, scale.products + 1):
+            prices[i] = round(rng.uniform(0.25, 40.0), 2)
+            created_at = history_start + timedelta(seconds=rng.randrange(HISTORY_DAYS * 86400))
+            yield {'id': i, 'name': product_name(rng), 'price': prices[i], 'stock': 10 ** 9,
+                   'description': f'{rng.choice(PRODUCT_WORDS)} {rng.choice(PRODUCT_NOUNS).lower()} item',
+                   'category_id': rng.randint(1, scale.categories),
+                   'created_at': created_at, 'updated_at': created_at}
+
+    insert_chunked(Product.__table__, products())
+
+    def customers():
+        for i in range(1, scale.customers + 1):
+            created_at = history_start + timedelta(seconds=rng.randrange(HISTORY_DAYS * 86400))
+            yield dict(customer_fields(rng, i), id=i, created_at=created_at, updated_at=created_at)
+
+    insert_chunked(Customer.__table__, customers())
+
+    # Invoices and their lines are generated together so totals match; each
+    # chunk of invoices is written before the lines that point at it
+    detail_id = 0
+    for first in range(1, scale.invoices + 1, INSERT_CHUNK_SIZE):
+        invoices, details = [], []
+        for i in range(first, min(first + INSERT_CHUNK_SIZE, scale.invoices + 1)):
+            total = 0.0
+            lines = rng.choices(LINE_COUNTS, LINE_WEIGHTS)[0]
+            for product_id in rng.sample(range(1, scale.products + 1), lines):
+                qty = rng.randint(1, 5)
+                line_total = round(prices[product_id] * qty, 2)
+                detail_id += 1
+                details.append({'id': detail_id, 'invoice_id': i, 'product_id': product_id,
+                                'price': prices[product_id], 'qty': qty, 'total': line_total})
+                total += line_total
+            invoices.append({
+                'id': i,
+                'user_id': rng.randint(1, scale.users),
+                'customer_id': rng.randint(1, scale.customers) if rng.random() < 0.7 else None,
+                'total_amount': round(total, 2),
+                'date_time': now - timedelta(seconds=rng.randrange(HISTORY_DAYS * 86400)),
+                'status': rng.choices(('completed', 'pending', 'cancelled'), STATUS_WEIGHTS)[0],
+            })
+        insert_chunked(Invoice.__table__, invoices)
+        insert_chunked(InvoiceDetail.__table__, details)
+    db.session.commit()
+
+    rebuild_rollups()
@@ -0,0 +1,104 @@
+"""Measure login throughput through the password hashing pool.
+
+Usage: python -m benchmarks.passwords [--logins 200] [--clients 16] [--method scrypt]
+
+Prints raw hashes per second on one thread, logins per second through
+POST /auth/login with concurrent clients, and that rate divided by the
+cores the pool can use. Also reports how many logins were shed with 503.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+db_file = os.path.join(tempfile.mkdtemp(), 'bench_passwords.db')
+os.environ['DATABASE_URL'] = f'sqlite:///{db_file}'
+
+parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+parser.add_argument('--logins', type=int, default=200)
+parser.add_argument('--clients', type=int, default=16)
+parser.add_argument('--method', default=None, help='PASSWORD_HASH_METHOD to benchmark')
+args = parser.parse_args()
+if args.method:
+    os.environ['PASSWORD_HASH_METHOD'] = args.method
+
+from werkzeug.security import check_password_hash
+
+from app import app, db
+from models import User
+from utils.passwords import password_hasher
+
+
+PASSWORD = 'Bench@1234'
+
+
+def seed(users):
+    db.create_all()
+    stored = password_hasher.hash(PASSWORD)
+    db.session.add_all([
+        User(username=f'cashier{i}', email=f'cashier{i}@example.com', password=stored)
+        for i in range(users)
+    ])
+    db.session.commit()
+    return stored
+
+
+def raw_rate(stored, seconds=2.0):
+    count = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        check_password_hash(stored, PASSWORD)
+        count += 1
+    return count / (time.perf_counter() - start)
+
+
+def login_storm(logins, clients, users):
+    statuses = []
+    lock = threading.Lock()
+    todo = iter(range(logins))
+
+    def worker():
+        client = app.test_client()
+        while True:
+            with lock:
+                i = next(todo, None)
+            if i is None:
+                return
+            response = client.post('/auth/login', json={'username': f'cashier{i % users}', 'password': PASSWORD})
+            with lock:
+                statuses.append(response.status_code)
+
+    threads = [threading.Thread(target=worker) for _ in range(clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return statuses, time.perf_counter() - start
+
+
+def main():
+    users = min(args.logins, 50)
+    with app.app_context():
+        stored = seed(users)
+    cores = min(app.config['PASSWORD_HASH_WORKERS'], os.cpu_count() or 1)
+    print(f'method: {password_hasher.method_prefix}, pool: {app.config["PASSWORD_HASH_WORKERS"]} workers '
+          f'+ {app.config["PASSWORD_HASH_QUEUE"]} queued, {os.cpu_count()} cpus')
+
+    single = raw_rate(stored)
+    print(f'raw verify, 1 thread:   {single:8.1f} hashes/s')
+
+    statuses, elapsed = login_storm(args.logins, args.clients, users)
+    ok = statuses.count(200)
+    shed = statuses.count(503)
+    print(f'login, {args.clients} clients:     {ok / elapsed:8.1f} logins/s '
+          f'({ok} ok, {shed} shed with 503, {elapsed:.2f}s)')
+    print(f'per core ({cores} used):      {ok / elapsed / cores:8.1f} logins/s/core')
+    if len(statuses) != args.logins or ok + shed != args.logins:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+"""Check read-replica routing against two SQLite files.
+
+Usage: python -m benchmarks.replica_routing
+
+Seeds a primary database, copies it to a second file that stands in for
+the replica and changes one row there, so every response shows which
+database it was read from. Exits non-zero if a request read from the
+wrong one.
+"""
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+
+work_dir = tempfile.mkdtemp()
+primary_file = os.path.join(work_dir, 'primary.db')
+replica_file = os.path.join(work_dir, 'replica.db')
+os.environ['DATABASE_URL'] = f'sqlite:///{primary_file}'
+os.environ['REPLICA_DATABASE_URL'] = f'sqlite:///{replica_file}'
+
+from flask import jsonify
+from sqlalchemy import text
+
+from app import app, db
+from models import Category
+
+
+@app.get('/_check/read-your-writes')
+def check_read_your_writes():
+    before = db.session.execute(text('SELECT name FROM category WHERE id = 1')).scalar()
+    db.session.get(Category, 1).name = 'Written'
+    db.session.flush()
+    after = db.session.execute(text('SELECT name FROM category WHERE id = 1')).scalar()
+    db.session.rollback()
+    again = db.session.execute(text('SELECT name FROM category WHERE id = 1')).scalar()
+    return jsonify({'before': before, 'after': after, 'after_rollback': again})
+
+
+def seed():
+    with app.app_context():
+        db.create_all()
+        db.session.add(Category(name='Primary'))
+        db.session.commit()
+        db.engine.dispose()
+    with sqlite3.connect(primary_file) as conn:
+        conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+    shutil.copyfile(primary_file, replica_file)
+    with sqlite3.connect(replica_file) as conn:
+        conn.execute("UPDATE category SET name = 'Replica' WHERE id = 1")
+
+
+def names(path):
+    with sqlite3.connect(path) as conn:
+        return [row[0] for row in conn.execute('SELECT name FROM category ORDER BY id')]
+
+
+def main():
+    seed()
+    client = app.test_client()
+    failures = []
+
+    def expect(label, actual, expected):
+        status = 'ok' if actual == expected else 'FAIL'
+        print(f'{status:4}  {label}: {actual!r}')
+        if actual != expected:
+            failures.append(label)
+
+    expect('GET detail reads the replica', client.get('/category/id/1').get_json()['name'], 'Replica')
+    expect('GET list reads the replica',
+           [c['name'] for c in client.get('/category/list').get_json()['categories']], ['Replica'])
+
+    created = client.post('/category/create', json={'name': 'Created'})
+    expect('POST returns 201', created.status_code, 201)
+    expect('POST wrote to the primary', names(primary_file), ['Primary', 'Created'])
+    expect('POST left the replica alone', names(replica_file), ['Replica'])
+
+    pinned = client.get('/_check/read-your-writes').get_json()
+    expect('read before a write uses the replica', pinned['before'], 'Replica')
+    expect('read after a write uses the primary', pinned['after'], 'Written')
+    expect('session stays pinned after rollback', pinned['after_rollback'], 'Primary')
+    expect('next GET is back on the replica', client.get('/category/id/1').get_json()['name'], 'Replica')
+
+    with app.app_context():
+        name = db.session.execute(text('SELECT name FROM category WHERE id = 1')).scalar()
+    expect('outside a request reads the primary', name, 'Primary')
+
+    shutil.rmtree(work_dir, ignore_errors=True)
+    if failures:
+        print(f'{len(failures)} check(s) failed')
+        sys.exit(1)
+    print('all checks passed')
+
+
+if __name__ == '__main__':
+    main()
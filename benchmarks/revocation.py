@@ -0,0 +1,96 @@
+"""Measure the cost of the revoked-token check on authenticated requests.
+
+Usage: python -m benchmarks.revocation [--requests 5000] [--revoked 100000]
+
+Times a trivial @jwt_required endpoint three ways: no revocation check,
+the in-memory revocation list, and a naive per-request database lookup,
+then the in-memory check on its own.
+"""
+import argparse
+import os
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+db_file = os.path.join(tempfile.mkdtemp(), 'bench_revocation.db')
+os.environ['DATABASE_URL'] = f'sqlite:///{db_file}'
+
+from flask import jsonify
+from flask_jwt_extended import create_access_token, jwt_required
+from sqlalchemy import insert, select
+
+from app import app, db, jwt
+from models import RevokedToken
+from utils.revocation import check_if_token_revoked, revocation_list
+
+
+@app.get('/_bench/protected')
+@jwt_required()
+def bench_protected():
+    return jsonify({'ok': True})
+
+
+def seed(revoked):
+    db.create_all()
+    expires_at = datetime.utcnow() + timedelta(hours=1)
+    rows = [{'jti': str(uuid.uuid4()), 'expires_at': expires_at, 'revoked_at': datetime.utcnow()}
+            for _ in range(revoked)]
+    for start in range(0, len(rows), 5000):
+        db.session.execute(insert(RevokedToken), rows[start:start + 5000])
+    db.session.commit()
+    return create_access_token(identity={'id': 1, 'username': 'bench', 'role': 'user'})
+
+
+def naive_check(jwt_header, jwt_payload):
+    return db.session.execute(
+        select(RevokedToken.id).where(RevokedToken.jti == jwt_payload['jti'])
+    ).first() is not None
+
+
+def run(label, client, token, requests):
+    headers = {'Authorization': f'Bearer {token}'}
+    for _ in range(50):
+        client.get('/_bench/protected', headers=headers)
+    start = time.perf_counter()
+    for _ in range(requests):
+        response = client.get('/_bench/protected', headers=headers)
+        assert response.status_code == 200, response.get_json()
+    elapsed = time.perf_counter() - start
+    per_request = elapsed / requests * 1e6
+    print(f'{label:<14} {requests / elapsed:8.0f} req/s  {per_request:7.1f} us/request')
+    return per_request
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=5000)
+    parser.add_argument('--revoked', type=int, default=100000)
+    args = parser.parse_args()
+
+    with app.app_context():
+        token = seed(args.revoked)
+        revocation_list.refresh()
+    client = app.test_client()
+    print(f'{args.revoked} revoked tokens')
+
+    jwt.token_in_blocklist_loader(lambda jwt_header, jwt_payload: False)
+    baseline = run('no check', client, token, args.requests)
+    jwt.token_in_blocklist_loader(check_if_token_revoked)
+    memory = run('in-memory', client, token, args.requests)
+    jwt.token_in_blocklist_loader(naive_check)
+    naive = run('db per request', client, token, args.requests)
+    jwt.token_in_blocklist_loader(check_if_token_revoked)
+
+    print(f'overhead: in-memory {memory - baseline:+.1f} us, db per request {naive - baseline:+.1f} us')
+
+    with app.app_context():
+        calls = 1000000
+        start = time.perf_counter()
+        for _ in range(calls):
+            revocation_list.is_revoked('not-revoked')
+        print(f'is_revoked() alone: {(time.perf_counter() - start) / calls * 1e9:.0f} ns/call')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+"""Mixed read/write throughput against one SQLite file from several processes.
+
+Usage: python -m benchmarks.sqlite_concurrency [--readers 4] [--writers 4] [--seconds 5]
+
+Runs the same workload twice on a fresh database, first with SQLITE_TUNE=0
+(driver defaults: rollback journal, no busy_timeout pragma) and then with
+the tuned settings from utils/engine.py. Readers page through
+/invoice/list; writers post three-line sales to /checkout. Each process is a
+separate interpreter, as under a multi-worker WSGI server.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+
+def worker(role, seconds):
+    from app import app
+
+    client = app.test_client()
+    counts = {'ok': 0, 'error': 0}
+    deadline = time.perf_counter() + seconds
+    i = 0
+    while time.perf_counter() < deadline:
+        i += 1
+        if role == 'reader':
+            response = client.get('/invoice/list?limit=50')
+        else:
+            response = client.post('/checkout', json={
+                'user_id': 1,
+                'items': [{'product_id': (i + n) % 100 + 1, 'qty': 1} for n in range(3)]
+            })
+        counts['ok' if response.status_code < 400 else 'error'] += 1
+    print(json.dumps(counts))
+
+
+def seed():
+    from app import app, db
+    from models import Category, Product, User
+
+    with app.app_context():
+        db.create_all()
+        db.session.add(User(id=1, username='bench', email='bench@example.com', password='x'))
+        db.session.add(Category(id=1, name='bench'))
+        db.session.add_all([
+            Product(id=i, name=f'product {i}', price=1.25, stock=10 ** 9, category_id=1)
+            for i in range(1, 101)
+        ])
+        db.session.commit()
+
+
+def run(tune, args):
+    env = dict(os.environ, SQLITE_TUNE=tune, REPORT_CACHE_TTL='0',
+               DATABASE_URL=f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}")
+    command = [sys.executable, '-m', 'benchmarks.sqlite_concurrency']
+    subprocess.run(command + ['--role', 'seed'], env=env, check=True)
+
+    roles = ['reader'] * args.readers + ['writer'] * args.writers
+    procs = [
+        (role, subprocess.Popen(command + ['--role', role, '--seconds', str(args.seconds)],
+                                env=env, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True))
+        for role in roles
+    ]
+    totals = {'reader': {'ok': 0, 'error': 0}, 'writer': {'ok': 0, 'error': 0}}
+    for role, proc in procs:
+        out, _ = proc.communicate()
+        counts = json.loads(out.strip().splitlines()[-1])
+        for key in counts:
+            totals[role][key] += counts[key]
+
+    label = 'tuned' if tune == '1' else 'defaults'
+    for role in ('reader', 'writer'):
+        if role not in roles:
+            continue
+        ok, errors = totals[role]['ok'], totals[role]['error']
+        print(f'{label:<9} {role}s: {ok / args.seconds:8.1f} ok/s  {errors:5d} errors')
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--writers', type=int, default=4)
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--role', choices=['seed', 'reader', 'writer'], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.role == 'seed':
+        return seed()
+    if args.role:
+        return worker(args.role, args.seconds)
+
+    before = run('0', args)
+    after = run('1', args)
+    for role in ('reader', 'writer'):
+        if before[role]['ok']:
+            print(f'{role} throughput: {after[role]["ok"] / before[role]["ok"]:.2f}x')
+
+
+if __name__ == '__main__':
+    main()
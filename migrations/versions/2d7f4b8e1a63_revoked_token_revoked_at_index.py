@@ -0,0 +1,26 @@
+"""revoked_token revoked_at index
+
+Revision ID: 2d7f4b8e1a63
+Revises: 6c2e9a4f8b15
+Create Date: 2026-10-18 18:04:12.310572
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2d7f4b8e1a63'
+down_revision = '6c2e9a4f8b15'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('revoked_token', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_revoked_token_revoked_at'), ['revoked_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('revoked_token', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_revoked_token_revoked_at'))
@@ -0,0 +1,75 @@
+"""sales_rollups
+
+Revision ID: 3f1c9a7d52e4
+Revises: b8af6b03d186
+Create Date: 2026-10-18 09:12:40.512306
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f1c9a7d52e4'
+down_revision = 'b8af6b03d186'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('product_daily_sales',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('product_id', sa.Integer(), nullable=False),
+    sa.Column('qty', sa.Integer(), nullable=False),
+    sa.Column('total_sales', sa.Float(), nullable=False),
+    sa.Column('lines', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['product_id'], ['product.id'], ),
+    sa.PrimaryKeyConstraint('day', 'product_id')
+    )
+    op.create_table('category_daily_sales',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('category_id', sa.Integer(), nullable=False),
+    sa.Column('total_sales', sa.Float(), nullable=False),
+    sa.Column('lines', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['category_id'], ['category.id'], ),
+    sa.PrimaryKeyConstraint('day', 'category_id')
+    )
+    op.create_table('user_daily_sales',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('total_invoices', sa.Integer(), nullable=False),
+    sa.Column('total_sales', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('day', 'user_id')
+    )
+    # Backfill from existing invoices; `flask rebuild-rollups` does the same
+    op.execute("""
+        INSERT INTO product_daily_sales (day, product_id, qty, total_sales, lines)
+        SELECT date(invoice.date_time), invoice_detail.product_id,
+               SUM(invoice_detail.qty), SUM(invoice_detail.total), COUNT(*)
+        FROM invoice_detail JOIN invoice ON invoice.id = invoice_detail.invoice_id
+        WHERE invoice.status = 'completed' AND invoice.date_time IS NOT NULL
+        GROUP BY date(invoice.date_time), invoice_detail.product_id
+    """)
+    op.execute("""
+        INSERT INTO category_daily_sales (day, category_id, total_sales, lines)
+        SELECT date(invoice.date_time), product.category_id, SUM(invoice_detail.total), COUNT(*)
+        FROM invoice_detail
+        JOIN invoice ON invoice.id = invoice_detail.invoice_id
+        JOIN product ON product.id = invoice_detail.product_id
+        WHERE invoice.status = 'completed' AND invoice.date_time IS NOT NULL
+        GROUP BY date(invoice.date_time), product.category_id
+    """)
+    op.execute("""
+        INSERT INTO user_daily_sales (day, user_id, total_invoices, total_sales)
+        SELECT date(invoice.date_time), invoice.user_id, COUNT(*), SUM(invoice.total_amount)
+        FROM invoice
+        WHERE invoice.status = 'completed' AND invoice.date_time IS NOT NULL
+        GROUP BY date(invoice.date_time), invoice.user_id
+    """)
+
+
+def downgrade():
+    op.drop_table('user_daily_sales')
+    op.drop_table('category_daily_sales')
+    op.drop_table('product_daily_sales')
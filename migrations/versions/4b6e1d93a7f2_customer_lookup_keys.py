@@ -0,0 +1,53 @@
+"""customer_lookup_keys
+
+Revision ID: 4b6e1d93a7f2
+Revises: 9d0b7e5a1c38
+Create Date: 2026-10-18 13:20:44.502716
+
+"""
+import re
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4b6e1d93a7f2'
+down_revision = '9d0b7e5a1c38'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('customer', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('phone_norm', sa.String(length=20), nullable=True))
+        batch_op.add_column(sa.Column('email_norm', sa.String(length=120), nullable=True))
+        batch_op.add_column(sa.Column('name_norm', sa.String(length=100), nullable=True))
+        batch_op.create_index(batch_op.f('ix_customer_phone_norm'), ['phone_norm'], unique=False)
+        batch_op.create_index(batch_op.f('ix_customer_email_norm'), ['email_norm'], unique=False)
+        batch_op.create_index(batch_op.f('ix_customer_name_norm'), ['name_norm'], unique=False)
+
+    # Same rules as models.customer.normalize_*
+    conn = op.get_bind()
+    rows = conn.execute(sa.text('SELECT id, name, email, phone FROM customer')).fetchall()
+    if not rows:
+        return
+    conn.execute(
+        sa.text('UPDATE customer SET phone_norm = :phone, email_norm = :email, name_norm = :name WHERE id = :id'),
+        [{
+            'id': row.id,
+            'phone': re.sub(r'\D', '', row.phone or '') or None,
+            'email': (row.email or '').strip().lower() or None,
+            'name': ' '.join((row.name or '').lower().split()) or None,
+        } for row in rows]
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('customer', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_customer_name_norm'))
+        batch_op.drop_index(batch_op.f('ix_customer_email_norm'))
+        batch_op.drop_index(batch_op.f('ix_customer_phone_norm'))
+        batch_op.drop_column('name_norm')
+        batch_op.drop_column('email_norm')
+        batch_op.drop_column('phone_norm')
@@ -0,0 +1,30 @@
+"""table_change
+
+Revision ID: 5e9c1a3f7b20
+Revises: 2d7f4b8e1a63
+Create Date: 2026-10-18 18:31:47.902114
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5e9c1a3f7b20'
+down_revision = '2d7f4b8e1a63'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('table_change',
+    sa.Column('name', sa.String(length=64), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.Column('row_ids', sa.Text(), nullable=True),
+    sa.Column('membership_changed', sa.Boolean(), nullable=False),
+    sa.PrimaryKeyConstraint('name', 'version')
+    )
+
+
+def downgrade():
+    op.drop_table('table_change')
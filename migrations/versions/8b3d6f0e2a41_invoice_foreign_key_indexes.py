@@ -0,0 +1,29 @@
+"""invoice foreign key indexes
+
+Revision ID: 8b3d6f0e2a41
+Revises: 5e9c1a3f7b20
+Create Date: 2026-10-18 18:52:09.117364
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8b3d6f0e2a41'
+down_revision = '5e9c1a3f7b20'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Deleting a user or customer looks up (and on SQLite, FK-checks) their invoices
+    with op.batch_alter_table('invoice', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_invoice_customer_id'), ['customer_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_invoice_user_id'), ['user_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('invoice', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_invoice_user_id'))
+        batch_op.drop_index(batch_op.f('ix_invoice_customer_id'))
@@ -0,0 +1,60 @@
+"""product_search
+
+Revision ID: 9d0b7e5a1c38
+Revises: e83b1f4c7d25
+Create Date: 2026-10-18 12:41:07.318245
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9d0b7e5a1c38'
+down_revision = 'e83b1f4c7d25'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    # prefix='2 3' stores short prefixes so type-ahead queries stay index lookups
+    op.execute("""
+        CREATE VIRTUAL TABLE product_fts USING fts5(
+            name, description,
+            content='product', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2',
+            prefix='2 3'
+        )
+    """)
+    op.execute("""
+        CREATE TRIGGER product_fts_ai AFTER INSERT ON product BEGIN
+            INSERT INTO product_fts(rowid, name, description)
+            VALUES (new.id, new.name, new.description);
+        END
+    """)
+    op.execute("""
+        CREATE TRIGGER product_fts_ad AFTER DELETE ON product BEGIN
+            INSERT INTO product_fts(product_fts, rowid, name, description)
+            VALUES ('delete', old.id, old.name, old.description);
+        END
+    """)
+    op.execute("""
+        CREATE TRIGGER product_fts_au AFTER UPDATE OF name, description ON product BEGIN
+            INSERT INTO product_fts(product_fts, rowid, name, description)
+            VALUES ('delete', old.id, old.name, old.description);
+            INSERT INTO product_fts(rowid, name, description)
+            VALUES (new.id, new.name, new.description);
+        END
+    """)
+    op.execute("INSERT INTO product_fts(product_fts) VALUES('rebuild')")
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    op.execute('DROP TRIGGER IF EXISTS product_fts_au')
+    op.execute('DROP TRIGGER IF EXISTS product_fts_ad')
+    op.execute('DROP TRIGGER IF EXISTS product_fts_ai')
+    op.execute('DROP TABLE IF EXISTS product_fts')
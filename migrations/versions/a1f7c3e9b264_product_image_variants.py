@@ -0,0 +1,30 @@
+"""product_image_variants
+
+Revision ID: a1f7c3e9b264
+Revises: 4b6e1d93a7f2
+Create Date: 2026-10-18 13:52:19.774031
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a1f7c3e9b264'
+down_revision = '4b6e1d93a7f2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('product', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('image_thumb', sa.String(length=255), nullable=True))
+        batch_op.add_column(sa.Column('image_medium', sa.String(length=255), nullable=True))
+        batch_op.add_column(sa.Column('image_status', sa.String(length=20), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('product', schema=None) as batch_op:
+        batch_op.drop_column('image_status')
+        batch_op.drop_column('image_medium')
+        batch_op.drop_column('image_thumb')
@@ -0,0 +1,33 @@
+"""table_version
+
+Revision ID: c52d8e1f6a90
+Revises: 7a4e2c91b0d3
+Create Date: 2026-10-18 11:26:53.880417
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c52d8e1f6a90'
+down_revision = '7a4e2c91b0d3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    table_version = op.create_table('table_version',
+    sa.Column('name', sa.String(length=64), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+    op.bulk_insert(table_version, [
+        {'name': 'product', 'version': 0},
+        {'name': 'category', 'version': 0},
+        {'name': 'customer', 'version': 0},
+    ])
+
+
+def downgrade():
+    op.drop_table('table_version')
@@ -0,0 +1,46 @@
+"""image_blobs
+
+Revision ID: d4a8f2b61e07
+Revises: a1f7c3e9b264
+Create Date: 2026-10-18 14:31:52.190348
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd4a8f2b61e07'
+down_revision = 'a1f7c3e9b264'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('image_blob',
+    sa.Column('path', sa.String(length=255), nullable=False),
+    sa.Column('sha256', sa.String(length=64), nullable=True),
+    sa.Column('ref_count', sa.Integer(), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('path')
+    )
+    with op.batch_alter_table('product', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('image_full', sa.String(length=255), nullable=True))
+        batch_op.create_index(batch_op.f('ix_product_image'), ['image'], unique=False)
+
+    # Existing uploads become blobs under their old names; run
+    # `flask build-image-variants` to give them the full-size variant
+    op.execute("""
+        INSERT INTO image_blob (path, ref_count, status, created_at)
+        SELECT image, COUNT(*), NULL, CURRENT_TIMESTAMP FROM product
+        WHERE image IS NOT NULL GROUP BY image
+    """)
+
+
+def downgrade():
+    with op.batch_alter_table('product', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_product_image'))
+        batch_op.drop_column('image_full')
+
+    op.drop_table('image_blob')
@@ -3,4 +3,10 @@ from models.product import *
 from models.customer import *
 from  models.invoice import *
 from models.invoice_detail import *
-from models.category import *
\ No newline at end of file
+from models.category import *
+from models.sales_rollup import *
+from models.table_version import *
+from models.table_change import *
+from models.tombstone import *
+from models.image_blob import *
+from models.revoked_token import *
\ No newline at end of file
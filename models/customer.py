@@ -1,10 +1,62 @@
+import re
 from datetime import datetime
+from sqlalchemy.orm import validates
 from app import db
 
+
+# The normalizers take whatever JSON sent (a number for a phone, say) and
+# compare its text, as the columns store it
+def normalize_phone(value):
+    """Digits only, so '+855 12-345 678' and '85512345678' match."""
+    if not value:
+        return None
+    return re.sub(r'\D', '', str(value)) or None
+
+
+def normalize_email(value):
+    if not value:
+        return None
+    return str(value).strip().lower() or None
+
+
+def normalize_name(value):
+    if not value:
+        return None
+    return ' '.join(str(value).lower().split()) or None
+
+
+NORMALIZERS = {
+    'phone': ('phone_norm', normalize_phone),
+    'email': ('email_norm', normalize_email),
+    'name': ('name_norm', normalize_name),
+}
+
+
+def with_normalized(fields):
+    """Add the ``*_norm`` lookup columns for a Core insert/update dict."""
+    fields = dict(fields)
+    for field, (column, normalize) in NORMALIZERS.items():
+        if field in fields:
+            fields[column] = normalize(fields[field])
+    return fields
+
+
 class Customer(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
     phone = db.Column(db.String(20))
-    email = db.Column(db.String(120))
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    email = db.Column(db.String(120), index=True)
+    # Lookup keys for /customer/lookup and duplicate checks, kept in step with
+    # the columns above by validates() and with_normalized()
+    phone_norm = db.Column(db.String(20), index=True)
+    email_norm = db.Column(db.String(120), index=True)
+    name_norm = db.Column(db.String(100), index=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
     invoices = db.relationship('Invoice', backref='customer', lazy=True)
+
+    @validates('name', 'email', 'phone')
+    def _normalize(self, key, value):
+        column, normalize = NORMALIZERS[key]
+        setattr(self, column, normalize(value))
+        return value
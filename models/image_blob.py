@@ -0,0 +1,12 @@
+from datetime import datetime
+from app import db
+
+
+class ImageBlob(db.Model):
+    """An uploaded image file stored once under its content hash, with the
+    number of products pointing at it."""
+    path = db.Column(db.String(255), primary_key=True)
+    sha256 = db.Column(db.String(64))  # NULL for files uploaded before hashing
+    ref_count = db.Column(db.Integer, nullable=False, default=0)
+    status = db.Column(db.String(20))  # variant build: pending, ready, failed
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -3,9 +3,15 @@ from app import db
 
 class Invoice(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
-    customer_id = db.Column(db.Integer, db.ForeignKey('customer.id'), nullable=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False, index=True)
+    customer_id = db.Column(db.Integer, db.ForeignKey('customer.id'), nullable=True, index=True)
     total_amount = db.Column(db.Float, nullable=False)
     date_time = db.Column(db.DateTime, default=datetime.utcnow)
     status = db.Column(db.String(20), default='completed')  # completed, pending, cancelled
-    invoice_details = db.relationship('InvoiceDetail', backref='invoice', lazy=True)
\ No newline at end of file
+    invoice_details = db.relationship('InvoiceDetail', backref='invoice', lazy=True)
+
+    __table_args__ = (
+        # Covers the period report SUM/COUNT without touching the table
+        db.Index('ix_invoice_status_date_time', 'status', 'date_time', 'total_amount'),
+        db.Index('ix_invoice_date_time', 'date_time'),
+    )
\ No newline at end of file
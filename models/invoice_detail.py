@@ -2,8 +2,8 @@ from app import db
 
 class InvoiceDetail(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    invoice_id = db.Column(db.Integer, db.ForeignKey('invoice.id'), nullable=False)
-    product_id = db.Column(db.Integer, db.ForeignKey('product.id'), nullable=False)
+    invoice_id = db.Column(db.Integer, db.ForeignKey('invoice.id'), nullable=False, index=True)
+    product_id = db.Column(db.Integer, db.ForeignKey('product.id'), nullable=False, index=True)
     price = db.Column(db.Float, nullable=False)
     qty = db.Column(db.Integer, nullable=False)
     total = db.Column(db.Float, nullable=False)
@@ -7,7 +7,14 @@ class Product(db.Model):
     price = db.Column(db.Float, nullable=False)
     stock = db.Column(db.Integer, default=0)
     description = db.Column(db.Text)
-    category_id = db.Column(db.Integer, db.ForeignKey('category.id'),nullable=False)  # FIXED: Changed 'categories.id' to 'category.id'
-    image = db.Column(db.String(255))
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    category_id = db.Column(db.Integer, db.ForeignKey('category.id'),nullable=False, index=True)  # FIXED: Changed 'categories.id' to 'category.id'
+    image = db.Column(db.String(255), index=True)  # image_blob.path, shared between products
+    # Metadata-free WebP variants built in the background; image_status is
+    # 'pending' until the worker finishes ('ready') or gives up ('failed')
+    image_full = db.Column(db.String(255))
+    image_thumb = db.Column(db.String(255))
+    image_medium = db.Column(db.String(255))
+    image_status = db.Column(db.String(20))
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
     invoice_details = db.relationship('InvoiceDetail', backref='product', lazy=True)
\ No newline at end of file
@@ -0,0 +1,11 @@
+from datetime import datetime
+from app import db
+
+
+class RevokedToken(db.Model):
+    """A JWT that was logged out before it expired. Workers pick up new
+    entries by ``revoked_at``; expired ones are purged."""
+    id = db.Column(db.Integer, primary_key=True)
+    jti = db.Column(db.String(36), nullable=False, unique=True)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+    revoked_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False, index=True)
@@ -0,0 +1,27 @@
+from app import db
+
+# Per-day sales rollups maintained by utils/sales_rollup.py. ``lines`` and
+# ``total_invoices`` count contributing rows so a bucket can be dropped once
+# everything in it has been cancelled or deleted.
+
+
+class ProductDailySales(db.Model):
+    day = db.Column(db.Date, primary_key=True)
+    product_id = db.Column(db.Integer, db.ForeignKey('product.id'), primary_key=True, index=True)
+    qty = db.Column(db.Integer, nullable=False, default=0)
+    total_sales = db.Column(db.Float, nullable=False, default=0)
+    lines = db.Column(db.Integer, nullable=False, default=0)
+
+
+class CategoryDailySales(db.Model):
+    day = db.Column(db.Date, primary_key=True)
+    category_id = db.Column(db.Integer, db.ForeignKey('category.id'), primary_key=True)
+    total_sales = db.Column(db.Float, nullable=False, default=0)
+    lines = db.Column(db.Integer, nullable=False, default=0)
+
+
+class UserDailySales(db.Model):
+    day = db.Column(db.Date, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    total_invoices = db.Column(db.Integer, nullable=False, default=0)
+    total_sales = db.Column(db.Float, nullable=False, default=0)
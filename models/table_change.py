@@ -0,0 +1,11 @@
+from app import db
+
+
+class TableChange(db.Model):
+    """The rows one ``table_version`` bump touched, so other workers can drop
+    just those from their caches. ``row_ids`` is a JSON list, NULL when the
+    whole table changed. Only the latest versions are kept."""
+    name = db.Column(db.String(64), primary_key=True)
+    version = db.Column(db.Integer, primary_key=True)
+    row_ids = db.Column(db.Text)
+    membership_changed = db.Column(db.Boolean, nullable=False, default=False)
@@ -0,0 +1,7 @@
+from app import db
+
+
+class TableVersion(db.Model):
+    """Change counter per table, bumped in the same transaction as the write."""
+    name = db.Column(db.String(64), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
@@ -0,0 +1,10 @@
+from datetime import datetime
+from app import db
+
+
+class Tombstone(db.Model):
+    """Deleted row marker so offline terminals can sync deletes."""
+    id = db.Column(db.Integer, primary_key=True)
+    table_name = db.Column(db.String(64), nullable=False)
+    row_id = db.Column(db.Integer, nullable=False)
+    deleted_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False, index=True)
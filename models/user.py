@@ -1,6 +1,6 @@
 from datetime import datetime
-from werkzeug.security import generate_password_hash, check_password_hash
 from app import db
+from utils.passwords import password_hasher
 
 class User(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -8,14 +8,19 @@ class User(db.Model):
     email = db.Column(db.String(120), unique=True, nullable=False)
     password = db.Column(db.String(255), nullable=False)
     role = db.Column(db.String(20), default='user')
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
     invoices = db.relationship('Invoice', backref='user', lazy=True)
 
     def set_password(self, password):
-        self.password = generate_password_hash(password)
+        self.password = password_hasher.hash(password)
 
     def check_password(self, password):
-        return check_password_hash(self.password, password)
+        """Verify ``password``; on success a hash made with an older method
+        or cost is replaced, and the caller's commit stores it."""
+        ok, new_hash = password_hasher.verify(self.password, password)
+        if new_hash:
+            self.password = new_hash
+        return ok
 
     def to_dict(self):
         return {
@@ -4,5 +4,7 @@ from routes.customer import *
 from routes.invoice_detail import *
 from routes.product import *
 from routes.invoice import *
+from routes.checkout import *
+from routes.sync import *
 from routes.report import *
 from routes.auth import *
\ No newline at end of file
@@ -1,7 +1,10 @@
 from flask import request, jsonify
-from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
+from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity, get_jwt
 from app import app,db
 from models import User
+from utils.passwords import PasswordHasherBusy
+from utils.revocation import revocation_list
+from utils.roles import DEFAULT_ROLE, may_assign_role
 
 
 
@@ -16,10 +19,14 @@ def register():
     if User.query.filter_by(email=data['email']).first():
         return jsonify({'error': 'Email already exists'}), 400
 
+    role = data.get('role') or DEFAULT_ROLE
+    if not may_assign_role(role):
+        return jsonify({'error': 'Only an admin can assign roles'}), 403
+
     user = User(
         username=data['username'],
         email=data['email'],
-        role=data.get('role', 'user')
+        role=role
     )
     user.set_password(data['password'])
 
@@ -48,6 +55,8 @@ def login():
 
         if not user or not user.check_password(data['password']):
             return jsonify({'error': 'Invalid username or password'}), 401
+        if user in db.session.dirty:
+            db.session.commit()  # password hash upgraded to the current method
 
         access_token = create_access_token(
             identity={
@@ -61,6 +70,8 @@ def login():
             'access_token': access_token,
             'user': user.to_dict()
         })
+    except PasswordHasherBusy:
+        raise
     except Exception as e:
         return jsonify({'error': 'Login failed', 'details': str(e)}), 500
 
@@ -70,6 +81,8 @@ def login():
 def logout():
     try:
         current_user = get_jwt_identity()
+        token = get_jwt()
+        revocation_list.revoke(token['jti'], token['exp'])
         return jsonify({
             'message': 'Logout successful',
             'username': current_user.get('username')
@@ -102,6 +115,9 @@ def reset_password():
         db.session.commit()
 
         return jsonify({'message': 'Password reset successfully'})
+    except PasswordHasherBusy:
+        db.session.rollback()
+        raise
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': 'Password reset failed', 'details': str(e)}), 500
\ No newline at end of file
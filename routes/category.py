@@ -1,18 +1,29 @@
 from app import db, app
 from flask import jsonify, request
 from models import Category
+from utils.pagination import get_page_args, PaginationError
+from utils.versions import bump_version, conditional_on_version, record_deletes
+
+
+def serialize_category(c):
+    return {
+        'id': c.id,
+        'name': c.name,
+        'created_at': c.created_at.strftime('%Y-%m-%d %I:%M %p')  # Changed format
+    }
+
 
 @app.route('/category/list', methods=['GET'])
+@conditional_on_version('category')
 def list_categories():
-    categories = Category.query.all()
-    result = []
-    for c in categories:
-        result.append({
-            'id': c.id,
-            'name': c.name,
-            'created_at': c.created_at.strftime('%Y-%m-%d %I:%M %p')  # Changed format
-        })
-    return jsonify(result), 200
+    try:
+        page = get_page_args(sort_keys=('id', 'created_at'))
+    except PaginationError as e:
+        return jsonify({'error': str(e)}), 400
+
+    categories, next_cursor = page.trim(page.filter_query(Category.query, Category))
+    result = [serialize_category(c) for c in categories]
+    return jsonify({'categories': result, 'next_cursor': next_cursor}), 200
 
 
 @app.route('/category/id/<int:id>', methods=['GET'])
@@ -39,6 +50,7 @@ def create_category():
 
     new_category = Category(name=data['name'])
     db.session.add(new_category)
+    bump_version('category')
     db.session.commit()
 
     return jsonify({
@@ -82,6 +94,7 @@ def update_category():
             return jsonify({'error': 'Category name already exists'}), 400
 
         category.name = data['name']
+        bump_version('category')
         db.session.commit()
 
         return jsonify({
@@ -108,6 +121,8 @@ def delete_category():
         return jsonify({'error': 'Category not found'}), 404
 
     db.session.delete(category)
+    record_deletes('category', [category.id])
+    bump_version('category')
     db.session.commit()
     return jsonify({
         'status': 'Category deleted successfully!',
@@ -0,0 +1,113 @@
+from flask import request, jsonify
+from sqlalchemy import select, insert, update, case
+from datetime import datetime
+from app import db, app
+from models import Invoice, InvoiceDetail, Product
+from utils.sales_rollup import apply_invoices
+from routes.product import catalog_cache
+
+
+@app.post('/checkout')
+def checkout():
+    data = request.get_json()
+    if not isinstance(data, dict):
+        return jsonify({'error': 'Request body must be a JSON object'}), 400
+    if not data.get('user_id'):
+        return jsonify({'error': 'user_id is required'}), 400
+    # Checkout takes the stock now, so the sale is complete; anything else
+    # would leave stock gone that the sales reports never count
+    if data.get('status', 'completed') != 'completed':
+        return jsonify({'error': "status must be 'completed' (or left out) for a checkout"}), 400
+
+    items = data.get('items')
+    if not items or not isinstance(items, list):
+        return jsonify({'error': 'items must be a non-empty list'}), 400
+
+    # Merge repeated products so each one is priced and decremented once
+    quantities = {}
+    for item in items:
+        try:
+            product_id = int(item['product_id'])
+            qty = int(item['qty'])
+        except (KeyError, TypeError, ValueError):
+            return jsonify({'error': 'Each item needs an integer product_id and qty'}), 400
+        if qty <= 0:
+            return jsonify({'error': f'Quantity for product {product_id} must be positive'}), 400
+        quantities[product_id] = quantities.get(product_id, 0) + qty
+
+    try:
+        products = db.session.execute(
+            select(Product.id, Product.name, Product.price, Product.stock)
+            .where(Product.id.in_(quantities.keys()))
+        ).all()
+        products = {p.id: p for p in products}
+
+        missing = [pid for pid in quantities if pid not in products]
+        if missing:
+            return jsonify({'error': 'Product not found', 'product_ids': missing}), 400
+
+        short = [pid for pid, qty in quantities.items() if (products[pid].stock or 0) < qty]
+        if short:
+            return jsonify({'error': 'Insufficient stock', 'product_ids': short}), 409
+
+        lines = []
+        for pid, qty in quantities.items():
+            price = products[pid].price
+            lines.append({
+                'product_id': pid,
+                'product_name': products[pid].name,
+                'price': price,
+                'qty': qty,
+                'total': round(price * qty, 2)
+            })
+        total_amount = round(sum(line['total'] for line in lines), 2)
+
+        # One conditional UPDATE for the whole basket; a concurrent sale that
+        # drained a product makes the rowcount come up short.
+        qty_case = case(quantities, value=Product.id)
+        decremented = db.session.execute(
+            update(Product)
+            .where(Product.id.in_(quantities.keys()), Product.stock >= qty_case)
+            .values(stock=Product.stock - qty_case)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        if decremented != len(quantities):
+            db.session.rollback()
+            return jsonify({'error': 'Insufficient stock'}), 409
+        catalog_cache.record_write(quantities.keys())
+
+        invoice = Invoice(
+            user_id=data['user_id'],
+            customer_id=data.get('customer_id'),
+            total_amount=total_amount,
+            status='completed',
+            date_time=datetime.utcnow()
+        )
+        db.session.add(invoice)
+        db.session.flush()
+
+        db.session.execute(insert(InvoiceDetail), [{
+            'invoice_id': invoice.id,
+            'product_id': line['product_id'],
+            'price': line['price'],
+            'qty': line['qty'],
+            'total': line['total']
+        } for line in lines])
+        apply_invoices([invoice.id], 1)
+
+        # Build the response before commit expires the instance
+        result = {
+            'id': invoice.id,
+            'user_id': invoice.user_id,
+            'customer_id': invoice.customer_id,
+            'total_amount': invoice.total_amount,
+            'status': invoice.status,
+            'date_time': invoice.date_time.strftime('%Y-%m-%d %H:%M:%S'),
+            'details': lines
+        }
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': 'Checkout failed', 'details': str(e)}), 500
+
+    return jsonify({'status': 'Checkout completed successfully!', 'invoice': result}), 201
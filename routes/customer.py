@@ -1,21 +1,80 @@
 from flask import request, jsonify
 from app import db, app
 from models import Customer
+from models.customer import NORMALIZERS, normalize_email, with_normalized
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from utils.pagination import get_page_args, PaginationError
+from utils.versions import bump_version, conditional_on_version, record_deletes
+from utils.bulk import (BulkError, get_bulk_rows, get_bulk_ids, existing_ids, chunked,
+                        bulk_insert, bulk_update, bulk_delete, bulk_status)
+
+
+def serialize_customer(c):
+    return {
+        'id': c.id,
+        'name': c.name,
+        'phone': c.phone,
+        'email': c.email,
+        'created_at': c.created_at.strftime('%Y-%m-%d %H:%M:%S')
+    }
 
 
 @app.route('/customer/list', methods=['GET'])
+@conditional_on_version('customer')
 def list_customers():
-    customers = Customer.query.all()
-    result = []
-    for c in customers:
-        result.append({
-            'id': c.id,
-            'name': c.name,
-            'phone': c.phone,
-            'email': c.email,
-            'created_at': c.created_at.strftime('%Y-%m-%d %H:%M:%S')
-        })
-    return jsonify(result), 200
+    try:
+        page = get_page_args(sort_keys=('id', 'created_at'))
+    except PaginationError as e:
+        return jsonify({'error': str(e)}), 400
+
+    customers, next_cursor = page.trim(page.filter_query(Customer.query, Customer))
+    result = [serialize_customer(c) for c in customers]
+    return jsonify({'customers': result, 'next_cursor': next_cursor}), 200
+
+LOOKUP_LIMIT = 20
+MAX_LOOKUP_LIMIT = 100
+
+
+def guess_lookup_field(q):
+    if '@' in q:
+        return 'email'
+    if any(ch.isdigit() for ch in q) and not any(ch.isalpha() for ch in q):
+        return 'phone'
+    return 'name'
+
+
+def prefix_filter(column, prefix):
+    """``column LIKE 'prefix%'`` as a range, which every backend can answer
+    from a plain b-tree index regardless of LIKE case rules."""
+    upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+    return (column >= prefix) & (column < upper)
+
+
+@app.route('/customer/lookup', methods=['GET'])
+def lookup_customers():
+    q = request.args.get('q', '')
+    field = request.args.get('field') or guess_lookup_field(q)
+    if field not in NORMALIZERS:
+        return jsonify({'error': f"field must be one of: {', '.join(NORMALIZERS)}"}), 400
+    column_name, normalize = NORMALIZERS[field]
+    value = normalize(q)
+    if not value:
+        return jsonify({'error': 'Search text (q) is required'}), 400
+    try:
+        limit = min(max(int(request.args.get('limit', LOOKUP_LIMIT)), 1), MAX_LOOKUP_LIMIT)
+    except ValueError:
+        return jsonify({'error': 'limit must be an integer'}), 400
+
+    column = getattr(Customer, column_name)
+    if request.args.get('exact') in ('1', 'true'):
+        condition = column == value
+    else:
+        condition = prefix_filter(column, value)
+    stmt = select(Customer.__table__).where(condition).order_by(column, Customer.id).limit(limit)
+    customers = [serialize_customer(row) for row in db.session.execute(stmt)]
+    return jsonify({'field': field, 'customers': customers}), 200
+
 
 @app.route('/customer/id/<int:id>', methods=['GET'])
 def get_customer_by_id(id):
@@ -37,7 +96,7 @@ def create_customer():
     if not data or not data.get('name') or not data.get('email'):
         return jsonify({'error': 'Name and email are required'}), 400
 
-    existing = Customer.query.filter_by(email=data['email']).first()
+    existing = Customer.query.filter_by(email_norm=normalize_email(data['email'])).first()
     if existing:
         return jsonify({'error': 'Email already exists'}), 400
 
@@ -47,6 +106,7 @@ def create_customer():
         phone=data.get('phone')
     )
     db.session.add(new_customer)
+    bump_version('customer')
     db.session.commit()
 
     return jsonify({
@@ -74,12 +134,13 @@ def update_customer():
     if data.get('name'):
         customer.name = data['name']
     if data.get('email'):
-        if Customer.query.filter(Customer.email==data['email'], Customer.id!=data['id']).first():
+        if Customer.query.filter(Customer.email_norm==normalize_email(data['email']), Customer.id!=data['id']).first():
             return jsonify({'error': 'Email already exists'}), 400
         customer.email = data['email']
     if data.get('phone'):
         customer.phone = data['phone']
 
+    bump_version('customer')
     db.session.commit()
 
     return jsonify({
@@ -105,6 +166,8 @@ def delete_customer():
         return jsonify({'error': 'Customer not found'}), 404
 
     db.session.delete(customer)
+    record_deletes('customer', [customer.id])
+    bump_version('customer')
     db.session.commit()
 
     return jsonify({
@@ -117,3 +180,155 @@ def delete_customer():
             'created_at': customer.created_at.strftime('%Y-%m-%d %H:%M:%S')
         }
     }), 200
+
+
+CUSTOMER_BULK_FIELDS = ('name', 'email', 'phone')
+
+
+def parse_customer_fields(item, required=()):
+    """The non-empty text fields of a bulk row; numbers are taken as their
+    text, anything else is rejected."""
+    fields = {}
+    for field in CUSTOMER_BULK_FIELDS:
+        value = item.get(field)
+        if value is None or value == '':
+            if field in required:
+                raise ValueError(f'{field} is required')
+            continue
+        if isinstance(value, bool) or not isinstance(value, (str, int, float)):
+            raise ValueError(f'Invalid {field}')
+        fields[field] = str(value)
+    return fields
+
+
+def emails_in_use(emails):
+    """Map normalized email -> customer id for the given emails, one IN query
+    per chunk."""
+    owners = {}
+    for chunk in chunked({normalize_email(e) for e in emails}):
+        stmt = select(Customer.id, Customer.email_norm).where(Customer.email_norm.in_(chunk))
+        for row in db.session.execute(stmt):
+            owners[row.email_norm] = row.id
+    return owners
+
+
+@app.post('/customer/bulk/create')
+def bulk_create_customer():
+    try:
+        items = get_bulk_rows()
+    except BulkError as e:
+        return jsonify({'error': str(e)}), 400
+
+    errors = []
+    rows = []
+    for index, item in enumerate(items):
+        try:
+            fields = parse_customer_fields(item if isinstance(item, dict) else {}, required=('name', 'email'))
+        except ValueError as e:
+            errors.append({'index': index, 'error': str(e)})
+            continue
+        fields.setdefault('phone', None)
+        rows.append((index, fields))
+
+    owners = emails_in_use(row['email'] for _, row in rows)
+    seen = set()
+    valid = []
+    for index, row in rows:
+        email = normalize_email(row['email'])
+        if email in owners or email in seen:
+            errors.append({'index': index, 'error': 'Email already exists'})
+            continue
+        seen.add(email)
+        valid.append(with_normalized(row))
+
+    created = bulk_insert(Customer.__table__, valid) if valid else []
+    if created:
+        bump_version('customer')
+    db.session.commit()
+
+    return jsonify({
+        'status': 'Customers created successfully!',
+        'created': [serialize_customer(row) for row in created],
+        'errors': sorted(errors, key=lambda e: e['index'])
+    }), bulk_status(created, errors, 201)
+
+
+@app.put('/customer/bulk/update')
+def bulk_update_customer():
+    try:
+        items = get_bulk_rows()
+    except BulkError as e:
+        return jsonify({'error': str(e)}), 400
+
+    errors = []
+    changes = {}
+    for index, item in enumerate(items):
+        try:
+            row_id = int(item['id'])
+        except (KeyError, TypeError, ValueError):
+            errors.append({'index': index, 'error': 'Customer id is required'})
+            continue
+        if row_id in changes:
+            errors.append({'index': index, 'id': row_id, 'error': 'Duplicate id in request'})
+            continue
+        try:
+            fields = parse_customer_fields(item)
+        except ValueError as e:
+            errors.append({'index': index, 'id': row_id, 'error': str(e)})
+            continue
+        if not fields:
+            errors.append({'index': index, 'id': row_id, 'error': 'No fields to update'})
+            continue
+        changes[row_id] = (index, fields)
+
+    found = existing_ids(Customer.__table__, changes)
+    owners = emails_in_use(f['email'] for _, f in changes.values() if 'email' in f)
+    claimed = {}
+    valid = {}
+    for row_id, (index, fields) in changes.items():
+        email = normalize_email(fields.get('email'))
+        if row_id not in found:
+            errors.append({'index': index, 'id': row_id, 'error': 'Customer not found'})
+        elif email and (owners.get(email, row_id) != row_id or claimed.get(email, row_id) != row_id):
+            errors.append({'index': index, 'id': row_id, 'error': 'Email already exists'})
+        else:
+            if email:
+                claimed[email] = row_id
+            valid[row_id] = with_normalized(fields)
+
+    updated = bulk_update(Customer.__table__, valid) if valid else []
+    if updated:
+        bump_version('customer')
+    db.session.commit()
+
+    return jsonify({
+        'status': 'Customers updated successfully!',
+        'updated': [serialize_customer(row) for row in updated],
+        'errors': sorted(errors, key=lambda e: e['index'])
+    }), bulk_status(updated, errors)
+
+
+@app.delete('/customer/bulk/delete')
+def bulk_delete_customer():
+    try:
+        ids = get_bulk_ids()
+    except BulkError as e:
+        return jsonify({'error': str(e)}), 400
+
+    try:
+        deleted = bulk_delete(Customer.__table__, ids)
+    except IntegrityError:
+        db.session.rollback()
+        return jsonify({'error': 'Some customers have invoices; nothing was deleted'}), 409
+    if deleted:
+        record_deletes('customer', [row.id for row in deleted])
+        bump_version('customer')
+    db.session.commit()
+
+    found = {row.id for row in deleted}
+    errors = [{'id': i, 'error': 'Customer not found'} for i in ids if i not in found]
+    return jsonify({
+        'status': 'Customers deleted successfully!',
+        'deleted': [serialize_customer(row) for row in deleted],
+        'errors': errors
+    }), bulk_status(deleted, errors)
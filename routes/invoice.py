@@ -1,50 +1,95 @@
 from flask import request, jsonify
 from app import db, app
-from models import Invoice
+from models import Invoice, InvoiceDetail, Product
 from datetime import datetime
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import selectinload
+from utils.pagination import get_page_args, PaginationError
+from utils.streaming import wants_stream, ndjson_response, STREAM_BATCH_SIZE
+from utils.sales_rollup import apply_invoices, track_invoices
+
+
+def serialize_invoice(inv):
+    return {
+        'id': inv.id,
+        'user_id': inv.user_id,
+        'customer_id': inv.customer_id,
+        'total_amount': inv.total_amount,
+        'status': inv.status,
+        'date_time': inv.date_time.strftime('%Y-%m-%d %H:%M:%S')
+    }
 
 
 @app.route('/invoice/list', methods=['GET'])
 def list_invoices():
-    invoices = Invoice.query.all()
-    result = []
-    for inv in invoices:
-        result.append({
-            'id': inv.id,
-            'user_id': inv.user_id,
-            'customer_id': inv.customer_id,
-            'total_amount': inv.total_amount,
-            'status': inv.status,
-            'date_time': inv.date_time.strftime('%Y-%m-%d %H:%M:%S')
-        })
-    return jsonify(result), 200
+    if wants_stream():
+        stmt = select(
+            Invoice.id, Invoice.user_id, Invoice.customer_id,
+            Invoice.total_amount, Invoice.status, Invoice.date_time
+        ).order_by(Invoice.id).execution_options(yield_per=STREAM_BATCH_SIZE)
+        return ndjson_response(db.session.execute(stmt), serialize_invoice)
+
+    try:
+        page = get_page_args(sort_keys=('id', 'date_time'))
+    except PaginationError as e:
+        return jsonify({'error': str(e)}), 400
+
+    invoices, next_cursor = page.trim(page.filter_query(Invoice.query, Invoice))
+    result = [serialize_invoice(inv) for inv in invoices]
+    return jsonify({'invoices': result, 'next_cursor': next_cursor}), 200
+
+
+INVOICE_BATCH_MAX = 100
+
+
+def load_invoices(ids):
+    """Load invoices with their lines and product names in two queries:
+    one for the headers, one select-in for lines joined to products."""
+    return Invoice.query.options(
+        selectinload(Invoice.invoice_details)
+        .joinedload(InvoiceDetail.product)
+        .load_only(Product.name)
+    ).filter(Invoice.id.in_(ids)).all()
+
+
+def serialize_invoice_with_details(inv):
+    result = serialize_invoice(inv)
+    result['details'] = [{
+        'id': d.id,
+        'product_id': d.product_id,
+        'product_name': d.product.name if d.product else None,
+        'price': d.price,
+        'qty': d.qty,
+        'total': d.total
+    } for d in inv.invoice_details]
+    return result
 
 
 @app.route('/invoice/id/<int:id>', methods=['GET'])
 def get_invoice_by_id(id):
-    inv = Invoice.query.get(id)
-    if not inv:
+    invoices = load_invoices([id])
+    if not invoices:
         return jsonify({'error': 'Invoice not found'}), 404
 
-    details = []
-    for d in inv.details:
-        details.append({
-            'id': d.id,
-            'product_id': d.product_id,
-            'product_name': d.product.name if d.product else None,
-            'price': d.price,
-            'qty': d.qty,
-            'total': d.total
-        })
+    return jsonify(serialize_invoice_with_details(invoices[0])), 200
 
+
+@app.route('/invoice/batch', methods=['GET'])
+def get_invoices_batch():
+    try:
+        ids = list(dict.fromkeys(int(i) for i in request.args.get('ids', '').split(',') if i.strip()))
+    except ValueError:
+        return jsonify({'error': 'ids must be a comma separated list of integers'}), 400
+    if not ids:
+        return jsonify({'error': 'ids is required'}), 400
+    if len(ids) > INVOICE_BATCH_MAX:
+        return jsonify({'error': f'At most {INVOICE_BATCH_MAX} ids per request'}), 400
+
+    found = {inv.id: inv for inv in load_invoices(ids)}
     return jsonify({
-        'id': inv.id,
-        'user_id': inv.user_id,
-        'customer_id': inv.customer_id,
-        'total_amount': inv.total_amount,
-        'status': inv.status,
-        'date_time': inv.date_time.strftime('%Y-%m-%d %H:%M:%S'),
-        'details': details
+        'invoices': [serialize_invoice_with_details(found[i]) for i in ids if i in found],
+        'missing': [i for i in ids if i not in found]
     }), 200
 
 
@@ -65,6 +110,12 @@ def create_invoice():
         date_time=datetime.utcnow()
     )
     db.session.add(invoice)
+    try:
+        db.session.flush()
+    except IntegrityError:
+        db.session.rollback()
+        return jsonify({'error': 'Invalid foreign key (user_id or customer_id)'}), 400
+    apply_invoices([invoice.id], 1)
     db.session.commit()
 
     return jsonify({
@@ -90,16 +141,20 @@ def update_invoice():
     if not invoice:
         return jsonify({'error': 'Invoice not found'}), 404
 
-    if data.get('user_id'):
-        invoice.user_id = data['user_id']
-    if data.get('customer_id'):
-        invoice.customer_id = data['customer_id']
-    if data.get('total_amount'):
-        invoice.total_amount = data['total_amount']
-    if data.get('status'):
-        invoice.status = data['status']
-
-    db.session.commit()
+    try:
+        with track_invoices([invoice.id]):
+            if data.get('user_id'):
+                invoice.user_id = data['user_id']
+            if data.get('customer_id'):
+                invoice.customer_id = data['customer_id']
+            if data.get('total_amount'):
+                invoice.total_amount = data['total_amount']
+            if data.get('status'):
+                invoice.status = data['status']
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        return jsonify({'error': 'Invalid foreign key (user_id or customer_id)'}), 400
 
     return jsonify({
         'status': 'Invoice updated successfully!',
@@ -124,6 +179,7 @@ def delete_invoice():
     if not invoice:
         return jsonify({'error': 'Invoice not found'}), 404
 
+    apply_invoices([invoice.id], -1)
     db.session.delete(invoice)
     db.session.commit()
 
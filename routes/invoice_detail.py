@@ -2,24 +2,42 @@ from app import db, app
 from sqlalchemy import text
 from flask import jsonify, request
 from sqlalchemy.exc import IntegrityError
+from utils.pagination import get_page_args, PaginationError
+from utils.streaming import wants_stream, ndjson_response, STREAM_BATCH_SIZE
+from utils.bulk import (BulkError, get_bulk_rows, get_bulk_ids, fetch_by_ids, existing_ids,
+                        bulk_insert, bulk_update, bulk_delete, bulk_status)
+from models import Invoice, InvoiceDetail, Product
+from utils.sales_rollup import track_invoices
 
 
+def row_to_invoice_detail(row):
+    return {
+        'id': row[0],
+        'invoice_id': row[1],
+        'product_id': row[2],
+        'price': float(row[3]),
+        'qty': row[4],
+        'total': float(row[5])
+    }
+
 
 @app.route('/invoice_detail/list')
 def get_invoice_detail():
-    sql = text("SELECT * FROM invoice_detail")
-    result = db.session.execute(sql).fetchall()
-    rows = []
-    for row in result:
-        rows.append({
-            'id': row[0],
-            'invoice_id': row[1],
-            'product_id': row[2],
-            'price': float(row[3]),
-            'qty': row[4],
-            'total': float(row[5])
-        })
-    return jsonify(rows)
+    if wants_stream():
+        sql = text("SELECT id, invoice_id, product_id, price, qty, total FROM invoice_detail ORDER BY id")
+        result = db.session.execute(sql.execution_options(yield_per=STREAM_BATCH_SIZE))
+        return ndjson_response(result, row_to_invoice_detail)
+
+    try:
+        page = get_page_args()
+    except PaginationError as e:
+        return jsonify({'error': str(e)}), 400
+
+    where, order_by, params = page.sql()
+    sql = text(f"SELECT * FROM invoice_detail {where} ORDER BY {order_by} LIMIT :limit")
+    result, next_cursor = page.trim(db.session.execute(sql, params).fetchall())
+    rows = [row_to_invoice_detail(row) for row in result]
+    return jsonify({'invoice_details': rows, 'next_cursor': next_cursor})
 
 
 @app.route('/invoice_detail/id/<path:id>')
@@ -62,14 +80,19 @@ def create_invoice_detail():
         "INSERT INTO invoice_detail(invoice_id, product_id, price, qty, total) "
         "VALUES(:invoice_id, :product_id, :price, :qty, :total)"
     )
-    result = db.session.execute(sql, {
-        'invoice_id': invoice_id,
-        'product_id': product_id,
-        'price': price,
-        'qty': qty,
-        'total': total
-    })
-    db.session.commit()
+    try:
+        with track_invoices([invoice_id]):
+            result = db.session.execute(sql, {
+                'invoice_id': invoice_id,
+                'product_id': product_id,
+                'price': price,
+                'qty': qty,
+                'total': total
+            })
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        return jsonify({'message': 'Invalid foreign key (invoice_id or product_id)'}), 400
     last_id = result.lastrowid
     last_invoice_detail = get_invoice_detail_by_id(id=last_id)
     return jsonify({
@@ -85,7 +108,7 @@ def update_invoice_detail():
         return jsonify({'message': 'InvoiceDetail id is required!'}), 400
 
     # Check if invoice_detail exists
-    check_sql = text("SELECT id FROM invoice_detail WHERE id = :id")
+    check_sql = text("SELECT id, invoice_id FROM invoice_detail WHERE id = :id")
     existing = db.session.execute(check_sql, {'id': data['id']}).fetchone()
     if not existing:
         return jsonify({'message': 'InvoiceDetail not found!'}), 404
@@ -113,7 +136,8 @@ def update_invoice_detail():
 
     sql = text(f"UPDATE invoice_detail SET {', '.join(update_fields)} WHERE id = :id")
     try:
-        db.session.execute(sql, params)
+        with track_invoices([existing.invoice_id, params.get('invoice_id')]):
+            db.session.execute(sql, params)
         db.session.commit()
     except IntegrityError:
         db.session.rollback()
@@ -132,17 +156,174 @@ def delete_invoice_detail():
     if not data or not data.get('id'):
         return jsonify({'message': 'InvoiceDetail id is required!'}), 400
 
-    check_sql = text("SELECT id FROM invoice_detail WHERE id = :id")
+    check_sql = text("SELECT id, invoice_id FROM invoice_detail WHERE id = :id")
     existing = db.session.execute(check_sql, {'id': data['id']}).fetchone()
     if not existing:
         return jsonify({'message': 'InvoiceDetail not found!'}), 404
 
     invoice_detail_info = get_invoice_detail_by_id(id=data['id'])
     sql = text("DELETE FROM invoice_detail WHERE id = :id")
-    db.session.execute(sql, {'id': data['id']})
+    with track_invoices([existing.invoice_id]):
+        db.session.execute(sql, {'id': data['id']})
     db.session.commit()
 
     return jsonify({
         'status': 'invoice_detail deleted successfully!',
         'deleted_invoice_detail': invoice_detail_info
     })
+
+
+@app.post('/invoice_detail/bulk/create')
+def bulk_create_invoice_detail():
+    try:
+        items = get_bulk_rows()
+    except BulkError as e:
+        return jsonify({'error': str(e)}), 400
+
+    table = InvoiceDetail.__table__
+    errors = []
+    rows = []
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            errors.append({'index': index, 'error': 'Row must be an object'})
+            continue
+        if not item.get('invoice_id'):
+            errors.append({'index': index, 'error': 'Invoice ID is required'})
+            continue
+        if not item.get('product_id'):
+            errors.append({'index': index, 'error': 'Product ID is required'})
+            continue
+        if item.get('price') is None or item.get('qty') is None:
+            errors.append({'index': index, 'error': 'Price and quantity are required'})
+            continue
+        try:
+            invoice_id = int(item['invoice_id'])
+            product_id = int(item['product_id'])
+        except (TypeError, ValueError):
+            errors.append({'index': index, 'error': 'Invalid invoice or product ID'})
+            continue
+        try:
+            price = float(item['price'])
+            qty = int(item['qty'])
+        except (TypeError, ValueError):
+            errors.append({'index': index, 'error': 'Invalid price or quantity'})
+            continue
+        rows.append((index, {
+            'invoice_id': invoice_id,
+            'product_id': product_id,
+            'price': price,
+            'qty': qty,
+            'total': price * qty
+        }))
+
+    invoices = existing_ids(Invoice.__table__, [row['invoice_id'] for _, row in rows])
+    products = existing_ids(Product.__table__, [row['product_id'] for _, row in rows])
+    valid = []
+    for index, row in rows:
+        if row['invoice_id'] not in invoices:
+            errors.append({'index': index, 'error': 'Invoice not found'})
+        elif row['product_id'] not in products:
+            errors.append({'index': index, 'error': 'Product not found'})
+        else:
+            valid.append(row)
+
+    with track_invoices(row['invoice_id'] for row in valid):
+        created = bulk_insert(table, valid) if valid else []
+    db.session.commit()
+
+    return jsonify({
+        'status': 'bulk created invoice_detail successfully!',
+        'created': [row_to_invoice_detail(row) for row in created],
+        'errors': sorted(errors, key=lambda e: e['index'])
+    }), bulk_status(created, errors, 201)
+
+
+@app.put('/invoice_detail/bulk/update')
+def bulk_update_invoice_detail():
+    try:
+        items = get_bulk_rows()
+    except BulkError as e:
+        return jsonify({'error': str(e)}), 400
+
+    table = InvoiceDetail.__table__
+    errors = []
+    changes = {}
+    for index, item in enumerate(items):
+        try:
+            row_id = int(item['id'])
+        except (KeyError, TypeError, ValueError):
+            errors.append({'index': index, 'error': 'InvoiceDetail id is required'})
+            continue
+        if row_id in changes:
+            errors.append({'index': index, 'id': row_id, 'error': 'Duplicate id in request'})
+            continue
+        fields = {f: item[f] for f in ['invoice_id', 'product_id', 'price', 'qty'] if item.get(f) is not None}
+        if not fields:
+            errors.append({'index': index, 'id': row_id, 'error': 'No fields to update'})
+            continue
+        try:
+            for field in ('invoice_id', 'product_id'):
+                if field in fields:
+                    fields[field] = int(fields[field])
+        except (TypeError, ValueError):
+            errors.append({'index': index, 'id': row_id, 'error': 'Invalid invoice or product ID'})
+            continue
+        try:
+            if 'price' in fields:
+                fields['price'] = float(fields['price'])
+            if 'qty' in fields:
+                fields['qty'] = int(fields['qty'])
+        except (TypeError, ValueError):
+            errors.append({'index': index, 'id': row_id, 'error': 'Invalid price or quantity'})
+            continue
+        changes[row_id] = (index, fields)
+
+    current = fetch_by_ids(table, changes, table.c.invoice_id, table.c.price, table.c.qty)
+    invoices = existing_ids(Invoice.__table__, [f['invoice_id'] for _, f in changes.values() if 'invoice_id' in f])
+    products = existing_ids(Product.__table__, [f['product_id'] for _, f in changes.values() if 'product_id' in f])
+    valid = {}
+    for row_id, (index, fields) in changes.items():
+        if row_id not in current:
+            errors.append({'index': index, 'id': row_id, 'error': 'InvoiceDetail not found'})
+        elif 'invoice_id' in fields and fields['invoice_id'] not in invoices:
+            errors.append({'index': index, 'id': row_id, 'error': 'Invoice not found'})
+        elif 'product_id' in fields and fields['product_id'] not in products:
+            errors.append({'index': index, 'id': row_id, 'error': 'Product not found'})
+        else:
+            if 'price' in fields or 'qty' in fields:
+                fields['total'] = fields.get('price', current[row_id].price) * fields.get('qty', current[row_id].qty)
+            valid[row_id] = fields
+
+    affected = [current[row_id].invoice_id for row_id in valid]
+    affected += [fields['invoice_id'] for fields in valid.values() if 'invoice_id' in fields]
+    with track_invoices(affected):
+        updated = bulk_update(table, valid) if valid else []
+    db.session.commit()
+
+    return jsonify({
+        'status': 'bulk updated invoice_detail successfully!',
+        'updated': [row_to_invoice_detail(row) for row in updated],
+        'errors': sorted(errors, key=lambda e: e['index'])
+    }), bulk_status(updated, errors)
+
+
+@app.delete('/invoice_detail/bulk/delete')
+def bulk_delete_invoice_detail():
+    try:
+        ids = get_bulk_ids()
+    except BulkError as e:
+        return jsonify({'error': str(e)}), 400
+
+    table = InvoiceDetail.__table__
+    current = fetch_by_ids(table, ids, table.c.invoice_id)
+    with track_invoices(row.invoice_id for row in current.values()):
+        deleted = bulk_delete(table, ids)
+    db.session.commit()
+
+    found = {row.id for row in deleted}
+    errors = [{'id': i, 'error': 'InvoiceDetail not found'} for i in ids if i not in found]
+    return jsonify({
+        'status': 'bulk deleted invoice_detail successfully!',
+        'deleted': [row_to_invoice_detail(row) for row in deleted],
+        'errors': errors
+    }), bulk_status(deleted, errors)
@@ -1,12 +1,26 @@
 import os
-from werkzeug.utils import secure_filename
-from flask import request, jsonify, send_from_directory
+from flask import request, jsonify
 from datetime import datetime
 from app import app, db
-from sqlalchemy import text
-
-
+from sqlalchemy import text, bindparam
+from sqlalchemy.exc import IntegrityError
+from utils.pagination import get_page_args, PaginationError
+from utils.bulk import (BulkError, get_bulk_rows, get_bulk_ids, fetch_by_ids, existing_ids,
+                        bulk_insert, bulk_update, bulk_delete, bulk_status)
+from models import Product, Category
+from utils.sales_rollup import recategorize_products
+from utils.catalog_cache import CatalogCache
+from utils.versions import conditional_on_version, record_deletes
+from utils.search import (SEARCH_WEIGHTS, build_match_query, search_available,
+                          search_unavailable_error)
+from utils.images import (images_enabled, submit_image_job, generate_variants, store_image,
+                          release_images, variant_path)
+from utils.assets import asset_url, send_asset
+
+
+STATIC_FOLDER = 'static'
 UPLOAD_FOLDER = 'static/uploads/products'
+IMAGE_FOLDER = 'uploads/products'  # relative to STATIC_FOLDER
 ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'webp'}
 MAX_FILE_SIZE = 5 * 1024 * 1024  # 5MB
 
@@ -19,46 +33,191 @@ def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
 
-@app.route('/product/list')
-def list_products():
-    sql = text("SELECT * FROM product")
-    results = db.session.execute(sql).fetchall()
-    products = []
+def serialize_product(row):
+    row_dict = dict(row._mapping)
 
-    for row in results:
-        row_dict = dict(row._mapping)
+    if row_dict.get('image'):
+        # Catalog screens get the thumbnail once the worker has built it
+        row_dict['image_url'] = asset_url(row_dict.get('image_thumb') or row_dict['image'])
+        row_dict['image_original_url'] = asset_url(row_dict.get('image_full') or row_dict['image'])
+        if row_dict.get('image_medium'):
+            row_dict['image_medium_url'] = asset_url(row_dict['image_medium'])
+
+    if row_dict.get('created_at'):
+        created_at_value = row_dict['created_at']
+        if isinstance(created_at_value, datetime):
+            row_dict['created_at'] = created_at_value.strftime('%Y-%m-%d %I:%M %p')
+        elif isinstance(created_at_value, str):
+            try:
+                parsed_dt = datetime.fromisoformat(created_at_value)
+                row_dict['created_at'] = parsed_dt.strftime('%Y-%m-%d %I:%M %p')
+            except ValueError:
+                row_dict['created_at'] = created_at_value
+
+    # Raw text() rows already carry the stored string
+    if isinstance(row_dict.get('updated_at'), datetime):
+        row_dict['updated_at'] = str(row_dict['updated_at'])
+
+    return row_dict
 
-        if row_dict.get('image'):
-            row_dict['image_url'] = f"http://127.0.0.1:5000/static/{row_dict['image']}"
 
-        if row_dict.get('created_at'):
-            created_at_value = row_dict['created_at']
-            if isinstance(created_at_value, datetime):
-                row_dict['created_at'] = created_at_value.strftime('%Y-%m-%d %I:%M %p')
-            elif isinstance(created_at_value, str):
-                try:
-                    parsed_dt = datetime.fromisoformat(created_at_value)
-                    row_dict['created_at'] = parsed_dt.strftime('%Y-%m-%d %I:%M %p')
-                except ValueError:
-                    row_dict['created_at'] = created_at_value
+def load_products(ids):
+    sql = text("SELECT * FROM product WHERE id IN :ids").bindparams(bindparam('ids', expanding=True))
+    return {row.id: serialize_product(row) for row in db.session.execute(sql, {'ids': ids})}
+
+
+catalog_cache = CatalogCache('product', load_products)
+
+
+def image_columns(path, status):
+    """Product columns for a freshly stored image; a blob another product
+    already uses comes with its variants."""
+    if status == 'ready':
+        return {'image': path, 'image_status': status, 'image_full': variant_path(path, 'full'),
+                'image_thumb': variant_path(path, 'thumb'), 'image_medium': variant_path(path, 'medium')}
+    return {'image': path, 'image_status': status, 'image_full': None, 'image_thumb': None, 'image_medium': None}
+
+
+def process_image_blob(path):
+    """Image pool job: build the variants for one blob and record them on
+    every product that points at it."""
+    try:
+        variants = generate_variants(STATIC_FOLDER, path)
+        status = 'ready'
+    except Exception:
+        variants = {}
+        status = 'failed'
+
+    blob = db.session.execute(text("UPDATE image_blob SET status = :status WHERE path = :path"),
+                              {'status': status, 'path': path})
+    if not blob.rowcount:
+        # Released while we were working; the release unlinked whatever
+        # existed when it committed, so drop what we just wrote
+        db.session.rollback()
+        for relative in variants.values():
+            if os.path.exists(os.path.join(STATIC_FOLDER, relative)):
+                os.remove(os.path.join(STATIC_FOLDER, relative))
+        return
+
+    result = db.session.execute(text("""
+        UPDATE product SET image_full = :full, image_thumb = :thumb, image_medium = :medium,
+            image_status = :status, updated_at = :updated_at
+        WHERE image = :image
+        RETURNING id
+    """), {
+        'image': path,
+        'status': status,
+        'full': variants.get('full'),
+        'thumb': variants.get('thumb'),
+        'medium': variants.get('medium'),
+        'updated_at': datetime.utcnow()
+    })
+    product_ids = result.scalars().all()
+    if product_ids:
+        catalog_cache.record_write(product_ids)
+    db.session.commit()
+    if status == 'failed':
+        raise ValueError(f'Could not build variants for {path}')
 
-        products.append(row_dict)
 
-    return jsonify({'total': len(products), 'products': products})
+def queue_image_blob(path, status):
+    if path and images_enabled() and status != 'ready':
+        submit_image_job(process_image_blob, path)
+
+
+@app.cli.command('build-image-variants')
+def build_image_variants_command():
+    """Build thumbnails for products uploaded before the image pipeline."""
+    if not images_enabled():
+        print('Pillow is not installed.')
+        return
+    paths = db.session.execute(text(
+        "SELECT path FROM image_blob WHERE status IS NULL OR status != 'ready'"
+    )).scalars().all()
+    for path in paths:
+        try:
+            process_image_blob(path)
+        except Exception as e:
+            print(f'{path}: {e}')
+    print(f'Processed {len(paths)} images.')
+
+
+@app.route('/product/list')
+@conditional_on_version('product')
+def list_products():
+    try:
+        page = get_page_args(sort_keys=('id', 'created_at'))
+    except PaginationError as e:
+        return jsonify({'error': str(e)}), 400
+
+    def fetch_page_ids():
+        where, order_by, params = page.sql()
+        sql = text(f"SELECT id, created_at FROM product {where} ORDER BY {order_by} LIMIT :limit")
+        rows, next_cursor = page.trim(db.session.execute(sql, params).fetchall())
+        return [row.id for row in rows], next_cursor
+
+    catalog_cache.sync()
+    ids, next_cursor = catalog_cache.get_page(
+        (page.sort, request.args.get('after'), page.limit), fetch_page_ids
+    )
+    items = catalog_cache.get_items(ids)
+    products = [items[i] for i in ids if i in items]
+
+    return jsonify({'total': len(products), 'products': products, 'next_cursor': next_cursor})
+
+
+@app.route('/product/search')
+def search_products():
+    if not search_available():
+        # 501 when the database can't do it at all, 503 until it's migrated
+        status = 501 if db.engine.dialect.name != 'sqlite' else 503
+        return jsonify({'error': search_unavailable_error()}), status
+
+    match = build_match_query(request.args.get('q'))
+    if match is None:
+        return jsonify({'error': 'Search text (q) is required'}), 400
+    try:
+        page = get_page_args(sort_keys=('rank',))
+    except PaginationError as e:
+        return jsonify({'error': str(e)}), 400
+
+    filters = ''
+    params = {'q': match}
+    if request.args.get('category_id'):
+        try:
+            params['category_id'] = int(request.args['category_id'])
+        except ValueError:
+            return jsonify({'error': 'category_id must be an integer'}), 400
+        filters = 'AND p.category_id = :category_id'
+
+    # Best matches first (bm25 is lower for better hits), ties broken by id
+    where, order_by, page_params = page.sql()
+    name_weight, description_weight = SEARCH_WEIGHTS
+    sql = text(f"""
+        SELECT * FROM (
+            SELECT p.*, bm25(product_fts, {name_weight}, {description_weight}) AS rank
+            FROM product_fts JOIN product p ON p.id = product_fts.rowid
+            WHERE product_fts MATCH :q {filters}
+        ) {where} ORDER BY {order_by} LIMIT :limit
+    """)
+    rows, next_cursor = page.trim(db.session.execute(sql, {**params, **page_params}).fetchall())
+
+    products = []
+    for row in rows:
+        product = serialize_product(row)
+        product.pop('rank')
+        products.append(product)
+    return jsonify({'total': len(products), 'products': products, 'next_cursor': next_cursor})
 
 
-@app.route('/product/id/<int:id>')
+@app.route('/product/id/<int:product_id>')
 def get_product_by_id(product_id):
-    sql = text("SELECT * FROM product WHERE id = :id")
-    result = db.session.execute(sql, {'id': product_id}).fetchone()
+    catalog_cache.sync()
+    row_dict = catalog_cache.get_items([product_id]).get(product_id)
 
-    if not result:
+    if not row_dict:
         return {'error': 'Product not found'}
-
-    row_dict = dict(result._mapping)
-    if row_dict.get('image'):
-        row_dict['image_url'] = f"http://127.0.0.1:5000/static/{row_dict['image']}"
-    return row_dict
+    return dict(row_dict)
 
 
 
@@ -81,22 +240,20 @@ def create_product():
     if not db.session.execute(category_check, {'id': category_id}).fetchone():
         return jsonify({'error': 'Category not found'}), 400
 
-    image_filename = None
+    image = image_columns(None, None)
     if 'image' in request.files:
         file = request.files['image']
         if file and allowed_file(file.filename):
-            timestamp_str = datetime.now().strftime('%Y%M%d_%H%M')
-            filename = secure_filename(f"{timestamp_str}_{file.filename}")
-            file_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-            file.save(file_path)
-            image_filename = f"uploads/products/{filename}"
+            image = image_columns(*store_image(file, STATIC_FOLDER, IMAGE_FOLDER))
         elif file.filename != '':
             return jsonify({'error': 'Invalid file type'}), 400
     now = datetime.now()
 
     sql = text("""
-        INSERT INTO product(name, price, stock, description, category_id, image, created_at)
-        VALUES(:name, :price, :stock, :description, :category_id, :image, :created_at)
+        INSERT INTO product(name, price, stock, description, category_id, image, image_full, image_thumb,
+                            image_medium, image_status, created_at, updated_at)
+        VALUES(:name, :price, :stock, :description, :category_id, :image, :image_full, :image_thumb,
+               :image_medium, :image_status, :created_at, :updated_at)
     """)
     result = db.session.execute(sql, {
         'name': name,
@@ -104,12 +261,15 @@ def create_product():
         'stock': stock,
         'description': description,
         'category_id': category_id,
-        'image': image_filename,
-        'created_at': now
+        **image,
+        'created_at': now,
+        'updated_at': datetime.utcnow()
     })
+    catalog_cache.record_write([result.lastrowid], membership_changed=True)
     db.session.commit()
 
     last_id = result.lastrowid
+    queue_image_blob(image['image'], image['image_status'])
     last_product = get_product_by_id(last_id)
 
     return jsonify({'status': 'Product created successfully', 'product': last_product}), 201
@@ -137,29 +297,32 @@ def update_product():
             update_fields.append(f"{field} = :{field}")
             params[field] = value
 
+    image = None
     if 'image' in request.files:
         file = request.files['image']
         if file and allowed_file(file.filename):
-            old_image = existing_product.get('image')
-            if old_image and os.path.exists(os.path.join('static', old_image)):
-                os.remove(os.path.join('static', old_image))
-
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            filename = secure_filename(f"{timestamp}_{file.filename}")
-            file_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-            file.save(file_path)
-            image_filename = f"uploads/products/{filename}"
-            update_fields.append("image = :image")
-            params['image'] = image_filename
+            image = image_columns(*store_image(file, STATIC_FOLDER, IMAGE_FOLDER))
+            release_images(STATIC_FOLDER, [existing_product.get('image')])
+            for column in image:
+                update_fields.append(f"{column} = :{column}")
+            params.update(image)
         elif file.filename != '':
             return jsonify({'error': 'Invalid file type'}), 400
 
     if not update_fields:
         return jsonify({'error': 'No fields to update'}), 400
 
+    update_fields.append("updated_at = :updated_at")
+    params['updated_at'] = datetime.utcnow()
+
     sql = text(f"UPDATE product SET {', '.join(update_fields)} WHERE id = :id")  # Changed from 'products' to 'product'
     db.session.execute(sql, params)
+    catalog_cache.record_write([int(product_id)])
+    if 'category_id' in params:
+        recategorize_products({int(product_id): (existing_product['category_id'], int(params['category_id']))})
     db.session.commit()
+    if image:
+        queue_image_blob(image['image'], image['image_status'])
 
     updated_product = get_product_by_id(int(product_id))
     return jsonify({'status': 'Product updated successfully', 'product': updated_product})
@@ -176,13 +339,15 @@ def delete_product():
     if product.get('error'):
         return jsonify({'error': 'Product not found'}), 404
 
-    if product.get('image'):
-        image_path = os.path.join('static', product['image'])
-        if os.path.exists(image_path):
-            os.remove(image_path)
-
     sql = text("DELETE FROM product WHERE id = :id")
-    db.session.execute(sql, {'id': int(product_id)})
+    try:
+        db.session.execute(sql, {'id': int(product_id)})
+    except IntegrityError:
+        db.session.rollback()
+        return jsonify({'error': 'Product is used by invoices and cannot be deleted'}), 409
+    release_images(STATIC_FOLDER, [product.get('image')])
+    record_deletes('product', [int(product_id)])
+    catalog_cache.record_write([int(product_id)], membership_changed=True)
     db.session.commit()
 
     return jsonify({'status': 'Product deleted successfully', 'product': product})
@@ -190,4 +355,144 @@ def delete_product():
 
 @app.route('/uploads/products/<filename>')
 def uploaded_file(filename):
-    return send_from_directory(app.config['UPLOAD_FOLDER'], filename)
\ No newline at end of file
+    return send_asset(f'{IMAGE_FOLDER}/{filename}')
+
+
+PRODUCT_BULK_FIELDS = {'name': str, 'price': float, 'stock': int, 'description': str, 'category_id': int}
+
+
+def parse_product_fields(item, required=()):
+    fields = {}
+    for field, cast in PRODUCT_BULK_FIELDS.items():
+        if item.get(field) is None:
+            if field in required:
+                raise ValueError(f'{field} is required')
+            continue
+        try:
+            fields[field] = cast(item[field])
+        except (TypeError, ValueError):
+            raise ValueError(f'Invalid {field}')
+    return fields
+
+
+@app.post('/product/bulk/create')
+def bulk_create_product():
+    try:
+        items = get_bulk_rows()
+    except BulkError as e:
+        return jsonify({'error': str(e)}), 400
+
+    errors = []
+    rows = []
+    now = datetime.now()
+    for index, item in enumerate(items):
+        try:
+            fields = parse_product_fields(item if isinstance(item, dict) else {},
+                                          required=('name', 'price', 'category_id'))
+        except ValueError as e:
+            errors.append({'index': index, 'error': str(e)})
+            continue
+        fields.setdefault('stock', 0)
+        fields.setdefault('description', None)
+        rows.append((index, dict(fields, image=None, created_at=now)))
+
+    categories = existing_ids(Category.__table__, [row['category_id'] for _, row in rows])
+    valid = []
+    for index, row in rows:
+        if row['category_id'] not in categories:
+            errors.append({'index': index, 'error': 'Category not found'})
+        else:
+            valid.append(row)
+
+    created = bulk_insert(Product.__table__, valid) if valid else []
+    if created:
+        catalog_cache.record_write([row.id for row in created], membership_changed=True)
+    db.session.commit()
+
+    return jsonify({
+        'status': 'Products created successfully',
+        'created': [serialize_product(row) for row in created],
+        'errors': sorted(errors, key=lambda e: e['index'])
+    }), bulk_status(created, errors, 201)
+
+
+@app.put('/product/bulk/update')
+def bulk_update_product():
+    try:
+        items = get_bulk_rows()
+    except BulkError as e:
+        return jsonify({'error': str(e)}), 400
+
+    errors = []
+    changes = {}
+    for index, item in enumerate(items):
+        try:
+            row_id = int(item['id'])
+        except (KeyError, TypeError, ValueError):
+            errors.append({'index': index, 'error': 'Product id is required'})
+            continue
+        if row_id in changes:
+            errors.append({'index': index, 'id': row_id, 'error': 'Duplicate id in request'})
+            continue
+        try:
+            fields = parse_product_fields(item)
+        except ValueError as e:
+            errors.append({'index': index, 'id': row_id, 'error': str(e)})
+            continue
+        if not fields:
+            errors.append({'index': index, 'id': row_id, 'error': 'No fields to update'})
+            continue
+        changes[row_id] = (index, fields)
+
+    table = Product.__table__
+    found = fetch_by_ids(table, changes, table.c.category_id)
+    categories = existing_ids(Category.__table__,
+                              [f['category_id'] for _, f in changes.values() if 'category_id' in f])
+    valid = {}
+    for row_id, (index, fields) in changes.items():
+        if row_id not in found:
+            errors.append({'index': index, 'id': row_id, 'error': 'Product not found'})
+        elif 'category_id' in fields and fields['category_id'] not in categories:
+            errors.append({'index': index, 'id': row_id, 'error': 'Category not found'})
+        else:
+            valid[row_id] = fields
+
+    updated = bulk_update(table, valid) if valid else []
+    if updated:
+        catalog_cache.record_write([row.id for row in updated])
+    recategorize_products({row_id: (found[row_id].category_id, fields['category_id'])
+                           for row_id, fields in valid.items() if 'category_id' in fields})
+    db.session.commit()
+
+    return jsonify({
+        'status': 'Products updated successfully',
+        'updated': [serialize_product(row) for row in updated],
+        'errors': sorted(errors, key=lambda e: e['index'])
+    }), bulk_status(updated, errors)
+
+
+@app.delete('/product/bulk/delete')
+def bulk_delete_product():
+    try:
+        ids = get_bulk_ids()
+    except BulkError as e:
+        return jsonify({'error': str(e)}), 400
+
+    try:
+        deleted = bulk_delete(Product.__table__, ids)
+    except IntegrityError:
+        db.session.rollback()
+        return jsonify({'error': 'Some products are used by invoices; nothing was deleted'}), 409
+    if deleted:
+        record_deletes('product', [row.id for row in deleted])
+        release_images(STATIC_FOLDER, [row.image for row in deleted])
+        catalog_cache.record_write([row.id for row in deleted], membership_changed=True)
+    db.session.commit()
+
+    found = {row.id for row in deleted}
+    errors = [{'id': i, 'error': 'Product not found'} for i in ids if i not in found]
+    return jsonify({
+        'status': 'Products deleted successfully',
+        'deleted': [serialize_product(row) for row in deleted],
+        'errors': errors
+    }), bulk_status(deleted, errors)
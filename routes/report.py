@@ -1,94 +1,190 @@
-from flask import jsonify
+from flask import jsonify, request
 from flask_jwt_extended import jwt_required
 from sqlalchemy import func
-from datetime import timedelta, datetime
+from datetime import timedelta, datetime, date, time, timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 from app import app,db
-from models import Invoice, Product, InvoiceDetail, Category, User
+from models import (Invoice, Product, Category, User, ProductDailySales, CategoryDailySales,
+                    UserDailySales)
+from utils.pagination import get_page_args, PaginationError
+from utils.cache import report_cache
+
+
+def get_report_window(period):
+    """Resolve the ``[start, end)`` UTC window for a sales report.
+
+    The default window is the current day, week or month in ``?tz=``
+    (default UTC); ``?from=`` and ``?to=`` (inclusive ``YYYY-MM-DD`` local
+    dates) override either end. A daily report with only ``from`` covers
+    that single day.
+    """
+    tz_name = request.args.get('tz', 'UTC')
+    try:
+        tz = ZoneInfo(tz_name)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise ValueError(f'Unknown timezone: {tz_name}')
+
+    today = datetime.now(tz).date()
+    if period == 'daily':
+        start_day = today
+    elif period == 'weekly':
+        start_day = today - timedelta(days=today.weekday())
+    else:
+        start_day = today.replace(day=1)
+    end_day = today
+
+    try:
+        if request.args.get('from'):
+            start_day = date.fromisoformat(request.args['from'])
+        if request.args.get('to'):
+            end_day = date.fromisoformat(request.args['to'])
+        elif period == 'daily':
+            end_day = start_day
+    except ValueError:
+        raise ValueError('from and to must be dates in YYYY-MM-DD format')
+    if end_day < start_day:
+        raise ValueError('from must not be after to')
+
+    def to_utc(day):
+        local = datetime.combine(day, time.min, tzinfo=tz)
+        return local.astimezone(timezone.utc).replace(tzinfo=None)
+
+    return tz, start_day, end_day, to_utc(start_day), to_utc(end_day + timedelta(days=1))
+
+
+def completed_invoices(start, end):
+    return Invoice.query.filter(
+        Invoice.date_time >= start,
+        Invoice.date_time < end,
+        Invoice.status == 'completed'
+    )
+
+
+def sales_totals(start, end):
+    total_sales, total_invoices = completed_invoices(start, end).with_entities(
+        func.coalesce(func.sum(Invoice.total_amount), 0),
+        func.count(Invoice.id)
+    ).one()
+    return float(total_sales), total_invoices
 
 
 @app.route('/reports/sales/daily', methods=['GET'])
 @jwt_required()
+@report_cache.cached
 def daily_sales_report():
-    today = datetime.utcnow().date()
-    start = datetime.combine(today, datetime.min.time())
-    end = datetime.combine(today, datetime.max.time())
-
-    invoices = Invoice.query.filter(
-        Invoice.date_time.between(start, end),
-        Invoice.status == 'completed'
-    ).all()
-
-    total_sales = sum(inv.total_amount for inv in invoices)
+    try:
+        tz, start_day, end_day, start, end = get_report_window('daily')
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
 
-    return jsonify({
+    total_sales, total_invoices = sales_totals(start, end)
+    report = {
         'period': 'daily',
-        'date': today.strftime('%Y-%m-%d'),
+        'date': start_day.strftime('%Y-%m-%d'),
+        'start_date': start_day.strftime('%Y-%m-%d'),
+        'end_date': end_day.strftime('%Y-%m-%d'),
+        'timezone': tz.key,
         'total_sales': total_sales,
-        'total_invoices': len(invoices),
-        'invoices': [{
+        'total_invoices': total_invoices
+    }
+
+    if request.args.get('include_invoices', '').lower() in ('1', 'true', 'yes'):
+        try:
+            page = get_page_args(sort_keys=('date_time', 'id'))
+        except PaginationError as e:
+            return jsonify({'error': str(e)}), 400
+        invoices, next_cursor = page.trim(page.filter_query(completed_invoices(start, end), Invoice))
+        report['invoices'] = [{
             'id': inv.id,
             'total_amount': inv.total_amount,
-            'time': inv.date_time.strftime('%I:%M %p')
+            'time': inv.date_time.replace(tzinfo=timezone.utc).astimezone(tz).strftime('%I:%M %p')
         } for inv in invoices]
-    })
+        report['next_cursor'] = next_cursor
+
+    return jsonify(report)
 
 
 @app.route('/reports/sales/weekly', methods=['GET'])
 @jwt_required()
+@report_cache.cached
 def weekly_sales_report():
-    today = datetime.utcnow().date()
-    start_week = today - timedelta(days=today.weekday())
-    start = datetime.combine(start_week, datetime.min.time())
-    end = datetime.utcnow()
+    try:
+        tz, start_day, end_day, start, end = get_report_window('weekly')
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
 
-    invoices = Invoice.query.filter(
-        Invoice.date_time.between(start, end),
-        Invoice.status == 'completed'
-    ).all()
-
-    total_sales = sum(inv.total_amount for inv in invoices)
+    total_sales, total_invoices = sales_totals(start, end)
 
     return jsonify({
         'period': 'weekly',
-        'start_date': start_week.strftime('%Y-%m-%d'),
-        'end_date': today.strftime('%Y-%m-%d'),
+        'start_date': start_day.strftime('%Y-%m-%d'),
+        'end_date': end_day.strftime('%Y-%m-%d'),
+        'timezone': tz.key,
         'total_sales': total_sales,
-        'total_invoices': len(invoices)
+        'total_invoices': total_invoices
     })
 
 
 @app.route('/reports/sales/monthly', methods=['GET'])
 @jwt_required()
+@report_cache.cached
 def monthly_sales_report():
-    today = datetime.utcnow()
-    start = datetime(today.year, today.month, 1)
+    try:
+        tz, start_day, end_day, start, end = get_report_window('monthly')
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
 
-    invoices = Invoice.query.filter(
-        Invoice.date_time >= start,
-        Invoice.status == 'completed'
-    ).all()
-
-    total_sales = sum(inv.total_amount for inv in invoices)
+    total_sales, total_invoices = sales_totals(start, end)
 
     return jsonify({
         'period': 'monthly',
-        'month': today.strftime('%B %Y'),
+        'month': start_day.strftime('%B %Y'),
+        'start_date': start_day.strftime('%Y-%m-%d'),
+        'end_date': end_day.strftime('%Y-%m-%d'),
+        'timezone': tz.key,
         'total_sales': total_sales,
-        'total_invoices': len(invoices)
+        'total_invoices': total_invoices
     })
 
 
+def get_rollup_days(model):
+    """Filters on ``model.day`` for optional ``?from=``/``?to=`` UTC dates.
+
+    The rollups are kept per UTC day, so a day can't be cut at another
+    timezone's midnight; any ``?tz=`` other than UTC is rejected rather
+    than silently ignored.
+    """
+    tz_name = request.args.get('tz', 'UTC')
+    if tz_name != 'UTC':
+        raise ValueError(f'This report is by UTC day; tz={tz_name} is not supported')
+    filters = []
+    try:
+        if request.args.get('from'):
+            filters.append(model.day >= date.fromisoformat(request.args['from']))
+        if request.args.get('to'):
+            filters.append(model.day <= date.fromisoformat(request.args['to']))
+    except ValueError:
+        raise ValueError('from and to must be dates in YYYY-MM-DD format')
+    return filters
+
+
 @app.route('/reports/sales/by-product', methods=['GET'])
 @jwt_required()
+@report_cache.cached
 def sales_by_product():
+    try:
+        days = get_rollup_days(ProductDailySales)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
     results = db.session.query(
         Product.id,
         Product.name,
-        func.sum(InvoiceDetail.qty).label('total_qty'),
-        func.sum(InvoiceDetail.total).label('total_sales')
-    ).join(InvoiceDetail).join(Invoice).filter(
-        Invoice.status == 'completed'
-    ).group_by(Product.id, Product.name).all()
+        func.sum(ProductDailySales.qty).label('total_qty'),
+        func.sum(ProductDailySales.total_sales).label('total_sales')
+    ).join(ProductDailySales, ProductDailySales.product_id == Product.id)\
+     .filter(*days)\
+     .group_by(Product.id, Product.name).all()
 
     return jsonify([{
         'product_id': r[0],
@@ -100,16 +196,19 @@ def sales_by_product():
 
 @app.route('/reports/sales/by-category', methods=['GET'])
 @jwt_required()
+@report_cache.cached
 def sales_by_category():
+    try:
+        days = get_rollup_days(CategoryDailySales)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
     results = db.session.query(
         Category.id,
         Category.name,
-        func.sum(InvoiceDetail.total).label('total_sales')
-    ).select_from(Category)\
-     .join(Product, Product.category_id == Category.id)\
-     .join(InvoiceDetail, InvoiceDetail.product_id == Product.id)\
-     .join(Invoice, Invoice.id == InvoiceDetail.invoice_id)\
-     .filter(Invoice.status == 'completed')\
+        func.sum(CategoryDailySales.total_sales).label('total_sales')
+    ).join(CategoryDailySales, CategoryDailySales.category_id == Category.id)\
+     .filter(*days)\
      .group_by(Category.id, Category.name).all()
 
     return jsonify([{
@@ -121,19 +220,32 @@ def sales_by_category():
 
 @app.route('/reports/sales/by-user', methods=['GET'])
 @jwt_required()
+@report_cache.cached
 def sales_by_user():
+    try:
+        days = get_rollup_days(UserDailySales)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
     results = db.session.query(
         User.id,
         User.username,
-        func.count(Invoice.id).label('total_invoices'),
-        func.sum(Invoice.total_amount).label('total_sales')
-    ).join(Invoice).filter(
-        Invoice.status == 'completed'
-    ).group_by(User.id, User.username).all()
+        func.sum(UserDailySales.total_invoices).label('total_invoices'),
+        func.sum(UserDailySales.total_sales).label('total_sales')
+    ).join(UserDailySales, UserDailySales.user_id == User.id)\
+     .filter(*days)\
+     .group_by(User.id, User.username).all()
 
     return jsonify([{
         'user_id': r[0],
         'username': r[1],
         'total_invoices': int(r[2]),
         'total_sales': float(r[3])
-    } for r in results])
\ No newline at end of file
+    } for r in results])
+
+
+@app.route('/reports/cache/stats', methods=['GET'])
+@jwt_required()
+def report_cache_stats():
+    return jsonify(dict(report_cache.stats, ttl=report_cache.ttl,
+                        backend=type(report_cache.backend).__name__))
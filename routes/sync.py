@@ -0,0 +1,135 @@
+import base64
+import json
+from datetime import datetime, timedelta
+from flask import request, jsonify
+from sqlalchemy import select
+from app import app, db
+from utils.pagination import MAX_LIMIT, Page, PaginationError, decode_cursor, encode_cursor
+from models import Product, Category, Customer, Tombstone
+from routes.product import serialize_product
+from routes.category import serialize_category
+from routes.customer import serialize_customer
+
+
+# Rows per response unless ?limit= asks for fewer (at most MAX_LIMIT)
+SYNC_PAGE_SIZE = 500
+
+# Rows committed by a transaction that started just before the previous
+# sync can carry an older updated_at, so each pull re-reads this overlap.
+# Clients apply changes as idempotent upserts.
+SYNC_OVERLAP = timedelta(seconds=5)
+
+SYNC_TABLES = {
+    'products': ('product', Product, serialize_product),
+    'categories': ('category', Category, serialize_category),
+    'customers': ('customer', Customer, serialize_customer),
+}
+
+
+def encode_sync_token(state):
+    raw = json.dumps(state, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_sync_token(token):
+    """Return ``(since, resume)``: the moment changes are pulled from (None
+    for a full pull) and, for a pull split over pages, where to carry on."""
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        state = json.loads(raw)
+        since = datetime.fromisoformat(state['t']) if state['t'] else None
+        resume = None
+        if 'u' in state:
+            resume = {
+                'upto': datetime.fromisoformat(state['u']),
+                'tables': [name for name in state['tables'] if name in SYNC_TABLES],
+                'position': int(state['p']),
+                'after': decode_cursor(state['a'])[1:] if state['a'] else None,
+            }
+        return since, resume
+    except (ValueError, KeyError, TypeError, PaginationError):
+        raise ValueError('Invalid sync token')
+
+
+def deleted_since(table_name, since):
+    return list(db.session.execute(
+        select(Tombstone.row_id).where(Tombstone.table_name == table_name, Tombstone.deleted_at >= since)
+    ).scalars())
+
+
+@app.route('/sync', methods=['GET'])
+def sync_changes():
+    """Rows changed and ids deleted since ``?since=<token>``, or every row
+    without one, at most ``?limit=`` rows per response. While ``has_more``
+    the client calls again with the returned token; once a pull completes
+    the token is the start of the next one. A token older than the
+    tombstone retention gets a full pull (``full``: replace local data),
+    since deletes before then are no longer known."""
+    try:
+        limit = int(request.args.get('limit', SYNC_PAGE_SIZE))
+    except ValueError:
+        return jsonify({'error': 'limit must be an integer'}), 400
+    if limit < 1:
+        return jsonify({'error': 'limit must be at least 1'}), 400
+    limit = min(limit, MAX_LIMIT)
+
+    since, resume = None, None
+    if request.args.get('since'):
+        try:
+            since, resume = decode_sync_token(request.args['since'])
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+    if resume:
+        names, upto, position, after = resume['tables'], resume['upto'], resume['position'], resume['after']
+    else:
+        names = list(SYNC_TABLES)
+        if request.args.get('tables'):
+            names = [n.strip() for n in request.args['tables'].split(',') if n.strip()]
+            unknown = [n for n in names if n not in SYNC_TABLES]
+            if unknown:
+                return jsonify({'error': f"Unknown tables: {', '.join(unknown)}"}), 400
+        # Taken before reading so nothing committed during the pull is skipped
+        upto = datetime.utcnow()
+        position, after = 0, None
+        retention = timedelta(days=app.config['SYNC_TOMBSTONE_DAYS'])
+        if since is not None and since < upto - retention:
+            since = None
+
+    changes = {name: [] for name in names}
+    deleted = {name: [] for name in names}
+    remaining = limit
+    while position < len(names) and remaining:
+        name = names[position]
+        table_name, model, serialize = SYNC_TABLES[name]
+        # A full pull walks the primary key; a delta walks updated_at
+        page = Page(remaining, 'id' if since is None else 'updated_at', after)
+        stmt = select(model.__table__)
+        if since is not None:
+            stmt = stmt.where(model.updated_at >= since - SYNC_OVERLAP)
+            if after is None:
+                deleted[name] = deleted_since(table_name, since - SYNC_OVERLAP)
+        rows, next_cursor = page.trim(db.session.execute(page.filter_query(stmt, model)))
+        changes[name].extend(serialize(row) for row in rows)
+        remaining -= len(rows)
+        if next_cursor:
+            after = decode_cursor(next_cursor)[1:]
+            break
+        position, after = position + 1, None
+
+    has_more = position < len(names)
+    if has_more:
+        token = encode_sync_token({
+            't': since.isoformat() if since else None, 'u': upto.isoformat(), 'tables': names,
+            'p': position, 'a': encode_cursor(page.sort, *after) if after else None,
+        })
+    else:
+        token = encode_sync_token({'t': upto.isoformat()})
+
+    return jsonify({
+        'token': token,
+        'has_more': has_more,
+        'full': since is None,
+        'changes': changes,
+        'deleted': deleted,
+    }), 200
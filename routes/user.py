@@ -5,15 +5,24 @@ from sqlalchemy import text
 from flask import jsonify, request
 from sqlalchemy.exc import IntegrityError
 from datetime import datetime
-from werkzeug.security import generate_password_hash
+from utils.passwords import password_hasher
 from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
+from utils.pagination import get_page_args, PaginationError
+from utils.roles import DEFAULT_ROLE, is_admin, may_assign_role
 
 
 
 @app.route('/user/list')
 def get_user():
-    sql = text("SELECT id, username, email, password, role, created_at FROM user")
-    result = db.session.execute(sql).fetchall()
+    try:
+        page = get_page_args(sort_keys=('id', 'created_at'))
+    except PaginationError as e:
+        return jsonify({'error': str(e)}), 400
+
+    where, order_by, params = page.sql()
+    sql = text(f"SELECT id, username, email, password, role, created_at FROM user {where} "
+               f"ORDER BY {order_by} LIMIT :limit")
+    result, next_cursor = page.trim(db.session.execute(sql, params).fetchall())
     rows = []
     for row in result:
         rows.append({
@@ -24,7 +33,7 @@ def get_user():
             'role': row[4],
             'created_at': row[5]
         })
-    return jsonify(rows)
+    return jsonify({'users': rows, 'next_cursor': next_cursor})
 
 
 # ===== GET USER BY ID =====
@@ -54,11 +63,13 @@ def create_user():
     username = user.get('username')
     email = user.get('email')
     password = user.get('password')
-    role = user.get('role', 'user')
+    role = user.get('role') or DEFAULT_ROLE
 
     # Basic validation
     if not username or not email or not password:
         return jsonify({'error': 'username, email, and password are required'}), 400
+    if not may_assign_role(role):
+        return jsonify({'error': 'Only an admin can assign roles'}), 403
 
     # Check for existing username or email first
     check_sql = text("SELECT id FROM user WHERE email = :email OR username = :username")
@@ -79,7 +90,7 @@ def create_user():
         return jsonify({'error': 'Password must contain at least one special character (@$!%*?&)'}), 400
 
     # Hash the password
-    password_hash = generate_password_hash(password)
+    password_hash = password_hasher.hash(password)
 
     # Insert user
     insert_sql = text("""
@@ -120,6 +131,8 @@ def update_user():
     email = user.get('email')
     password = user.get('password')
     role = user.get('role')
+    if role is not None and not is_admin():
+        return jsonify({'message': 'Only an admin can assign roles'}), 403
 
     # Check if user exists
     check_sql = text("SELECT id FROM user WHERE id = :id")
@@ -137,7 +150,7 @@ def update_user():
         params['email'] = email
     if password:
         update_fields.append("password = :password")
-        params['password'] = generate_password_hash(password)
+        params['password'] = password_hasher.hash(password)
     if role:
         update_fields.append("role = :role")
         params['role'] = role
@@ -176,7 +189,11 @@ def delete_user():
 
     # Delete user
     delete_sql = text("DELETE FROM user WHERE id = :id")
-    db.session.execute(delete_sql, {'id': user_id})
-    db.session.commit()
+    try:
+        db.session.execute(delete_sql, {'id': user_id})
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        return jsonify({'message': 'User has invoices and cannot be deleted!'}), 409
 
     return jsonify({'status': 'User deleted successfully!', 'user': user_info})
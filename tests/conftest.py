@@ -0,0 +1,39 @@
+import os
+import tempfile
+
+# app.py builds the app on import, so the test database has to be chosen first
+db_dir = tempfile.mkdtemp()
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(db_dir, 'test.db')}"
+os.environ['REPORT_CACHE_TTL'] = '0'
+
+import pytest
+
+from app import app, db
+from benchmarks.endpoints.seed import Scale, seed_database
+
+
+SEED_INVOICES = 500
+
+
+@pytest.fixture(scope='session', autouse=True)
+def database():
+    """The full migrated schema (FTS tables and triggers included) with the
+    benchmark data set, once. The seed writes fixed ids, so it has to run
+    before any test adds rows."""
+    with app.app_context():
+        seed_database(Scale(SEED_INVOICES))
+    yield
+    with app.app_context():
+        db.engine.dispose()
+
+
+@pytest.fixture
+def app_context():
+    with app.app_context():
+        yield
+        db.session.rollback()
+
+
+@pytest.fixture
+def client():
+    return app.test_client()
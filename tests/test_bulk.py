@@ -0,0 +1,55 @@
+import random
+import uuid
+
+
+def new_email():
+    return f'{uuid.uuid4().hex}@example.com'
+
+
+def test_customer_bulk_create_reports_bad_rows(client):
+    response = client.post('/customer/bulk/create', json=[
+        {'name': {'first': 'n'}, 'email': new_email()},
+        {'name': 'ok', 'email': new_email()},
+        {'name': 'n', 'email': random.randint(10 ** 10, 10 ** 11)},
+    ])
+    body = response.get_json()
+    assert len(body['created']) == 2
+    assert body['errors'] == [{'index': 0, 'error': 'Invalid name'}]
+
+
+def test_customer_bulk_update_reports_bad_rows(client):
+    response = client.put('/customer/bulk/update', json=[
+        {'id': 1, 'email': ['a@b.c']},
+        {'id': 2, 'name': 'renamed'},
+        {'id': 2, 'name': 'renamed again'},
+    ])
+    body = response.get_json()
+    assert [row['id'] for row in body['updated']] == [2]
+    assert body['errors'] == [
+        {'index': 0, 'id': 1, 'error': 'Invalid email'},
+        {'index': 2, 'id': 2, 'error': 'Duplicate id in request'},
+    ]
+
+
+def test_invoice_detail_bulk_create_takes_string_ids(client):
+    response = client.post('/invoice_detail/bulk/create', json=[
+        {'invoice_id': '1', 'product_id': '1', 'price': 1.5, 'qty': 2},
+        {'invoice_id': 'one', 'product_id': 1, 'price': 1.5, 'qty': 2},
+    ])
+    body = response.get_json()
+    assert [(row['invoice_id'], row['product_id']) for row in body['created']] == [(1, 1)]
+    assert body['errors'] == [{'index': 1, 'error': 'Invalid invoice or product ID'}]
+
+
+def test_invoice_detail_bulk_update_reports_duplicates(client):
+    response = client.put('/invoice_detail/bulk/update', json=[
+        {'id': 1, 'product_id': '2'},
+        {'id': 1, 'qty': 3},
+        {'id': 2, 'invoice_id': 'x'},
+    ])
+    body = response.get_json()
+    assert [(row['id'], row['product_id']) for row in body['updated']] == [(1, 2)]
+    assert body['errors'] == [
+        {'index': 1, 'id': 1, 'error': 'Duplicate id in request'},
+        {'index': 2, 'id': 2, 'error': 'Invalid invoice or product ID'},
+    ]
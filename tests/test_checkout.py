@@ -0,0 +1,14 @@
+import pytest
+
+
+@pytest.mark.parametrize('body', [[{'product_id': 1, 'qty': 1}], 'checkout', 5])
+def test_non_object_body_is_400(client, body):
+    assert client.post('/checkout', json=body).status_code == 400
+
+
+def test_status_other_than_completed_is_400(client):
+    response = client.post('/checkout', json={
+        'user_id': 1, 'status': 'pending', 'items': [{'product_id': 1, 'qty': 1}]
+    })
+    assert response.status_code == 400
+    assert 'status' in response.get_json()['error']
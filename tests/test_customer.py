@@ -0,0 +1,13 @@
+import random
+import uuid
+
+
+def test_create_and_update_customer_with_non_string_fields(client):
+    phone = random.randint(10 ** 10, 10 ** 11)
+    response = client.post('/customer/create', json={'name': uuid.uuid4().hex, 'email': phone, 'phone': phone})
+    assert response.status_code == 201
+    customer_id = response.get_json()['customer']['id']
+
+    found = client.get('/customer/lookup', query_string={'q': str(phone), 'field': 'phone'}).get_json()
+    assert customer_id in [customer['id'] for customer in found['customers']]
+    assert client.put('/customer/update', json={'id': customer_id, 'name': 12, 'email': phone + 1}).status_code == 200
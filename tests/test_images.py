@@ -0,0 +1,36 @@
+import os
+
+from sqlalchemy import delete, insert
+
+from app import db
+from models import ImageBlob
+from utils.images import image_files, remove_unreferenced
+
+
+BLOB = 'uploads/' + 'ab' * 32 + '.png'
+
+
+def write_files(static_dir):
+    for relative in image_files(BLOB):
+        path = static_dir / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(b'image')
+
+
+def test_released_blob_is_removed(app_context, tmp_path):
+    write_files(tmp_path)
+    remove_unreferenced([(str(tmp_path), BLOB)])
+    assert os.listdir(tmp_path / 'uploads') == []
+
+
+def test_blob_stored_again_before_the_check_survives(app_context, tmp_path):
+    # An upload of the same content committed after the release did
+    write_files(tmp_path)
+    db.session.execute(insert(ImageBlob).values(path=BLOB, sha256='ab' * 32, ref_count=1))
+    db.session.commit()
+    try:
+        remove_unreferenced([(str(tmp_path), BLOB)])
+        assert sorted(os.listdir(tmp_path / 'uploads')) == sorted(os.path.basename(f) for f in image_files(BLOB))
+    finally:
+        db.session.execute(delete(ImageBlob).where(ImageBlob.path == BLOB))
+        db.session.commit()
@@ -0,0 +1,28 @@
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+def test_unchanged_list_is_304_before_any_product_query(client):
+    first = client.get('/product/list', query_string={'limit': 5})
+    etag = first.headers['ETag']
+
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(Engine, 'before_cursor_execute', record)
+    try:
+        again = client.get('/product/list', query_string={'limit': 5}, headers={'If-None-Match': etag})
+    finally:
+        event.remove(Engine, 'before_cursor_execute', record)
+    assert again.status_code == 304
+    assert not [s for s in statements if 'FROM product' in s]
+
+
+def test_checkout_changes_the_list_etag(client):
+    etag = client.get('/product/list', query_string={'limit': 5}).headers['ETag']
+    response = client.post('/checkout', json={'user_id': 1, 'items': [{'product_id': 1, 'qty': 1}]})
+    assert response.status_code == 201
+    again = client.get('/product/list', query_string={'limit': 5}, headers={'If-None-Match': etag})
+    assert again.status_code == 200
@@ -0,0 +1,81 @@
+"""Every statement a route runs has to read its tables through an index.
+
+Sends each benchmark scenario's request through the test client (against
+the data set conftest seeds) and runs EXPLAIN QUERY PLAN on every statement
+the route executed, so a route whose query changes is checked as it is now
+rather than as it was when someone copied it down.
+"""
+import pytest
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app import app
+from benchmarks.endpoints.scenarios import Fixtures, all_scenarios
+from utils.query_plans import scans_and_sorts
+from utils.slow_queries import explain
+
+
+# These return whole tables on purpose
+FULL_TABLE_SCENARIOS = {'invoice_list_stream', 'invoice_line_list_stream'}
+# Search ranks the FTS matches, so it sorts them (and only them)
+SORTED_MATCH_SCENARIOS = {'product_search', 'product_search_prefix'}
+
+
+@pytest.fixture(scope='module')
+def fixtures():
+    with app.app_context():
+        return Fixtures(seed=0)
+
+
+@pytest.fixture
+def plans():
+    """``(statement, plan)`` for every statement executed while active."""
+    recorded = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        plan = explain(conn, statement, parameters, executemany)
+        if plan is not None:
+            recorded.append((statement, plan))
+
+    event.listen(Engine, 'after_cursor_execute', record)
+    yield recorded
+    event.remove(Engine, 'after_cursor_execute', record)
+
+
+def first_page_scan(statement, plan):
+    """A list's first page: the table is walked in primary key order with
+    no filter, and the walk stops at the LIMIT."""
+    return len(plan) == 1 and plan[0].startswith('SCAN ') and ' LIMIT ' in statement and ' WHERE ' not in statement
+
+
+def plan_problems(scenario, statement, plan):
+    if plan[0].startswith('EXPLAIN failed'):
+        return plan
+    if first_page_scan(statement, plan):
+        return []
+    problems = scans_and_sorts(plan)
+    if scenario.name in SORTED_MATCH_SCENARIOS:
+        problems = [detail for detail in problems if not detail.startswith('USE TEMP B-TREE')]
+    return problems
+
+
+@pytest.mark.parametrize('scenario', all_scenarios(), ids=lambda scenario: scenario.name)
+def test_route_queries_use_indexes(scenario, fixtures, plans, client):
+    fixtures.reset_rng(scenario.name)
+    with app.app_context():
+        request = scenario.request(fixtures, scenario.items(fixtures, 1)[0])
+    del plans[:]  # rows the scenario set up aren't the route's queries
+
+    response = client.open(**request)
+    body = response.get_data()  # runs streamed bodies to the end
+    response.close()
+    assert response.status_code in scenario.expect, body[:300]
+    if scenario.name in FULL_TABLE_SCENARIOS:
+        pytest.skip('reads whole tables by design')
+
+    problems = [
+        f"{' '.join(statement.split())}\n    {detail}"
+        for statement, plan in plans
+        for detail in plan_problems(scenario, statement, plan)
+    ]
+    assert not problems, 'full scans or temp b-tree sorts:\n' + '\n'.join(problems)
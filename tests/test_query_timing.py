@@ -0,0 +1,31 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from app import db
+from utils import query_timing
+
+
+@pytest.fixture
+def timed():
+    """``(statement, elapsed)`` for every statement run while active."""
+    recorded = []
+
+    def record(conn, cursor, statement, parameters, context, executemany, elapsed):
+        recorded.append((statement, elapsed))
+
+    query_timing.on_query(record)
+    yield recorded
+    query_timing._callbacks.remove(record)
+
+
+def test_failed_statement_leaves_nothing_on_connection(app_context, timed):
+    with db.engine.connect() as conn:
+        info_before = dict(conn.info)
+        for _ in range(3):
+            with pytest.raises(OperationalError):
+                conn.execute(text('SELECT * FROM no_such_table'))
+        conn.execute(text('SELECT 1'))
+        assert conn.info == info_before
+    assert [statement for statement, elapsed in timed] == ['SELECT 1']
+    assert timed[0][1] >= 0
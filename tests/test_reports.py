@@ -0,0 +1,22 @@
+import pytest
+from flask_jwt_extended import create_access_token
+
+from app import app
+
+
+ROLLUP_REPORTS = ('/reports/sales/by-product', '/reports/sales/by-category', '/reports/sales/by-user')
+
+
+@pytest.fixture
+def auth_headers():
+    with app.app_context():
+        token = create_access_token(identity={'id': 1, 'username': 'reports', 'role': 'user'})
+    return {'Authorization': f'Bearer {token}'}
+
+
+@pytest.mark.parametrize('path', ROLLUP_REPORTS)
+def test_rollup_reports_reject_other_timezones(client, auth_headers, path):
+    response = client.get(path, query_string={'tz': 'Asia/Phnom_Penh'}, headers=auth_headers)
+    assert response.status_code == 400
+    assert 'UTC' in response.get_json()['error']
+    assert client.get(path, query_string={'tz': 'UTC'}, headers=auth_headers).status_code == 200
@@ -0,0 +1,50 @@
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, insert
+
+from app import db
+from models import RevokedToken
+from utils.revocation import REVOCATION_OVERLAP, RevocationList
+
+
+def new_jti():
+    return str(uuid.uuid4())
+
+
+def test_other_worker_sees_revocation_after_purge(app_context):
+    db.session.execute(delete(RevokedToken))
+    db.session.commit()
+    worker_a = RevocationList(refresh_interval=0)
+    worker_b = RevocationList(refresh_interval=0)
+
+    for _ in range(3):
+        worker_a.revoke(new_jti(), time.time() - 1)  # already expired
+    worker_b.refresh()
+
+    # Purges the three expired rows, so on SQLite the new row reuses id 1
+    jti = new_jti()
+    worker_a.revoke(jti, time.time() + 3600)
+    worker_b.refresh()
+
+    assert worker_a.is_revoked(jti)
+    assert worker_b.is_revoked(jti)
+
+
+def test_late_commit_within_overlap_is_picked_up(app_context):
+    worker = RevocationList(refresh_interval=0)
+    worker.revoke(new_jti(), time.time() + 3600)
+    worker.refresh()
+
+    # A row stamped before the newest one seen, committed only now
+    jti = new_jti()
+    db.session.execute(insert(RevokedToken).values(
+        jti=jti,
+        expires_at=datetime.utcnow() + timedelta(hours=1),
+        revoked_at=datetime.utcnow() - REVOCATION_OVERLAP / 2,
+    ))
+    db.session.commit()
+    worker.refresh()
+
+    assert worker.is_revoked(jti)
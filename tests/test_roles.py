@@ -0,0 +1,68 @@
+import uuid
+
+from flask_jwt_extended import create_access_token
+from sqlalchemy import update
+
+from app import app, db
+from models import User
+
+
+def register(client, role=None, token=None):
+    name = f'user-{uuid.uuid4().hex[:8]}'
+    body = {'username': name, 'email': f'{name}@example.com', 'password': 'Secret-123'}
+    if role:
+        body['role'] = role
+    headers = {'Authorization': f'Bearer {token}'} if token else {}
+    return client.post('/auth/register', json=body, headers=headers)
+
+
+def login_token(client, response):
+    user = response.get_json()['user']
+    login = client.post('/auth/login', json={'username': user['username'], 'password': 'Secret-123'})
+    return login.get_json()['access_token']
+
+
+def set_role(user_id, role):
+    with app.app_context():
+        db.session.execute(update(User).where(User.id == user_id).values(role=role))
+        db.session.commit()
+
+
+def slow_queries_status(client, token):
+    return client.get('/admin/slow-queries', headers={'Authorization': f'Bearer {token}'}).status_code
+
+
+def test_register_cannot_pick_admin_role(client):
+    response = register(client, role='admin')
+    assert response.status_code == 403
+    assert register(client).get_json()['user']['role'] == 'user'
+
+
+def test_admin_check_reads_role_from_database(client):
+    response = register(client)
+    user = response.get_json()['user']
+    token = login_token(client, response)
+    assert slow_queries_status(client, token) == 403
+
+    # A token claiming admin for a plain user gets nowhere
+    with app.app_context():
+        forged = create_access_token(identity={**user, 'role': 'admin'})
+    assert slow_queries_status(client, forged) == 403
+
+    # Promotion takes effect without logging in again
+    set_role(user['id'], 'admin')
+    assert slow_queries_status(client, token) == 200
+    assert register(client, role='admin', token=token).status_code == 201
+
+
+def test_changing_a_role_needs_admin(client):
+    response = register(client)
+    user = response.get_json()['user']
+    token = login_token(client, response)
+    assert client.put('/user/update', json={'id': user['id'], 'role': 'admin'}).status_code == 403
+    assert client.put('/user/update', json={'id': user['id'], 'role': 'admin'},
+                      headers={'Authorization': f'Bearer {token}'}).status_code == 403
+
+    set_role(user['id'], 'admin')
+    assert client.put('/user/update', json={'id': user['id'], 'role': 'user'},
+                      headers={'Authorization': f'Bearer {token}'}).status_code == 200
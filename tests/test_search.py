@@ -0,0 +1,24 @@
+import pytest
+
+import utils.search
+
+
+@pytest.fixture
+def unmigrated_search(monkeypatch):
+    """Point search at a table the migrations never created."""
+    monkeypatch.setattr(utils.search, 'SEARCH_TABLE', 'missing_fts')
+    monkeypatch.setattr(utils.search, '_search_ready', False)
+    yield
+    utils.search._search_ready = False
+
+
+def test_search_without_index_is_503(unmigrated_search, client):
+    response = client.get('/product/search', query_string={'q': 'milk'})
+    assert response.status_code == 503
+    assert 'flask db upgrade' in response.get_json()['error']
+
+
+def test_search_with_index(client):
+    response = client.get('/product/search', query_string={'q': 'milk'})
+    assert response.status_code == 200
+    assert utils.search._search_ready
@@ -0,0 +1,35 @@
+import pytest
+from sqlalchemy import insert, select, text
+from sqlalchemy.exc import OperationalError
+
+from app import db
+from models import Category
+from utils import slow_queries
+
+
+@pytest.fixture
+def savepoints(monkeypatch):
+    """Take the PostgreSQL path on SQLite, which has savepoints too."""
+    monkeypatch.setattr(slow_queries, 'SAVEPOINT_DIALECTS', {db.engine.dialect.name})
+
+
+def test_failed_explain_keeps_callers_transaction(app_context, savepoints):
+    with db.engine.connect() as conn:
+        with conn.begin():
+            conn.execute(insert(Category).values(name='explain-savepoint'))
+
+            plan = slow_queries.explain(conn, 'SELECT * FROM no_such_table', (), False)
+
+            assert plan[0].startswith('EXPLAIN failed')
+            assert conn.execute(select(Category.id).where(Category.name == 'explain-savepoint')).first()
+            with pytest.raises(OperationalError, match='no such savepoint'):
+                conn.execute(text(f'RELEASE SAVEPOINT {slow_queries.EXPLAIN_SAVEPOINT}'))
+            conn.rollback()
+
+
+def test_explain_in_savepoint(app_context, savepoints):
+    with db.engine.connect() as conn:
+        with conn.begin():
+            plan = slow_queries.explain(conn, 'SELECT * FROM category WHERE id = ?', (1,), False)
+            assert plan and plan[0].startswith('SEARCH category')
+            conn.rollback()
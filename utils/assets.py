@@ -0,0 +1,50 @@
+import mimetypes
+import os
+
+from flask import send_from_directory, Response
+from werkzeug.security import safe_join
+from werkzeug.exceptions import NotFound
+
+from app import app
+from utils.images import IMAGE_CACHE_MAX_AGE, CONTENT_ADDRESSED
+
+
+def asset_url(path):
+    """Public URL for a file under ``static/``."""
+    return f"{app.config['ASSET_BASE_URL'].rstrip('/')}/{path}"
+
+
+def asset_max_age(path):
+    if CONTENT_ADDRESSED.match(os.path.basename(path)):
+        return IMAGE_CACHE_MAX_AGE
+    return app.config['STATIC_MAX_AGE']
+
+
+def send_asset(filename):
+    """Serve ``static/<filename>`` with caching headers.
+
+    Python streams the file (with ETag, Last-Modified and Range support from
+    ``send_from_directory``) unless ``STATIC_SENDFILE`` hands it to the web
+    server: 'x-sendfile' uses Flask's ``USE_X_SENDFILE``, 'x-accel' returns
+    an empty response that nginx resolves against its internal location.
+    """
+    max_age = asset_max_age(filename)
+    if app.config['STATIC_SENDFILE'] == 'x-accel':
+        path = safe_join(app.static_folder, filename)
+        if path is None or not os.path.isfile(path):
+            raise NotFound()
+        response = Response(mimetype=mimetypes.guess_type(filename)[0] or 'application/octet-stream')
+        response.headers['X-Accel-Redirect'] = f"{app.config['X_ACCEL_PREFIX'].rstrip('/')}/{filename}"
+    else:
+        # Hash-named files are their own validator; mtime changes on re-upload
+        etag = os.path.basename(filename).split('.')[0] if max_age == IMAGE_CACHE_MAX_AGE else True
+        response = send_from_directory(app.static_folder, filename, max_age=max_age, etag=etag)
+    response.cache_control.public = True
+    response.cache_control.max_age = max_age
+    if max_age == IMAGE_CACHE_MAX_AGE:
+        response.cache_control.immutable = True
+    return response
+
+
+# Route Flask's built-in /static endpoint through send_asset
+app.view_functions['static'] = send_asset
@@ -0,0 +1,119 @@
+from flask import request
+from sqlalchemy import select, insert, update, delete, case
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app import db
+
+
+BULK_MAX_ROWS = 50000
+# Keeps every statement well under SQLite's bound-parameter limit
+BULK_CHUNK_SIZE = 500
+
+
+class BulkError(ValueError):
+    pass
+
+
+def dialect_insert(table):
+    """``INSERT`` construct that supports ``on_conflict_do_update``."""
+    if db.engine.dialect.name == 'postgresql':
+        return postgresql.insert(table)
+    return sqlite.insert(table)
+
+
+def get_bulk_rows():
+    """Return the request's rows: a JSON array or ``{"items": [...]}``."""
+    data = request.get_json(silent=True)
+    if isinstance(data, dict):
+        data = data.get('items')
+    if not isinstance(data, list) or not data:
+        raise BulkError('Expected a non-empty JSON array of rows')
+    if len(data) > BULK_MAX_ROWS:
+        raise BulkError(f'At most {BULK_MAX_ROWS} rows per request')
+    return data
+
+
+def get_bulk_ids():
+    """Return the ids to delete: a JSON array or ``{"ids": [...]}``."""
+    data = request.get_json(silent=True)
+    if isinstance(data, dict):
+        data = data.get('ids')
+    if not isinstance(data, list) or not data:
+        raise BulkError('Expected a non-empty list of ids')
+    if len(data) > BULK_MAX_ROWS:
+        raise BulkError(f'At most {BULK_MAX_ROWS} ids per request')
+    try:
+        return list(dict.fromkeys(int(i) for i in data))
+    except (TypeError, ValueError):
+        raise BulkError('ids must be integers')
+
+
+def chunked(items, size=BULK_CHUNK_SIZE):
+    items = list(items)
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def fetch_by_ids(table, ids, *columns):
+    """Map id -> row for the ids that exist, using chunked ``IN`` queries."""
+    columns = columns or tuple(table.c)
+    found = {}
+    for chunk in chunked(set(ids)):
+        stmt = select(table.c.id, *columns).where(table.c.id.in_(chunk))
+        for row in db.session.execute(stmt):
+            found[row.id] = row
+    return found
+
+
+def existing_ids(table, ids):
+    return set(fetch_by_ids(table, ids, table.c.id))
+
+
+def bulk_insert(table, rows):
+    """executemany INSERT ... RETURNING, which SQLAlchemy sends as one
+    multi-row ``INSERT ... VALUES (...), (...)`` per chunk; rows come back
+    in input order.
+
+    RETURNING order isn't guaranteed, but ids are handed out in VALUES
+    order within a statement, so sorting by id restores the input order.
+    (``sort_by_parameter_order`` would do the same by sending one INSERT
+    per row on SQLite.)
+    """
+    created = []
+    for chunk in chunked(rows):
+        stmt = insert(table).returning(*table.c)
+        created.extend(sorted(db.session.execute(stmt, chunk).all(), key=lambda row: row.id))
+    return created
+
+
+def bulk_update(table, changes):
+    """Apply ``{id: {column: value}}`` with one ``UPDATE ... WHERE id IN``
+    per chunk, using ``CASE id`` for per-row values, and return the rows."""
+    updated = []
+    for chunk in chunked(changes):
+        columns = {col for row_id in chunk for col in changes[row_id]}
+        values = {
+            col: case(
+                {row_id: changes[row_id][col] for row_id in chunk if col in changes[row_id]},
+                value=table.c.id,
+                else_=table.c[col]
+            )
+            for col in columns
+        }
+        stmt = update(table).where(table.c.id.in_(chunk)).values(values).returning(*table.c)
+        updated.extend(db.session.execute(stmt).all())
+    return updated
+
+
+def bulk_delete(table, ids):
+    """``DELETE ... WHERE id IN ... RETURNING`` for each chunk of ids."""
+    deleted = []
+    for chunk in chunked(ids):
+        stmt = delete(table).where(table.c.id.in_(chunk)).returning(*table.c)
+        deleted.extend(db.session.execute(stmt).all())
+    return deleted
+
+
+def bulk_status(done, errors, success_code=200):
+    """``success_code`` if any row went through, 400 if every row failed."""
+    return success_code if done or not errors else 400
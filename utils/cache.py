@@ -0,0 +1,180 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from flask import request, Response
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app import app, db
+
+
+class LocalCacheBackend:
+    """In-process LRU with per-entry expiry."""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._generations = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (value, time.time() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def generation(self, namespace):
+        return self._generations.get(namespace, 0)
+
+    def bump(self, namespace):
+        with self._lock:
+            self._generations[namespace] = self._generations.get(namespace, 0) + 1
+            prefix = f'{namespace}:'
+            for key in [k for k in self._entries if k.startswith(prefix)]:
+                del self._entries[key]
+
+
+class SQLiteCacheBackend:
+    """Cache in a separate SQLite file so every worker on the host shares
+    entries and invalidations."""
+
+    def __init__(self, path, max_entries):
+        self.path = path
+        self.max_entries = max_entries
+        self._local = threading.local()
+        conn = self._conn()
+        conn.execute('CREATE TABLE IF NOT EXISTS cache_entry ('
+                     'key TEXT PRIMARY KEY, value BLOB, expires_at REAL, accessed_at REAL)')
+        conn.execute('CREATE INDEX IF NOT EXISTS ix_cache_entry_accessed_at ON cache_entry (accessed_at)')
+        conn.execute('CREATE TABLE IF NOT EXISTS cache_generation (namespace TEXT PRIMARY KEY, gen INTEGER)')
+
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def get(self, key):
+        now = time.time()
+        conn = self._conn()
+        row = conn.execute('SELECT value FROM cache_entry WHERE key = ? AND expires_at > ?',
+                           (key, now)).fetchone()
+        if row is None:
+            return None
+        conn.execute('UPDATE cache_entry SET accessed_at = ? WHERE key = ?', (now, key))
+        return json.loads(row[0])
+
+    def set(self, key, value, ttl):
+        now = time.time()
+        conn = self._conn()
+        conn.execute('INSERT OR REPLACE INTO cache_entry (key, value, expires_at, accessed_at) '
+                     'VALUES (?, ?, ?, ?)', (key, json.dumps(value), now + ttl, now))
+        conn.execute('DELETE FROM cache_entry WHERE expires_at <= ?', (now,))
+        conn.execute('DELETE FROM cache_entry WHERE key IN (SELECT key FROM cache_entry '
+                     'ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)', (self.max_entries,))
+
+    def generation(self, namespace):
+        row = self._conn().execute('SELECT gen FROM cache_generation WHERE namespace = ?',
+                                   (namespace,)).fetchone()
+        return row[0] if row else 0
+
+    def bump(self, namespace):
+        # Old entries become unreachable through the key and age out via LRU
+        self._conn().execute('INSERT INTO cache_generation (namespace, gen) VALUES (?, 1) '
+                             'ON CONFLICT(namespace) DO UPDATE SET gen = gen + 1', (namespace,))
+
+
+class ResponseCache:
+    """Caches successful JSON responses keyed by endpoint and query string.
+
+    Keys embed the namespace generation, so ``invalidate()`` is a single
+    counter bump that every worker sharing the backend sees.
+    """
+
+    def __init__(self, backend, namespace, ttl):
+        self.backend = backend
+        self.namespace = namespace
+        self.ttl = ttl
+        self.stats = {'hits': 0, 'misses': 0, 'invalidations': 0}
+
+    def _key(self):
+        args = '&'.join(f'{k}={v}' for k, v in sorted(request.args.items(multi=True)))
+        generation = self.backend.generation(self.namespace)
+        return f'{self.namespace}:{generation}:{request.endpoint}?{args}'
+
+    def cached(self, view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if self.ttl <= 0:
+                return view(*args, **kwargs)
+            key = self._key()
+            entry = self.backend.get(key)
+            if entry is not None:
+                self.stats['hits'] += 1
+                return Response(entry['body'], status=entry['status'], mimetype=entry['mimetype'])
+            self.stats['misses'] += 1
+
+            response = app.make_response(view(*args, **kwargs))
+            if response.status_code == 200 and response.is_json:
+                self.backend.set(key, {
+                    'body': response.get_data(as_text=True),
+                    'status': response.status_code,
+                    'mimetype': response.mimetype
+                }, self.ttl)
+            return response
+        return wrapper
+
+    def invalidate(self):
+        self.stats['invalidations'] += 1
+        self.backend.bump(self.namespace)
+
+    def invalidate_on_commit(self):
+        """Invalidate once the current transaction commits, so readers can't
+        re-cache pre-commit data."""
+        db.session.info.setdefault('invalidate_caches', set()).add(self)
+
+
+def make_cache(namespace):
+    max_entries = app.config['REPORT_CACHE_MAX_ENTRIES']
+    if app.config['REPORT_CACHE_BACKEND'] == 'sqlite':
+        path = app.config['REPORT_CACHE_PATH'] or os.path.join(app.instance_path, 'report_cache.db')
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        backend = SQLiteCacheBackend(path, max_entries)
+    else:
+        backend = LocalCacheBackend(max_entries)
+    return ResponseCache(backend, namespace, app.config['REPORT_CACHE_TTL'])
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_after_commit(session):
+    for cache in session.info.pop('invalidate_caches', ()):
+        cache.invalidate()
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_invalidations(session):
+    session.info.pop('invalidate_caches', None)
+
+
+report_cache = make_cache('reports')
@@ -0,0 +1,181 @@
+import json
+import threading
+from collections import OrderedDict
+
+from sqlalchemy import event, select, insert, delete
+from sqlalchemy.orm import Session
+
+from app import db
+from models import TableChange
+from utils.versions import current_version, bump_version
+
+
+# Versions of table_change kept per table; a worker that falls further
+# behind than this clears its whole cache instead
+CHANGE_LOG_SIZE = 1000
+CHANGE_LOG_PRUNE_EVERY = 100
+
+
+class CatalogCache:
+    """Read-through cache of serialized rows for one table.
+
+    Items are keyed by id; list pages only store ids plus the next cursor, so
+    an update drops just the touched items. Every write bumps
+    ``table_version`` and logs the ids it touched in ``table_change``. Each
+    read compares the cached version with ``table_version`` and drops what
+    the log says other workers changed since; only a table-wide write, or a
+    bump with no log entry (``flask import-data``), clears everything.
+    """
+
+    def __init__(self, table_name, load_rows, max_items=100000, max_pages=1000):
+        self.table_name = table_name
+        self.load_rows = load_rows
+        self.max_items = max_items
+        self.max_pages = max_pages
+        self.version = None
+        self._generation = 0  # bumped on every drop, so racing fills are skipped
+        self._items = OrderedDict()
+        self._pages = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _drop(self, ids, pages):
+        """Drop ``ids`` (every item when ``None``) and, if ``pages``, every
+        list page."""
+        if ids is None:
+            self._items.clear()
+        else:
+            for row_id in ids:
+                self._items.pop(row_id, None)
+        if ids is None or pages:
+            self._pages.clear()
+        self._generation += 1
+
+    def _changes_since(self, known, version):
+        """``(row_ids, membership_changed)`` per bump after ``known``, or
+        ``None`` if the log doesn't cover all of them."""
+        if known is None or not 0 < version - known <= CHANGE_LOG_SIZE:
+            return None
+        changes = db.session.execute(
+            select(TableChange.row_ids, TableChange.membership_changed)
+            .where(TableChange.name == self.table_name,
+                   TableChange.version > known, TableChange.version <= version)
+        ).all()
+        if len(changes) != version - known:
+            return None
+        return [(None if row_ids is None else json.loads(row_ids), membership_changed)
+                for row_ids, membership_changed in changes]
+
+    def sync(self):
+        """Drop what other workers changed since the last sync."""
+        version = current_version(self.table_name)
+        with self._lock:
+            known = self.version
+        if version == known:
+            return
+        changes = self._changes_since(known, version)
+        with self._lock:
+            if self.version != known or changes is None:
+                # Another thread got here first, or the log can't tell
+                self._drop(None, True)
+            else:
+                for row_ids, membership_changed in changes:
+                    self._drop(row_ids, membership_changed)
+            self.version = version if self.version is None else max(self.version, version)
+
+    def get_items(self, ids):
+        """Return ``{id: row}`` for ``ids``, loading misses in one query."""
+        found = {}
+        with self._lock:
+            for row_id in ids:
+                row = self._items.get(row_id)
+                if row is not None:
+                    self._items.move_to_end(row_id)
+                    found[row_id] = row
+            generation = self._generation
+        missing = [row_id for row_id in ids if row_id not in found]
+        if missing:
+            loaded = self.load_rows(missing)
+            with self._lock:
+                # Skip the fill if a write landed while we were loading
+                if self._generation == generation:
+                    for row_id, row in loaded.items():
+                        self._items[row_id] = row
+                    while len(self._items) > self.max_items:
+                        self._items.popitem(last=False)
+            found.update(loaded)
+        return found
+
+    def get_page(self, key, fetch_ids):
+        """Return ``(ids, next_cursor)`` for a list page, calling
+        ``fetch_ids()`` on a miss."""
+        with self._lock:
+            page = self._pages.get(key)
+            if page is not None:
+                self._pages.move_to_end(key)
+                return page
+            generation = self._generation
+        page = fetch_ids()
+        with self._lock:
+            if self._generation == generation:
+                self._pages[key] = page
+                while len(self._pages) > self.max_pages:
+                    self._pages.popitem(last=False)
+        return page
+
+    def record_write(self, ids=None, membership_changed=False):
+        """Bump the table version in the current transaction and remember
+        what to drop once it commits. ``ids=None`` drops every item."""
+        pending = db.session.info.setdefault('catalog_writes', {})
+        write = pending.get(self)
+        if write is None:
+            write = pending[self] = {
+                'version': bump_version(self.table_name), 'ids': set(), 'all': False, 'pages': False
+            }
+        if ids is None:
+            write['all'] = True
+        else:
+            write['ids'].update(ids)
+        write['pages'] = write['pages'] or membership_changed
+
+    def log_write(self, session, write):
+        """Record in ``table_change`` what ``write`` touched, in its
+        transaction, so other workers can drop the same rows."""
+        session.execute(insert(TableChange).values(
+            name=self.table_name,
+            version=write['version'],
+            row_ids=None if write['all'] else json.dumps(sorted(write['ids'])),
+            membership_changed=write['pages']
+        ))
+        if write['version'] % CHANGE_LOG_PRUNE_EVERY == 0:
+            session.execute(delete(TableChange).where(
+                TableChange.name == self.table_name,
+                TableChange.version <= write['version'] - CHANGE_LOG_SIZE
+            ))
+
+    def apply_write(self, write):
+        with self._lock:
+            self._drop(None if write['all'] else write['ids'], write['pages'])
+            # If someone else bumped in between, the version stays put and the
+            # next sync() drops their rows (and ours again) from the log
+            if self.version is not None and write['version'] == self.version + 1:
+                self.version = write['version']
+
+
+@event.listens_for(Session, 'before_commit')
+def _log_catalog_writes(session):
+    for cache, write in session.info.get('catalog_writes', {}).items():
+        cache.log_write(session, write)
+
+
+@event.listens_for(Session, 'after_commit')
+def _apply_catalog_writes(session):
+    for cache, write in session.info.pop('catalog_writes', {}).items():
+        cache.apply_write(write)
+
+
+@event.listens_for(Session, 'after_transaction_end')
+def _discard_catalog_writes(session, transaction):
+    # Anything still pending was rolled back, or the session closed without
+    # committing; it must not be logged by the next commit
+    if transaction.parent is None:
+        session.info.pop('catalog_writes', None)
@@ -0,0 +1,208 @@
+import hashlib
+import os
+import re
+import tempfile
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import bindparam, event, select, update, delete
+from sqlalchemy.orm import Session
+
+from app import app, db
+from models import ImageBlob
+from utils.bulk import dialect_insert
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # Pillow is optional; uploads are then served as-is
+    Image = None
+
+
+# name -> (max width/height or None for full size, WebP quality)
+IMAGE_VARIANTS = {
+    'full': (None, 90),
+    'thumb': (320, 75),
+    'medium': (1024, 82),
+}
+
+# Blob and variant names embed the content hash, so a URL never changes content
+IMAGE_CACHE_MAX_AGE = 365 * 24 * 3600
+CONTENT_ADDRESSED = re.compile(r'^[0-9a-f]{64}(_[a-z]+)?\.[a-z0-9]+$')
+
+HASH_CHUNK_SIZE = 64 * 1024
+
+_executor = ThreadPoolExecutor(max_workers=app.config['IMAGE_WORKERS'], thread_name_prefix='images')
+
+
+def images_enabled():
+    return Image is not None
+
+
+def submit_image_job(fn, *args):
+    """Run ``fn(*args)`` on the image pool inside an app context."""
+    def run():
+        with app.app_context():
+            try:
+                fn(*args)
+            except Exception:
+                app.logger.exception('Image job %s%r failed', fn.__name__, args)
+    return _executor.submit(run)
+
+
+def variant_path(path, name):
+    return f'{os.path.splitext(path)[0]}_{name}.webp'
+
+
+def image_files(path):
+    """The blob at ``path`` plus every variant built from it."""
+    return [path] + [variant_path(path, name) for name in IMAGE_VARIANTS]
+
+
+def _hash_to_temp(stream, folder):
+    """Copy ``stream`` into a temp file in ``folder``, hashing as it goes."""
+    digest = hashlib.sha256()
+    fd, temp_path = tempfile.mkstemp(dir=folder, suffix='.upload')
+    try:
+        with os.fdopen(fd, 'wb') as out:
+            while True:
+                chunk = stream.read(HASH_CHUNK_SIZE)
+                if not chunk:
+                    break
+                digest.update(chunk)
+                out.write(chunk)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+    return digest.hexdigest(), temp_path
+
+
+def store_image(file, static_dir, folder):
+    """Store an upload as ``<folder>/<sha256>.<ext>`` and take a reference
+    on it in the current transaction. Returns ``(path, status)`` where
+    ``status`` is the blob's variant build state.
+
+    The upload waits in a temp file until the transaction commits and is
+    only then moved into place, so an insert or commit that fails leaves
+    no file behind, and a rollback can't remove a copy of the same blob
+    that another request has committed in the meantime.
+    """
+    ext = file.filename.rsplit('.', 1)[1].lower()
+    digest, temp_path = _hash_to_temp(file.stream, os.path.join(static_dir, folder))
+    path = f'{folder}/{digest}.{ext}'
+    try:
+        stmt = dialect_insert(ImageBlob.__table__).values(
+            path=path, sha256=digest, ref_count=1, status='pending' if images_enabled() else None
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['path'], set_={'ref_count': ImageBlob.__table__.c.ref_count + 1}
+        ).returning(ImageBlob.__table__.c.status)
+        status = db.session.execute(stmt).scalar()
+    except BaseException:
+        os.remove(temp_path)
+        raise
+    db.session.info.setdefault('image_uploads', []).append((temp_path, os.path.join(static_dir, path)))
+    return path, status
+
+
+def release_images(static_dir, paths):
+    """Drop one reference per entry in ``paths``; blobs nobody points at any
+    more are deleted along with their variants."""
+    counts = Counter(p for p in paths if p)
+    if not counts:
+        return
+    table = ImageBlob.__table__
+    db.session.execute(
+        update(table).where(table.c.path == bindparam('blob_path'))
+        .values(ref_count=table.c.ref_count - bindparam('n')),
+        [{'blob_path': path, 'n': n} for path, n in counts.items()]
+    )
+    unreferenced = db.session.execute(
+        delete(table).where(table.c.path.in_(list(counts)), table.c.ref_count <= 0).returning(table.c.path)
+    ).scalars().all()
+    if unreferenced:
+        # Unlinked once the delete has committed; see _finish_image_writes
+        db.session.info.setdefault('image_releases', []).extend((static_dir, path) for path in unreferenced)
+
+
+def remove_unreferenced(releases):
+    """Unlink released blobs and their variants, skipping any blob that a
+    later upload has stored again since the release committed.
+
+    Each file is first renamed aside and only then checked against
+    image_blob. An upload that commits before the check is seen by it, and
+    its file is renamed back. One that commits after the check moves a
+    fresh file into the emptied path. Either way its file survives.
+    """
+    moved = []
+    for static_dir, path in releases:
+        for relative in image_files(path):
+            file_path = os.path.join(static_dir, relative)
+            trash_path = f'{file_path}.{uuid.uuid4().hex}.deleting'
+            try:
+                os.rename(file_path, trash_path)
+            except FileNotFoundError:
+                continue
+            moved.append((path, file_path, trash_path))
+    if not moved:
+        return
+
+    table = ImageBlob.__table__
+    with db.engine.connect() as conn:
+        stored_again = set(conn.execute(
+            select(table.c.path).where(table.c.path.in_({path for path, _, _ in moved}))
+        ).scalars())
+    for path, file_path, trash_path in moved:
+        if path in stored_again:
+            os.replace(trash_path, file_path)
+        else:
+            os.remove(trash_path)
+
+
+@event.listens_for(Session, 'after_commit')
+def _finish_image_writes(session):
+    for temp_path, file_path in session.info.pop('image_uploads', []):
+        os.replace(temp_path, file_path)
+    releases = session.info.pop('image_releases', None)
+    if releases:
+        remove_unreferenced(releases)
+
+
+@event.listens_for(Session, 'after_transaction_end')
+def _discard_image_writes(session, transaction):
+    # Runs after _finish_image_writes on commit, so anything left here was
+    # rolled back (or the session closed without committing)
+    if transaction.parent is not None:
+        return
+    for temp_path, _ in session.info.pop('image_uploads', []):
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+    session.info.pop('image_releases', None)
+
+
+def generate_variants(static_dir, path):
+    """Write a metadata-free WebP per ``IMAGE_VARIANTS`` next to the blob at
+    ``static_dir/path``. Returns ``{name: relative path}``."""
+    with Image.open(os.path.join(static_dir, path)) as original:
+        original.load()
+        # Bake the EXIF rotation into the pixels before the EXIF is dropped
+        image = ImageOps.exif_transpose(original)
+
+    if image.mode in ('P', 'LA', 'PA') or 'transparency' in image.info:
+        image = image.convert('RGBA')
+    elif image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGB')
+
+    # A fresh image carries none of the EXIF/GPS/ICC blocks of the upload
+    clean = Image.new(image.mode, image.size)
+    clean.paste(image)
+
+    variants = {}
+    for name, (size, quality) in IMAGE_VARIANTS.items():
+        resized = clean.copy()
+        if size:
+            resized.thumbnail((size, size), Image.LANCZOS)
+        relative = variant_path(path, name)
+        resized.save(os.path.join(static_dir, relative), format='WEBP', quality=quality, method=4)
+        variants[name] = relative
+    return variants
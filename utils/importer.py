@@ -0,0 +1,232 @@
+import csv
+import gzip
+import io
+import json
+import time
+from datetime import datetime, date
+
+import click
+from sqlalchemy import Date, DateTime, Float, Integer, insert
+
+from app import app, db
+from models import Category, Product, Customer, Invoice, InvoiceDetail
+from models.customer import with_normalized
+from utils.cache import report_cache
+from utils.sales_rollup import rebuild_rollups
+from utils.versions import bump_version
+
+
+IMPORT_BATCH_SIZE = 10000
+
+
+def line_total(row):
+    if row.get('total') is None and row.get('price') is not None and row.get('qty') is not None:
+        row['total'] = row['price'] * row['qty']
+    return row
+
+
+# CLI option -> (model, per-row fix-up), in foreign key order
+IMPORT_TABLES = {
+    'categories': (Category, None),
+    'products': (Product, None),
+    'customers': (Customer, with_normalized),
+    'invoices': (Invoice, None),
+    'invoice-lines': (InvoiceDetail, line_total),
+}
+
+
+def _to_int(value):
+    return None if value is None or value == '' else int(value)
+
+
+def _to_float(value):
+    return None if value is None or value == '' else float(value)
+
+
+def _to_datetime(value):
+    if value is None or value == '' or isinstance(value, datetime):
+        return value or None
+    return datetime.fromisoformat(value)
+
+
+def _to_date(value):
+    if value is None or value == '' or isinstance(value, date):
+        return value or None
+    return date.fromisoformat(value)
+
+
+def _to_str(value):
+    return None if value is None or value == '' else str(value)
+
+
+def column_converters(table, columns):
+    """One converter per named column, turning CSV text (or JSON values)
+    into what the column type binds."""
+    unknown = [name for name in columns if name not in table.c]
+    if unknown:
+        raise click.ClickException(f"{table.name}: unknown columns {', '.join(unknown)}")
+    converters = []
+    for name in columns:
+        column_type = table.c[name].type
+        if isinstance(column_type, Integer):
+            converters.append(_to_int)
+        elif isinstance(column_type, Float):
+            converters.append(_to_float)
+        elif isinstance(column_type, DateTime):
+            converters.append(_to_datetime)
+        elif isinstance(column_type, Date):
+            converters.append(_to_date)
+        else:
+            converters.append(_to_str)
+    return converters
+
+
+def open_text(path):
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rt', encoding='utf-8', newline='')
+    return io.open(path, encoding='utf-8', newline='')
+
+
+def read_rows(path, table):
+    """Yield column dicts from a CSV file (header row = column names) or a
+    JSONL file (one object per line); either may be gzipped."""
+    name = path[:-3] if path.endswith('.gz') else path
+    with open_text(path) as f:
+        if name.endswith(('.jsonl', '.ndjson')):
+            converters = {}
+            for line in f:
+                if not line.strip():
+                    continue
+                item = json.loads(line)
+                missing = [key for key in item if key not in converters]
+                if missing:
+                    converters.update(zip(missing, column_converters(table, missing)))
+                yield {key: converters[key](value) for key, value in item.items()}
+        elif name.endswith('.csv'):
+            reader = csv.reader(f)
+            columns = next(reader, None)
+            if not columns:
+                return
+            converters = column_converters(table, columns)
+            for values in reader:
+                yield {key: convert(value) for key, convert, value in zip(columns, converters, values)}
+        else:
+            raise click.ClickException(f'{path}: expected a .csv or .jsonl file')
+
+
+def insert_batches(conn, table, rows, fix_row, batch_size):
+    """executemany ``rows`` in batches; rows with different key sets (JSONL)
+    go in separate statements so each gets its column defaults."""
+    count = 0
+    batch = {}
+    pending = 0
+    statement = insert(table)
+    for row in rows:
+        if fix_row:
+            row = fix_row(row)
+        batch.setdefault(tuple(row), []).append(row)
+        pending += 1
+        if pending == batch_size:
+            for chunk in batch.values():
+                conn.execute(statement, chunk)
+            count += pending
+            batch, pending = {}, 0
+    for chunk in batch.values():
+        conn.execute(statement, chunk)
+    return count + pending
+
+
+def secondary_indexes(tables):
+    """Non-unique indexes on ``tables``; they are cheaper to build once
+    after the load than to maintain row by row."""
+    return [index for table in tables for index in table.indexes if not index.unique]
+
+
+@app.cli.command('import-data')
+@click.option('--categories', type=click.Path(exists=True, dir_okay=False))
+@click.option('--products', type=click.Path(exists=True, dir_okay=False))
+@click.option('--customers', type=click.Path(exists=True, dir_okay=False))
+@click.option('--invoices', type=click.Path(exists=True, dir_okay=False))
+@click.option('--invoice-lines', 'invoice_lines', type=click.Path(exists=True, dir_okay=False))
+@click.option('--batch-size', default=IMPORT_BATCH_SIZE, show_default=True, help='Rows per executemany.')
+@click.option('--keep-indexes', is_flag=True,
+              help='Maintain indexes during the load (faster for small loads into big tables).')
+def import_data_command(categories, products, customers, invoices, invoice_lines, batch_size, keep_indexes):
+    """Bulk-load CSV or JSONL files (optionally .gz), one per table.
+
+    Column names come from the CSV header or the JSON keys and must match
+    the table; ids may be given so invoice lines can point at imported
+    invoices. Everything loads in one transaction with secondary indexes
+    dropped and, on SQLite, per-row foreign key checks off. Foreign keys
+    are then verified in bulk and the indexes rebuilt before the commit,
+    so a bad file leaves the database as it was.
+    """
+    paths = {'categories': categories, 'products': products, 'customers': customers,
+             'invoices': invoices, 'invoice-lines': invoice_lines}
+    targets = [(option, *IMPORT_TABLES[option], paths[option]) for option in IMPORT_TABLES if paths[option]]
+    if not targets:
+        raise click.UsageError('Give at least one file, e.g. --invoices invoices.csv')
+
+    tables = [model.__table__ for _, model, _, _ in targets]
+    is_sqlite = db.engine.dialect.name == 'sqlite'
+    indexes = [] if keep_indexes else secondary_indexes(tables)
+    started = time.perf_counter()
+
+    with db.engine.connect() as conn:
+        if is_sqlite:
+            # PRAGMAs only take effect outside a transaction; both are put
+            # back below because the connection returns to the pool
+            synchronous = conn.exec_driver_sql('PRAGMA synchronous').scalar()
+            conn.exec_driver_sql('PRAGMA foreign_keys=OFF')
+            conn.exec_driver_sql('PRAGMA synchronous=OFF')
+            # pysqlite doesn't open a transaction for DDL by itself
+            conn.exec_driver_sql('BEGIN')
+        try:
+            for index in indexes:
+                index.drop(conn)
+
+            for option, model, fix_row, path in targets:
+                table_started = time.perf_counter()
+                count = insert_batches(conn, model.__table__, read_rows(path, model.__table__), fix_row, batch_size)
+                elapsed = time.perf_counter() - table_started
+                print(f'{option:<14} {count:>12,} rows in {elapsed:8.1f}s  '
+                      f'{count / elapsed if elapsed else 0:>12,.0f} rows/s')
+
+            if is_sqlite:
+                violations = []
+                for table in tables:
+                    violations += conn.exec_driver_sql(f'PRAGMA foreign_key_check({table.name})').all()
+                if violations:
+                    sample = ', '.join(f'{v[0]} rowid {v[1]} -> {v[2]}' for v in violations[:5])
+                    raise click.ClickException(
+                        f'{len(violations)} rows point at missing rows ({sample}); nothing was imported'
+                    )
+
+            index_started = time.perf_counter()
+            for index in indexes:
+                index.create(conn)
+            if indexes:
+                print(f'rebuilt {len(indexes)} indexes in {time.perf_counter() - index_started:.1f}s')
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            if is_sqlite:
+                conn.exec_driver_sql(f'PRAGMA synchronous={synchronous}')
+                conn.exec_driver_sql('PRAGMA foreign_keys=ON')
+                for table in tables:
+                    conn.exec_driver_sql(f'ANALYZE {table.name}')
+                conn.commit()
+
+    # Cached catalog pages, ETags and reports all predate the new rows
+    for name in ('category', 'product', 'customer'):
+        if name in {table.name for table in tables}:
+            bump_version(name)
+    db.session.commit()
+    if {'invoice', 'invoice_detail'} & {table.name for table in tables}:
+        rollup_started = time.perf_counter()
+        rebuild_rollups()
+        print(f'rebuilt sales rollups in {time.perf_counter() - rollup_started:.1f}s')
+    report_cache.invalidate()
+    print(f'import finished in {time.perf_counter() - started:.1f}s')
@@ -0,0 +1,171 @@
+import threading
+import time
+from bisect import bisect_left
+
+from flask import Response, g, has_request_context, request
+
+from app import app
+from utils.query_timing import on_query
+
+
+# Upper bounds (the Prometheus ``le`` label) per histogram
+DURATION_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+ROW_BUCKETS = (0, 1, 10, 50, 100, 500, 1000, 5000, 10000, 50000, 100000)
+
+METRICS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+class Histogram:
+    """Cumulative histogram keyed by a tuple of label values, rendered in
+    the Prometheus text format."""
+
+    def __init__(self, name, documentation, buckets, labelnames):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(buckets)
+        self.labelnames = labelnames
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels, value):
+        index = bisect_left(self.buckets, value)  # first bucket with le >= value
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def expose(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            series = [(labels, list(counts), total, count)
+                      for labels, (counts, total, count) in sorted(self._series.items())]
+        for labels, counts, total, count in series:
+            label_text = ','.join(f'{name}="{_escape(value)}"' for name, value in zip(self.labelnames, labels))
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float('inf'),), counts):
+                cumulative += n
+                le = '+Inf' if bound == float('inf') else repr(float(bound))
+                lines.append(f'{self.name}_bucket{{{label_text},le="{le}"}} {cumulative}')
+            lines.append(f'{self.name}_sum{{{label_text}}} {total!r}')
+            lines.append(f'{self.name}_count{{{label_text}}} {count}')
+        return lines
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+REQUEST_LABELS = ('endpoint', 'method', 'status')
+request_duration = Histogram('http_request_duration_seconds', 'Wall time spent handling the request.',
+                             DURATION_BUCKETS, REQUEST_LABELS)
+request_sql_duration = Histogram('http_request_sql_duration_seconds', 'Time spent executing SQL per request.',
+                                 DURATION_BUCKETS, REQUEST_LABELS)
+request_sql_statements = Histogram('http_request_sql_statements', 'SQL statements executed per request.',
+                                   COUNT_BUCKETS, REQUEST_LABELS)
+request_sql_rows = Histogram('http_request_sql_rows', 'Rows returned or changed by SQL per request.',
+                             ROW_BUCKETS, REQUEST_LABELS)
+HISTOGRAMS = (request_duration, request_sql_duration, request_sql_statements, request_sql_rows)
+
+
+class RequestMetrics:
+    __slots__ = ('started', 'sql_time', 'statements', 'rows')
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.sql_time = 0.0
+        self.statements = 0
+        self.rows = 0
+
+
+class RowCountingCursor:
+    """Wraps a DBAPI cursor to count the rows fetched from it."""
+
+    def __init__(self, cursor, metrics):
+        self._cursor = cursor
+        self._metrics = metrics
+
+    def fetchone(self):
+        row = self._cursor.fetchone()
+        if row is not None:
+            self._metrics.rows += 1
+        return row
+
+    def fetchmany(self, *args):
+        rows = self._cursor.fetchmany(*args)
+        self._metrics.rows += len(rows)
+        return rows
+
+    def fetchall(self):
+        rows = self._cursor.fetchall()
+        self._metrics.rows += len(rows)
+        return rows
+
+    def __iter__(self):
+        return iter(self.fetchone, None)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+def current_metrics():
+    return g.get('request_metrics') if has_request_context() else None
+
+
+def _record_query(conn, cursor, statement, parameters, context, executemany, elapsed):
+    metrics = current_metrics()
+    if metrics is None:
+        return
+    metrics.sql_time += elapsed
+    metrics.statements += 1
+    if cursor.description is None:
+        metrics.rows += max(cursor.rowcount, 0)
+    else:
+        # The result object is built from context.cursor right after this hook
+        context.cursor = RowCountingCursor(cursor, metrics)
+
+
+def _start_request():
+    g.request_metrics = RequestMetrics()
+
+
+def _finish_request(response):
+    metrics = g.pop('request_metrics', None)
+    if metrics is None:
+        return response
+    elapsed = time.perf_counter() - metrics.started
+    response.headers.add(
+        'Server-Timing',
+        f'app;dur={elapsed * 1000:.3f}, '
+        f'db;dur={metrics.sql_time * 1000:.3f};desc="{metrics.statements} statements, {metrics.rows} rows"'
+    )
+    labels = (request.endpoint or 'unmatched', request.method, str(response.status_code))
+    request_duration.observe(labels, elapsed)
+    request_sql_duration.observe(labels, metrics.sql_time)
+    request_sql_statements.observe(labels, metrics.statements)
+    request_sql_rows.observe(labels, metrics.rows)
+    return response
+
+
+def metrics_endpoint():
+    lines = []
+    for histogram in HISTOGRAMS:
+        lines.extend(histogram.expose())
+    return Response('\n'.join(lines) + '\n', content_type=METRICS_CONTENT_TYPE)
+
+
+def init_request_metrics(app):
+    """Register the hooks and ``/metrics``. Nothing is installed when
+    ``REQUEST_METRICS`` is off, so disabled metrics cost nothing."""
+    if not app.config['REQUEST_METRICS']:
+        return
+    on_query(_record_query)
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
+    app.add_url_rule(app.config['METRICS_PATH'], 'metrics', metrics_endpoint)
+
+
+init_request_metrics(app)
@@ -0,0 +1,125 @@
+import base64
+import json
+from datetime import datetime
+
+from flask import request
+from sqlalchemy import and_, or_
+
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 500
+
+
+class PaginationError(ValueError):
+    pass
+
+
+def encode_cursor(sort, value, row_id):
+    if isinstance(value, datetime):
+        payload = {'k': sort, 'v': value.isoformat(), 't': 'dt', 'id': row_id}
+    else:
+        payload = {'k': sort, 'v': value, 'id': row_id}
+    raw = json.dumps(payload, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        value = payload['v']
+        if payload.get('t') == 'dt':
+            value = datetime.fromisoformat(value)
+        return payload['k'], value, int(payload['id'])
+    except (ValueError, KeyError, TypeError):
+        raise PaginationError('Invalid cursor')
+
+
+class Page:
+    """Keyset page request: ``limit`` rows sorted by ``sort`` then ``id``,
+    starting strictly after the row encoded in the ``after`` cursor."""
+
+    def __init__(self, limit, sort='id', after=None):
+        self.limit = limit
+        self.sort = sort
+        self.has_after = after is not None
+        self.after_value, self.after_id = after if after else (None, None)
+
+    def filter_query(self, query, model):
+        """Apply the keyset predicate, ordering and limit to an ORM query."""
+        id_col = model.id
+        if self.sort == 'id':
+            if self.has_after:
+                query = query.filter(id_col > self.after_id)
+            return query.order_by(id_col.asc()).limit(self.limit + 1)
+
+        col = getattr(model, self.sort)
+        if self.has_after:
+            if self.after_value is None:
+                query = query.filter(or_(and_(col.is_(None), id_col > self.after_id), col.isnot(None)))
+            else:
+                query = query.filter(or_(col > self.after_value,
+                                         and_(col == self.after_value, id_col > self.after_id)))
+        return query.order_by(col.asc().nulls_first(), id_col.asc()).limit(self.limit + 1)
+
+    def sql(self):
+        """Return ``(where, order_by, params)`` fragments for raw ``text()`` queries.
+
+        ``where`` is either empty or starts with ``WHERE``; the caller appends
+        ``LIMIT :limit``.
+        """
+        params = {'limit': self.limit + 1}
+        if self.sort == 'id':
+            where = ''
+            if self.has_after:
+                where = 'WHERE id > :after_id'
+                params['after_id'] = self.after_id
+            return where, 'id ASC', params
+
+        col = self.sort
+        where = ''
+        if self.has_after:
+            params['after_id'] = self.after_id
+            if self.after_value is None:
+                where = f'WHERE ({col} IS NULL AND id > :after_id) OR {col} IS NOT NULL'
+            else:
+                where = f'WHERE {col} > :after_value OR ({col} = :after_value AND id > :after_id)'
+                params['after_value'] = self.after_value
+        return where, f'{col} ASC NULLS FIRST, id ASC', params
+
+    def trim(self, rows):
+        """Drop the look-ahead row and return ``(rows, next_cursor)``."""
+        rows = list(rows)
+        if len(rows) <= self.limit:
+            return rows, None
+        rows = rows[:self.limit]
+        last = rows[-1]
+        return rows, encode_cursor(self.sort, getattr(last, self.sort), last.id)
+
+
+def get_page_args(sort_keys=('id',)):
+    """Build a :class:`Page` from ``?limit=``, ``?after=`` and ``?sort=``.
+
+    ``sort_keys`` whitelists the columns the endpoint can be keyed on; the
+    first one is the default. When a cursor is given its embedded sort key
+    wins over ``?sort=``.
+    """
+    try:
+        limit = int(request.args.get('limit', DEFAULT_LIMIT))
+    except ValueError:
+        raise PaginationError('limit must be an integer')
+    if limit < 1:
+        raise PaginationError('limit must be at least 1')
+    limit = min(limit, MAX_LIMIT)
+
+    cursor = request.args.get('after')
+    if cursor:
+        sort, value, row_id = decode_cursor(cursor)
+        if sort not in sort_keys:
+            raise PaginationError('Invalid cursor')
+        return Page(limit, sort, (value, row_id))
+
+    sort = request.args.get('sort', sort_keys[0])
+    if sort not in sort_keys:
+        raise PaginationError(f"sort must be one of: {', '.join(sort_keys)}")
+    return Page(limit, sort)
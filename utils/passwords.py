@@ -0,0 +1,76 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import jsonify
+from werkzeug.security import generate_password_hash, check_password_hash
+
+from app import app
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when the hashing pool already has its maximum backlog."""
+
+
+class PasswordHasher:
+    """Runs password hashing on a fixed pool of threads.
+
+    hashlib's scrypt and PBKDF2 release the GIL, so the pool uses real cores
+    while request threads just wait. At most ``workers + max_queue`` jobs are
+    admitted; beyond that callers get :class:`PasswordHasherBusy` right away
+    instead of queueing behind a login storm.
+    """
+
+    def __init__(self, method, workers, max_queue, timeout):
+        self.method = method
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='passwords')
+        self._slots = threading.BoundedSemaphore(workers + max_queue)
+        # "scrypt" -> "scrypt:32768:8:1": the prefix every fresh hash starts with
+        self.method_prefix = generate_password_hash('', method).split('$', 1)[0]
+
+    def _run(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            raise PasswordHasherBusy()
+        try:
+            future = self._executor.submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except TimeoutError:
+            raise PasswordHasherBusy()
+
+    def hash(self, password):
+        return self._run(generate_password_hash, password, self.method)
+
+    def needs_rehash(self, stored):
+        return stored.split('$', 1)[0] != self.method_prefix
+
+    def verify(self, stored, password):
+        """Return ``(ok, new_hash)``; ``new_hash`` is set when the password
+        matched but ``stored`` uses an outdated method or cost."""
+        return self._run(self._verify, stored, password)
+
+    def _verify(self, stored, password):
+        if not check_password_hash(stored, password):
+            return False, None
+        if self.needs_rehash(stored):
+            return True, generate_password_hash(password, self.method)
+        return True, None
+
+
+password_hasher = PasswordHasher(
+    app.config['PASSWORD_HASH_METHOD'],
+    app.config['PASSWORD_HASH_WORKERS'],
+    app.config['PASSWORD_HASH_QUEUE'],
+    app.config['PASSWORD_HASH_TIMEOUT']
+)
+
+
+@app.errorhandler(PasswordHasherBusy)
+def password_hasher_busy(e):
+    response = jsonify({'error': 'Too many logins in progress, please retry'})
+    response.headers['Retry-After'] = '1'
+    return response, 503
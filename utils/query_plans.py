@@ -0,0 +1,16 @@
+def _is_table_scan(detail, tables):
+    words = detail.split()
+    if len(words) < 2 or words[0] != 'SCAN' or 'USING' in detail or 'VIRTUAL TABLE' in detail:
+        return False
+    if tables is None:
+        # "SCAN (subquery-1)" and "SCAN CONSTANT ROW" don't read a table, and
+        # sqlite_master is the schema, not data
+        return not words[1].startswith('(') and words[1] not in ('CONSTANT', 'sqlite_master')
+    return words[1] in tables
+
+
+def scans_and_sorts(plan, tables=None):
+    """The EXPLAIN QUERY PLAN lines that scan one of ``tables`` (any table
+    when ``None``) without an index, or sort in a temp b-tree."""
+    return [detail for detail in plan
+            if _is_table_scan(detail, tables) or detail.startswith('USE TEMP B-TREE FOR ORDER BY')]
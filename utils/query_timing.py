@@ -0,0 +1,38 @@
+import time
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+_callbacks = []
+
+
+def on_query(callback):
+    """Call ``callback(conn, cursor, statement, parameters, context,
+    executemany, elapsed)`` after every statement, with ``elapsed`` in
+    seconds.
+
+    Request metrics and the slow query log share this one listener pair, so
+    each statement is timed once. The start time lives on the execution
+    context, which is thrown away with the statement, so a statement that
+    raises leaves nothing behind on the connection.
+    """
+    if not _callbacks:
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+    _callbacks.append(callback)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._query_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # No context means a dialect-internal statement (first connect), not ours
+    started = getattr(context, '_query_start', None)
+    if started is None:
+        return
+    elapsed = time.perf_counter() - started
+    for callback in _callbacks:
+        callback(conn, cursor, statement, parameters, context, executemany, elapsed)
@@ -0,0 +1,41 @@
+"""Route read-only request queries to the ``replica`` bind.
+
+Imported by ``app.py`` before the app exists, so this module must not
+import ``app``.
+"""
+from flask import has_request_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import Select, CompoundSelect, TextClause
+
+
+REPLICA_BIND = 'replica'
+READ_METHODS = ('GET', 'HEAD')
+
+
+def is_read(clause):
+    if isinstance(clause, (Select, CompoundSelect)):
+        return True
+    if isinstance(clause, TextClause):
+        return clause.text.lstrip().split(None, 1)[0].upper() in ('SELECT', 'WITH')
+    return False
+
+
+class RoutingSession(Session):
+    """Sends SELECTs issued while handling a GET/HEAD request to the replica
+    engine, when one is configured.
+
+    The first write in a session (a flush, DML or an explicit
+    ``connection()``) pins the rest of that session - and so the rest of the
+    request - to the primary, so a request always reads its own writes.
+    CLI commands and background jobs have no request and use the primary.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self.info.get('pinned_to_primary'):
+            if is_read(clause):
+                replica = self._db.engines.get(REPLICA_BIND)
+                if replica is not None and has_request_context() and request.method in READ_METHODS:
+                    return replica
+            else:
+                self.info['pinned_to_primary'] = True
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
@@ -0,0 +1,76 @@
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import select, delete
+
+from app import app, db, jwt
+from models import RevokedToken
+
+
+# Each refresh re-reads rows revoked this long before the newest one seen,
+# so a row whose transaction committed after a later row's (or whose
+# worker's clock is a little behind) is still picked up
+REVOCATION_OVERLAP = timedelta(minutes=1)
+
+
+class RevocationList:
+    """In-memory mirror of ``revoked_token`` for the per-request JWT check.
+
+    A check is a dict lookup. At most every ``refresh_interval`` seconds a
+    request also pulls rows revoked since the newest ``revoked_at`` seen
+    (less :data:`REVOCATION_OVERLAP`), so a logout on another worker takes
+    effect within that interval; logouts on this worker take effect
+    immediately. Ids aren't used as the mark: SQLite reuses them once the
+    expired rows are purged, and they don't commit in order elsewhere.
+    """
+
+    def __init__(self, refresh_interval):
+        self.refresh_interval = refresh_interval
+        self._revoked = {}  # jti -> expiry (unix time)
+        self._last_seen = None  # newest revoked_at read so far
+        self._next_refresh = 0.0
+        self._lock = threading.Lock()
+
+    def refresh(self):
+        now = time.time()
+        with self._lock:
+            if now < self._next_refresh:
+                return
+            self._next_refresh = now + self.refresh_interval
+            query = select(RevokedToken.jti, RevokedToken.expires_at, RevokedToken.revoked_at)
+            if self._last_seen is None:
+                query = query.where(RevokedToken.expires_at > datetime.utcnow())
+            else:
+                query = query.where(RevokedToken.revoked_at > self._last_seen - REVOCATION_OVERLAP)
+            for row in db.session.execute(query):
+                self._revoked[row.jti] = row.expires_at.replace(tzinfo=timezone.utc).timestamp()
+                if self._last_seen is None or row.revoked_at > self._last_seen:
+                    self._last_seen = row.revoked_at
+            expired = [jti for jti, expires in self._revoked.items() if expires <= now]
+            for jti in expired:
+                del self._revoked[jti]
+
+    def is_revoked(self, jti):
+        if time.time() >= self._next_refresh:
+            self.refresh()
+        return jti in self._revoked
+
+    def revoke(self, jti, expires):
+        """Persist the revocation of ``jti`` (valid until unix time
+        ``expires``) and commit."""
+        expires_at = datetime.fromtimestamp(expires, timezone.utc).replace(tzinfo=None)
+        db.session.execute(delete(RevokedToken).where(RevokedToken.expires_at <= datetime.utcnow()))
+        if not db.session.execute(select(RevokedToken.id).where(RevokedToken.jti == jti)).first():
+            db.session.add(RevokedToken(jti=jti, expires_at=expires_at))
+        db.session.commit()
+        with self._lock:
+            self._revoked[jti] = expires
+
+
+revocation_list = RevocationList(app.config['REVOCATION_REFRESH_SECONDS'])
+
+
+@jwt.token_in_blocklist_loader
+def check_if_token_revoked(jwt_header, jwt_payload):
+    return revocation_list.is_revoked(jwt_payload['jti'])
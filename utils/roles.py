@@ -0,0 +1,34 @@
+from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+from sqlalchemy import select
+
+from app import db
+from models import User
+
+
+DEFAULT_ROLE = 'user'
+ADMIN_ROLE = 'admin'
+
+
+def current_role():
+    """The caller's role as stored in the database, or ``None`` without a
+    valid token.
+
+    The ``role`` inside the token is only a copy made at login: it outlives
+    role changes and is only as trustworthy as whatever set it, so checks
+    read the user row instead.
+    """
+    verify_jwt_in_request(optional=True)
+    identity = get_jwt_identity()
+    if not identity:
+        return None
+    return db.session.execute(select(User.role).where(User.id == identity['id'])).scalar()
+
+
+def is_admin():
+    return current_role() == ADMIN_ROLE
+
+
+def may_assign_role(role):
+    """Anyone may create plain users; any other role takes an admin. (So
+    does changing an existing user's role.)"""
+    return role in (None, DEFAULT_ROLE) or is_admin()
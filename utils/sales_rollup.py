@@ -0,0 +1,174 @@
+from collections import defaultdict
+from contextlib import contextmanager
+
+from sqlalchemy import select, delete, func
+
+from app import app, db
+from models import (Invoice, InvoiceDetail, Product, ProductDailySales, CategoryDailySales,
+                    UserDailySales)
+from utils.bulk import chunked, dialect_insert
+from utils.cache import report_cache
+
+
+def _upsert(model, keys, rows):
+    """executemany ``INSERT ... ON CONFLICT DO UPDATE`` adding to the counters."""
+    if not rows:
+        return
+    table = model.__table__
+    stmt = dialect_insert(table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=keys,
+        set_={c.name: c + stmt.excluded[c.name] for c in table.c if c.name not in keys}
+    )
+    db.session.execute(stmt, rows)
+
+
+def apply_invoices(invoice_ids, sign):
+    """Add (``sign=1``) or subtract (``sign=-1``) the rollup contribution of
+    the given invoices as they currently are in the session."""
+    report_cache.invalidate_on_commit()
+    users = defaultdict(lambda: [0, 0.0])
+    products = defaultdict(lambda: [0, 0.0, 0])
+    categories = defaultdict(lambda: [0.0, 0])
+
+    for chunk in chunked(set(invoice_ids)):
+        headers = db.session.execute(
+            select(Invoice.user_id, Invoice.date_time, Invoice.total_amount)
+            .where(Invoice.id.in_(chunk), Invoice.status == 'completed', Invoice.date_time.isnot(None))
+        )
+        for user_id, date_time, total_amount in headers:
+            bucket = users[(date_time.date(), user_id)]
+            bucket[0] += 1
+            bucket[1] += total_amount
+
+        lines = db.session.execute(
+            select(Invoice.date_time, InvoiceDetail.product_id, Product.category_id,
+                   InvoiceDetail.qty, InvoiceDetail.total)
+            .select_from(InvoiceDetail)
+            .join(Invoice, Invoice.id == InvoiceDetail.invoice_id)
+            .join(Product, Product.id == InvoiceDetail.product_id)
+            .where(InvoiceDetail.invoice_id.in_(chunk), Invoice.status == 'completed',
+                   Invoice.date_time.isnot(None))
+        )
+        for date_time, product_id, category_id, qty, total in lines:
+            day = date_time.date()
+            bucket = products[(day, product_id)]
+            bucket[0] += qty
+            bucket[1] += total
+            bucket[2] += 1
+            bucket = categories[(day, category_id)]
+            bucket[0] += total
+            bucket[1] += 1
+
+    _upsert(UserDailySales, ['day', 'user_id'], [
+        {'day': day, 'user_id': user_id, 'total_invoices': sign * n, 'total_sales': sign * total}
+        for (day, user_id), (n, total) in users.items()
+    ])
+    _upsert(ProductDailySales, ['day', 'product_id'], [
+        {'day': day, 'product_id': product_id, 'qty': sign * qty, 'total_sales': sign * total,
+         'lines': sign * n}
+        for (day, product_id), (qty, total, n) in products.items()
+    ])
+    _upsert(CategoryDailySales, ['day', 'category_id'], [
+        {'day': day, 'category_id': category_id, 'total_sales': sign * total, 'lines': sign * n}
+        for (day, category_id), (total, n) in categories.items()
+    ])
+
+    if sign < 0:
+        days = {day for day, _ in users} | {day for day, _ in products}
+        if days:
+            db.session.execute(delete(UserDailySales).where(
+                UserDailySales.day.in_(days), UserDailySales.total_invoices <= 0))
+            db.session.execute(delete(ProductDailySales).where(
+                ProductDailySales.day.in_(days), ProductDailySales.lines <= 0))
+            db.session.execute(delete(CategoryDailySales).where(
+                CategoryDailySales.day.in_(days), CategoryDailySales.lines <= 0))
+
+
+def recategorize_products(moves):
+    """Move category rollups for products whose category changed.
+
+    ``moves`` maps product id -> ``(old_category_id, new_category_id)``; the
+    per-day amounts come from the product rollup, not from invoice lines.
+    """
+    moves = {pid: (old, new) for pid, (old, new) in moves.items() if old != new}
+    if not moves:
+        return
+    report_cache.invalidate_on_commit()
+    categories = defaultdict(lambda: [0.0, 0])
+    for chunk in chunked(moves):
+        rows = db.session.execute(
+            select(ProductDailySales.day, ProductDailySales.product_id,
+                   ProductDailySales.total_sales, ProductDailySales.lines)
+            .where(ProductDailySales.product_id.in_(chunk))
+        )
+        for day, product_id, total, n in rows:
+            old, new = moves[product_id]
+            categories[(day, old)][0] -= total
+            categories[(day, old)][1] -= n
+            categories[(day, new)][0] += total
+            categories[(day, new)][1] += n
+
+    _upsert(CategoryDailySales, ['day', 'category_id'], [
+        {'day': day, 'category_id': category_id, 'total_sales': total, 'lines': n}
+        for (day, category_id), (total, n) in categories.items()
+    ])
+    days = {day for day, _ in categories}
+    if days:
+        db.session.execute(delete(CategoryDailySales).where(
+            CategoryDailySales.day.in_(days), CategoryDailySales.lines <= 0))
+
+
+@contextmanager
+def track_invoices(invoice_ids=()):
+    """Keep the rollups in step with writes to the given invoices.
+
+    Their contribution is subtracted on entry and re-added on exit, inside
+    the caller's transaction. Ids of invoices created inside the block can
+    be added to the yielded set.
+    """
+    ids = {i for i in invoice_ids if i is not None}
+    apply_invoices(ids, -1)
+    yield ids
+    db.session.flush()
+    apply_invoices(ids, 1)
+
+
+def rebuild_rollups():
+    """Recompute every rollup table from invoice and invoice_detail."""
+    day = func.date(Invoice.date_time)
+    for model in (ProductDailySales, CategoryDailySales, UserDailySales):
+        db.session.execute(delete(model))
+
+    db.session.execute(ProductDailySales.__table__.insert().from_select(
+        ['day', 'product_id', 'qty', 'total_sales', 'lines'],
+        select(day, InvoiceDetail.product_id, func.sum(InvoiceDetail.qty),
+               func.sum(InvoiceDetail.total), func.count())
+        .select_from(InvoiceDetail)
+        .join(Invoice, Invoice.id == InvoiceDetail.invoice_id)
+        .where(Invoice.status == 'completed', Invoice.date_time.isnot(None))
+        .group_by(day, InvoiceDetail.product_id)
+    ))
+    db.session.execute(CategoryDailySales.__table__.insert().from_select(
+        ['day', 'category_id', 'total_sales', 'lines'],
+        select(day, Product.category_id, func.sum(InvoiceDetail.total), func.count())
+        .select_from(InvoiceDetail)
+        .join(Invoice, Invoice.id == InvoiceDetail.invoice_id)
+        .join(Product, Product.id == InvoiceDetail.product_id)
+        .where(Invoice.status == 'completed', Invoice.date_time.isnot(None))
+        .group_by(day, Product.category_id)
+    ))
+    db.session.execute(UserDailySales.__table__.insert().from_select(
+        ['day', 'user_id', 'total_invoices', 'total_sales'],
+        select(day, Invoice.user_id, func.count(), func.sum(Invoice.total_amount))
+        .where(Invoice.status == 'completed', Invoice.date_time.isnot(None))
+        .group_by(day, Invoice.user_id)
+    ))
+    db.session.commit()
+
+
+@app.cli.command('rebuild-rollups')
+def rebuild_rollups_command():
+    """Backfill the daily sales rollup tables."""
+    rebuild_rollups()
+    print('Sales rollups rebuilt.')
@@ -0,0 +1,67 @@
+import re
+
+from sqlalchemy import text
+
+from app import app, db
+
+
+# product_fts is an external-content FTS5 index over product(name, description),
+# created by migration 9d0b7e5a1c38 and kept in sync by triggers on product, so
+# the raw SQL and bulk write paths need no extra calls.
+SEARCH_TABLE = 'product_fts'
+# bm25 column weights: a hit in the name counts ten times a description hit
+SEARCH_WEIGHTS = (10.0, 1.0)
+MAX_SEARCH_TERMS = 8
+
+_TOKEN = re.compile(r'\w+', re.UNICODE)
+
+
+def build_match_query(q):
+    """Turn free text into an FTS5 MATCH expression.
+
+    Every word must match; the last word is treated as a prefix so results
+    update while the cashier is still typing. Words are quoted so FTS5
+    operators in user input are taken literally. Returns ``None`` when the
+    input has no searchable words.
+    """
+    words = _TOKEN.findall(q or '')[:MAX_SEARCH_TERMS]
+    if not words:
+        return None
+    terms = [f'"{word}"' for word in words]
+    terms[-1] += '*'
+    return ' '.join(terms)
+
+
+_search_ready = False
+
+
+def search_available():
+    """Whether product_fts can be queried: the database is SQLite and the
+    search migration has created the table. Only a yes is cached, so running
+    the migration takes effect without a restart."""
+    global _search_ready
+    if not _search_ready and db.engine.dialect.name == 'sqlite':
+        _search_ready = db.session.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+            {'name': SEARCH_TABLE}
+        ).first() is not None
+    return _search_ready
+
+
+def search_unavailable_error():
+    """The error message for why search_available() said no."""
+    if db.engine.dialect.name != 'sqlite':
+        return 'Product search requires SQLite FTS5'
+    return f'Product search index ({SEARCH_TABLE}) is missing; run flask db upgrade'
+
+
+@app.cli.command('rebuild-search-index')
+def rebuild_search_index_command():
+    """Rebuild product_fts from the product table."""
+    if not search_available():
+        print(search_unavailable_error())
+        return
+    db.session.execute(text(f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}) VALUES('rebuild')"))
+    db.session.execute(text(f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}) VALUES('optimize')"))
+    db.session.commit()
+    print('Rebuilt product search index.')
@@ -0,0 +1,140 @@
+import threading
+from collections import deque
+from datetime import datetime
+
+from flask import has_request_context, jsonify, request
+from flask_jwt_extended import jwt_required
+
+from app import app
+from utils.query_plans import scans_and_sorts
+from utils.query_timing import on_query
+from utils.roles import is_admin
+
+
+MAX_STATEMENT_LENGTH = 4000
+# Only these are worth a plan; EXPLAIN never runs the statement itself
+EXPLAIN_PREFIX = {'sqlite': 'EXPLAIN QUERY PLAN ', 'postgresql': 'EXPLAIN '}
+EXPLAINABLE = ('SELECT', 'WITH', 'UPDATE', 'DELETE')
+# Backends where one failed statement aborts the transaction it ran in
+SAVEPOINT_DIALECTS = {'postgresql'}
+EXPLAIN_SAVEPOINT = 'slow_query_explain'
+
+
+class SlowQueryLog:
+    """The last ``size`` statements that took longer than ``threshold_ms``."""
+
+    def __init__(self, threshold_ms, size):
+        self.threshold = threshold_ms / 1000
+        self._entries = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def add(self, entry):
+        with self._lock:
+            self._entries.append(entry)
+
+    def entries(self, limit=None):
+        """Newest first."""
+        with self._lock:
+            entries = list(self._entries)
+        entries.reverse()
+        return entries[:limit] if limit else entries
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+def parameter_shape(parameters, executemany):
+    """Types, not values, of the bound parameters, so the log never holds
+    customer data."""
+    if executemany:
+        rows = list(parameters)
+        return {'rows': len(rows), 'types': parameter_shape(rows[0], False)['types'] if rows else []}
+    if isinstance(parameters, dict):
+        return {'rows': 1, 'types': {key: type(value).__name__ for key, value in parameters.items()}}
+    return {'rows': 1, 'types': [type(value).__name__ for value in parameters or ()]}
+
+
+def explain(conn, statement, parameters, executemany):
+    """The plan for ``statement`` from the same DBAPI connection, or
+    ``None`` when the backend or statement kind isn't supported.
+
+    Runs inside the caller's transaction, so where a failed statement
+    aborts the whole transaction (PostgreSQL) the EXPLAIN gets a savepoint
+    of its own and a failure is rolled back to it.
+    """
+    prefix = EXPLAIN_PREFIX.get(conn.dialect.name)
+    if prefix is None or statement.lstrip().split(None, 1)[0].upper() not in EXPLAINABLE:
+        return None
+    if executemany:
+        parameters = parameters[0] if parameters else ()
+    dbapi_connection = conn.connection.dbapi_connection
+    savepoint = conn.dialect.name in SAVEPOINT_DIALECTS and not getattr(dbapi_connection, 'autocommit', False)
+    cursor = dbapi_connection.cursor()
+    try:
+        if savepoint:
+            cursor.execute(f'SAVEPOINT {EXPLAIN_SAVEPOINT}')
+        try:
+            cursor.execute(prefix + statement, parameters)
+            return [row[-1] for row in cursor.fetchall()]
+        except Exception as e:
+            if savepoint:
+                cursor.execute(f'ROLLBACK TO SAVEPOINT {EXPLAIN_SAVEPOINT}')
+            return [f'EXPLAIN failed: {e}']
+        finally:
+            if savepoint:
+                cursor.execute(f'RELEASE SAVEPOINT {EXPLAIN_SAVEPOINT}')
+    finally:
+        cursor.close()
+
+
+def current_route():
+    if not has_request_context():
+        return None
+    return {'method': request.method, 'path': request.path, 'endpoint': request.endpoint}
+
+
+def _record_query(conn, cursor, statement, parameters, context, executemany, elapsed):
+    if elapsed < slow_query_log.threshold:
+        return
+    plan = explain(conn, statement, parameters, executemany)
+    route = current_route()
+    entry = {
+        'at': datetime.utcnow().isoformat(),
+        'duration_ms': round(elapsed * 1000, 3),
+        'statement': statement[:MAX_STATEMENT_LENGTH],
+        'parameters': parameter_shape(parameters, executemany),
+        'route': route,
+        'plan': plan,
+        'full_scans': scans_and_sorts(plan) if plan and conn.dialect.name == 'sqlite' else [],
+    }
+    slow_query_log.add(entry)
+    app.logger.warning(
+        'Slow query (%.1f ms) in %s: %s\n  plan: %s',
+        entry['duration_ms'], f"{route['method']} {route['path']}" if route else 'no request',
+        ' '.join(entry['statement'].split()), ' | '.join(plan or ['n/a'])
+    )
+
+
+slow_query_log = SlowQueryLog(app.config['SLOW_QUERY_MS'], app.config['SLOW_QUERY_LOG_SIZE'])
+if app.config['SLOW_QUERY_MS'] > 0:
+    on_query(_record_query)
+
+
+@app.route('/admin/slow-queries', methods=['GET', 'DELETE'])
+@jwt_required()
+def slow_queries():
+    if not is_admin():
+        return jsonify({'error': 'Admin role required'}), 403
+    if request.method == 'DELETE':
+        slow_query_log.clear()
+        return jsonify({'status': 'Slow query log cleared'}), 200
+    try:
+        limit = int(request.args.get('limit', 0)) or None
+    except ValueError:
+        return jsonify({'error': 'limit must be an integer'}), 400
+    return jsonify({
+        'enabled': app.config['SLOW_QUERY_MS'] > 0,
+        'threshold_ms': app.config['SLOW_QUERY_MS'],
+        'queries': slow_query_log.entries(limit)
+    }), 200
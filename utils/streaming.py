@@ -0,0 +1,29 @@
+import json
+
+from flask import Response, request, stream_with_context
+
+
+NDJSON_MIMETYPE = 'application/x-ndjson'
+STREAM_BATCH_SIZE = 1000
+
+
+def wants_stream():
+    """True when the client asked for NDJSON via ``?stream=1`` or ``Accept``."""
+    if request.args.get('stream', '').lower() in ('1', 'true', 'yes'):
+        return True
+    # Only an explicit entry counts; ``*/*`` keeps the regular JSON response.
+    return any(mimetype == NDJSON_MIMETYPE and quality > 0
+               for mimetype, quality in request.accept_mimetypes)
+
+
+def ndjson_response(rows, serialize):
+    """Stream ``rows`` as one JSON document per line.
+
+    ``rows`` should be a lazily fetched result (``yield_per`` / server side
+    cursor) so only one batch is held in memory at a time.
+    """
+    def generate():
+        for row in rows:
+            yield json.dumps(serialize(row), default=str) + '\n'
+
+    return Response(stream_with_context(generate()), mimetype=NDJSON_MIMETYPE)
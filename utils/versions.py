@@ -0,0 +1,67 @@
+import hashlib
+from datetime import datetime, timedelta
+from functools import wraps
+
+from flask import request, Response, current_app
+from sqlalchemy import select, insert, delete
+
+from app import db
+from models import TableVersion, Tombstone
+from utils.bulk import dialect_insert
+
+
+def current_version(name):
+    """Committed change counter for ``name``; a single primary key lookup."""
+    version = db.session.execute(
+        select(TableVersion.version).where(TableVersion.name == name)
+    ).scalar()
+    return version or 0
+
+
+def bump_version(name):
+    """Increment the counter inside the caller's transaction and return it."""
+    table = TableVersion.__table__
+    stmt = dialect_insert(table).values(name=name, version=1)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['name'],
+        set_={'version': table.c.version + 1}
+    ).returning(table.c.version)
+    return db.session.execute(stmt).scalar()
+
+
+def conditional_on_version(name):
+    """Serve a GET view with a strong ETag derived from ``name``'s change
+    counter and the query string; a matching ``If-None-Match`` gets a 304
+    before the view fetches or serializes anything."""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            args_key = '&'.join(f'{k}={v}' for k, v in sorted(request.args.items(multi=True)))
+            digest = hashlib.sha1(args_key.encode()).hexdigest()[:12]
+            etag = f'{name}-{current_version(name)}-{digest}'
+
+            if request.if_none_match.contains(etag):
+                response = Response(status=304)
+            else:
+                response = current_app.make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+            response.set_etag(etag)
+            response.headers['Cache-Control'] = 'no-cache'
+            return response
+        return wrapper
+    return decorator
+
+
+def record_deletes(name, ids):
+    """Leave tombstones for deleted rows so /sync can report them, and purge
+    those past ``SYNC_TOMBSTONE_DAYS``."""
+    ids = list(ids)
+    if ids:
+        now = datetime.utcnow()
+        db.session.execute(delete(Tombstone).where(
+            Tombstone.deleted_at < now - timedelta(days=current_app.config['SYNC_TOMBSTONE_DAYS'])
+        ))
+        db.session.execute(insert(Tombstone), [
+            {'table_name': name, 'row_id': row_id, 'deleted_at': now} for row_id in ids
+        ])